@@ -17,6 +17,7 @@
 enum Mode { IDLE, MENU, OPERACION, CALIBRACION };
 Mode modo = MENU;
 uint8_t canalCalib = 0;
+uint16_t seqFrame = 0;  // Secuencia de frames de operación (vuelve a 0 tras 65535)
 
 // BLE
 BLEService protsenService(SERVICE_UUID);
@@ -118,6 +119,7 @@ void onCommandReceived(BLEDevice, BLECharacteristic chr) {
 
   if (cmd == "o") {
     modo = OPERACION;
+    seqFrame = 0;
     resultCharacteristic.writeValue("Modo: Operacion");
   }
   else if (cmd == "b") {
@@ -163,7 +165,7 @@ void funcion_operacion() {
     valor = constrain(valor, 0.0, 11.0);
 
     char buf[32];
-    snprintf(buf, sizeof(buf), "Op S%u:%.2f", i, valor);
+    snprintf(buf, sizeof(buf), "Op S%u:%.2f #%u", i, valor, seqFrame++);
     resultCharacteristic.writeValue(buf);
     Serial.println(buf);
 
@@ -14,14 +14,30 @@
 #define CHAR_RESULT_UUID  "a1b2c3d4-0003-1200-0000-00000000f012"
 
 // Modos de operación
-enum Mode { IDLE, OPERACION, CALIBRACION };
+enum Mode { IDLE, OPERACION, OPERACION_RAPIDA, CALIBRACION };
 Mode modo = IDLE;
 uint8_t canalCalib = 0;
+uint16_t seqFrame = 0;  // Secuencia de frames de operación (vuelve a 0 tras 65535)
+
+// Operación rápida: lotes binarios a tasa configurable ('r<Hz>' y luego 'f')
+// Frame: 0xA6, seq uint16, n uint8, t0 micros uint32, n x 4 x ADC uint16 (little-endian)
+#define BATCH_MAGIC    0xA6
+#define BATCH_HEADER   8
+#define BATCH_MAX      8       // muestras por frame como máximo (8 + 8*8 = 72 bytes)
+#define NOTIFY_MAX_HZ  25      // notificaciones por segundo objetivo
+#define TASA_MAX_HZ    1000
+#define MUX_SETTLE_US  200     // asentamiento del MUX por canal en modo rápido
+uint16_t tasaHz = 100;
+uint8_t loteN = 4;
+unsigned long periodoUs = 10000;
+unsigned long proximaMuestra = 0;
+uint8_t lote[BATCH_HEADER + BATCH_MAX * 8];
+uint8_t loteCount = 0;
 
 // Servicio y características BLE
 BLEService protsenService(SERVICE_UUID);
 BLECharacteristic cmdCharacteristic(CHAR_CMD_UUID, BLEWrite, 20);
-BLECharacteristic resultCharacteristic(CHAR_RESULT_UUID, BLERead | BLENotify, 32);
+BLECharacteristic resultCharacteristic(CHAR_RESULT_UUID, BLERead | BLENotify, BATCH_HEADER + BATCH_MAX * 8);
 
 // Variables para parpadeo con millis()
 unsigned long previousBlink = 0;
@@ -32,6 +48,8 @@ bool ledState = false;
 void onCommandReceived(BLEDevice central, BLECharacteristic chr);
 void SetMuxChannel(uint8_t channel);
 void funcion_operacion();
+void funcion_operacion_rapida();
+void configurarTasa(uint16_t hz);
 void funcion_calibracion(uint8_t canal);
 
 void setup() {
@@ -89,6 +107,9 @@ void loop() {
       case OPERACION:
         funcion_operacion();
         break;
+      case OPERACION_RAPIDA:
+        funcion_operacion_rapida();
+        break;
       case CALIBRACION:
         funcion_calibracion(canalCalib);
         break;
@@ -113,7 +134,24 @@ void onCommandReceived(BLEDevice central, BLECharacteristic chr) {
 
   if (cmd == "o") {
     modo = OPERACION;
+    seqFrame = 0;
     resultCharacteristic.writeValue("Modo: Operacion");
+  } else if (cmd == "f") {
+    modo = OPERACION_RAPIDA;
+    seqFrame = 0;
+    loteCount = 0;
+    proximaMuestra = micros();
+    resultCharacteristic.writeValue("Modo: Operacion rapida");
+  } else if (cmd.startsWith("r")) {
+    long hz = cmd.substring(1).toInt();
+    if (hz >= 1 && hz <= TASA_MAX_HZ) {
+      configurarTasa(hz);
+      char msg[32];
+      snprintf(msg, sizeof(msg), "Tasa: %u Hz, lote %u", tasaHz, loteN);
+      resultCharacteristic.writeValue(msg);
+    } else {
+      resultCharacteristic.writeValue("Error: tasa fuera de rango");
+    }
   } else if (cmd == "b") {
     modo = CALIBRACION;
     char msg[32];
@@ -152,12 +190,52 @@ void funcion_operacion() {
     valor = constrain(valor, 0.0, 11.0);
     outStr += "S" + String(i) + ":" + String(valor, 2) + " ";
   }
+  outStr += "#" + String(seqFrame++);
 
   resultCharacteristic.writeValue(outStr.c_str());
   Serial.println(outStr);
   delay(500);
 }
 
+void configurarTasa(uint16_t hz) {
+  tasaHz = hz;
+  periodoUs = 1000000UL / hz;
+  // Muestras por frame para no superar ~NOTIFY_MAX_HZ notificaciones por segundo
+  loteN = constrain((hz + NOTIFY_MAX_HZ - 1) / NOTIFY_MAX_HZ, 1, BATCH_MAX);
+}
+
+void funcion_operacion_rapida() {
+  // Muestreo por plazos con micros(): sin delay() entre muestras
+  unsigned long ahora = micros();
+  if ((long)(ahora - proximaMuestra) < 0) return;
+  proximaMuestra += periodoUs;
+  if ((long)(ahora - proximaMuestra) > (long)periodoUs) {
+    proximaMuestra = ahora + periodoUs;  // atraso grande: re-sincroniza sin ráfaga
+  }
+
+  if (loteCount == 0) {
+    lote[0] = BATCH_MAGIC;
+    lote[1] = seqFrame & 0xFF;
+    lote[2] = seqFrame >> 8;
+    memcpy(&lote[4], &ahora, 4);
+  }
+  uint8_t *p = &lote[BATCH_HEADER + loteCount * 8];
+  for (uint8_t i = 0; i < 4; i++) {
+    SetMuxChannel(i);
+    delayMicroseconds(MUX_SETTLE_US);
+    uint16_t lectura = analogRead(MUX_SIG);
+    p[2 * i] = lectura & 0xFF;
+    p[2 * i + 1] = lectura >> 8;
+  }
+
+  if (++loteCount >= loteN) {
+    lote[3] = loteCount;
+    resultCharacteristic.writeValue(lote, BATCH_HEADER + loteCount * 8);
+    seqFrame++;
+    loteCount = 0;
+  }
+}
+
 void funcion_calibracion(uint8_t canal) {
   SetMuxChannel(canal);
   delay(10);
@@ -0,0 +1,232 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+try:
+    from Process.process_calibration import calibration_files
+except ImportError:  # ejecución directa desde Code/Process
+    from process_calibration import calibration_files
+
+# Reporte comparativo de todo el archivo de calibraciones (en la raíz de salida)
+PROPERTIES_FILE = 'comparacion_propiedades.csv'
+DRIFT_FILE = 'comparacion_deriva.csv'
+PLOT_FILE = 'comparacion_calibraciones.png'
+# Pesos donde se compara la curva de cada corrida con la primera del sensor
+REF_WEIGHTS_G = (250, 500, 1000, 2000, 4000)
+VOLTS_PER_COUNT = 3.3 / 1023.0
+
+
+def load_archive(data_dir):
+    """
+    Todas las calibraciones de data_dir/sensorN apiladas en arreglos de
+    forma (corridas × n_max) rellenos con NaN: 'P' (g) y 'V' (V, misma
+    conversión que process_file), más 'runs' (Sensor, Calibracion, N).
+    Las corridas con menos de 3 pesos distintos no se pueden ajustar y
+    quedan en 'omitidas'. Sensores y corridas van en orden numérico.
+    """
+    runs, blocks, omitidas = [], [], []
+    for sensor_folder, path in calibration_files(data_dir):
+        df = pd.read_csv(path, usecols=['Peso_g', 'Lectura'])
+        base = os.path.splitext(os.path.basename(path))[0]
+        if df['Peso_g'].nunique() < 3:
+            omitidas.append(base)
+            continue
+        runs.append({'Sensor': sensor_folder, 'Calibracion': base, 'N': len(df)})
+        blocks.append(df.to_numpy(dtype=float))
+    n_max = max((len(b) for b in blocks), default=0)
+    P = np.full((len(blocks), n_max), np.nan)
+    L = np.full((len(blocks), n_max), np.nan)
+    for i, b in enumerate(blocks):
+        P[i, :len(b)], L[i, :len(b)] = b[:, 0], b[:, 1]
+    return {'P': P, 'V': np.round(L * VOLTS_PER_COUNT, 3), 'runs': pd.DataFrame(runs), 'omitidas': omitidas}
+
+
+def fit_stacked(P, V):
+    """
+    Regresión V = a(ln P)² + b ln P + c de todas las corridas a la vez:
+    ecuaciones normales por corrida con sumas enmascaradas y un solo
+    np.linalg.solve por lotes. ln P se centra por corrida para un sistema
+    bien condicionado. Devuelve coeficientes (corridas × 3), ajuste y residuos.
+    """
+    ok = np.isfinite(P) & np.isfinite(V) & (P > 0)
+    n = ok.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = np.where(ok, np.log(np.where(ok, P, 1.0)), 0.0)
+    y = np.where(ok, V, 0.0)
+    x0 = x.sum(axis=1) / n
+    u = np.where(ok, x - x0[:, None], 0.0)
+    # Momentos Σu^k (k = 0..4) y Σu^k·y (k = 0..2) por corrida
+    mom = np.stack([np.where(ok, u ** k, 0.0).sum(axis=1) for k in range(5)], axis=1)
+    rhs = np.stack([(u ** k * y).sum(axis=1) for k in (2, 1, 0)], axis=1)
+    idx = np.array([[4, 3, 2], [3, 2, 1], [2, 1, 0]])
+    A, B, C = np.linalg.solve(mom[:, idx], rhs[..., None])[..., 0].T
+    # Volver a ln P sin centrar: a(x - x0)² + b(x - x0) + c
+    coeffs = np.column_stack([A, B - 2 * A * x0, A * x0 ** 2 - B * x0 + C])
+    y_fit = np.where(ok, (A[:, None] * u + B[:, None]) * u + C[:, None], np.nan)
+    return coeffs, y_fit, np.where(ok, V - y_fit, np.nan)
+
+
+def _group_stats(P, V):
+    # Media y desviación (ddof=1) por (corrida, peso) con una sola pasada de bincount
+    ok = np.isfinite(P) & np.isfinite(V)
+    fila = np.broadcast_to(np.arange(P.shape[0])[:, None], P.shape)[ok]
+    claves, grupo = np.unique(np.column_stack([fila, P[ok]]), axis=0, return_inverse=True)
+    grupo = grupo.ravel()
+    cuenta = np.bincount(grupo)
+    suma = np.bincount(grupo, V[ok])
+    media = suma / cuenta
+    dev2 = np.bincount(grupo, (V[ok] - media[grupo]) ** 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sigma = np.sqrt(dev2 / (cuenta - 1))
+    return claves[:, 0].astype(int), claves[:, 1], media, sigma
+
+
+def curve(coeffs, pesos):
+    """V de cada corrida (filas) en cada peso (columnas)."""
+    x = np.log(np.asarray(pesos, dtype=float))[None, :]
+    a, b, c = (coeffs[:, [k]] for k in range(3))
+    return (a * x + b) * x + c
+
+
+def sensitivity(coeffs, pesos):
+    """dV/dP = (2a ln P + b) / P de cada corrida en cada peso (V/g)."""
+    p = np.asarray(pesos, dtype=float)[None, :]
+    return (2 * coeffs[:, [0]] * np.log(p) + coeffs[:, [1]]) / p
+
+
+def compare_properties(archive, coeffs, resid):
+    """Propiedades estáticas de todas las corridas, una fila por corrida."""
+    P, V = archive['P'], archive['V']
+    fila, _, _, sigma = _group_stats(P, V)
+    props = archive['runs'].copy()
+    min_v, max_v = np.nanmin(V, axis=1), np.nanmax(V, axis=1)
+    fso = max_v - min_v
+    peor_sigma = np.full(len(props), np.nan)
+    np.fmax.at(peor_sigma, fila, sigma)
+    ss_res = np.nansum(resid ** 2, axis=1)
+    ss_tot = np.nansum((V - np.nanmean(V, axis=1, keepdims=True)) ** 2, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        props['Rango_min_g'] = np.nanmin(P, axis=1)
+        props['Rango_max_g'] = np.nanmax(P, axis=1)
+        props['Rango_min_V'] = min_v
+        props['Rango_max_V'] = max_v
+        props['FSO_volts'] = fso.round(3)
+        props['Precision_%FSO'] = (peor_sigma / fso * 100).round(2)
+        props['Resolucion_V_per_g'] = (fso / (props['Rango_max_g'] - props['Rango_min_g'])).round(6)
+        props['R2_regresion'] = np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.nan).round(4)
+        props['RMSE_V'] = np.sqrt(ss_res / archive['runs']['N'].to_numpy()).round(5)
+    props['a'], props['b'], props['c'] = coeffs.T.round(6)
+    return props
+
+
+def compare_drift(props, coeffs, pesos=REF_WEIGHTS_G):
+    """
+    Deriva de cada corrida respecto a la primera del mismo sensor: ΔV de
+    la curva ajustada en `pesos` y su equivalente en gramos con la
+    sensibilidad de la referencia. Solo pesos dentro del rango de ambas corridas.
+    """
+    pesos = np.asarray(pesos, dtype=float)
+    ref = props.groupby('Sensor').cumcount().to_numpy() == 0
+    ref_idx = np.maximum.accumulate(np.where(ref, np.arange(len(props)), 0))
+    dv = curve(coeffs, pesos) - curve(coeffs[ref_idx], pesos)
+    lo = np.maximum(props['Rango_min_g'].to_numpy(), props['Rango_min_g'].to_numpy()[ref_idx])
+    hi = np.minimum(props['Rango_max_g'].to_numpy(), props['Rango_max_g'].to_numpy()[ref_idx])
+    dentro = (pesos[None, :] >= lo[:, None]) & (pesos[None, :] <= hi[:, None])
+    dv = np.where(dentro, dv, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dg = dv / sensitivity(coeffs[ref_idx], pesos)
+    drift = props[['Sensor', 'Calibracion']].copy()
+    drift.insert(2, 'Referencia', props['Calibracion'].to_numpy()[ref_idx])
+    for j, p in enumerate(pesos):
+        drift[f'dV_{p:g}g_mV'] = (dv[:, j] * 1000).round(1)
+    for j, p in enumerate(pesos):
+        drift[f'Deriva_{p:g}g_g'] = dg[:, j].round(1) + 0.0  # sin -0.0
+    valido = np.isfinite(dg)
+    with np.errstate(invalid='ignore'):
+        drift['Deriva_media_g'] = (np.where(valido, np.abs(dg), 0).sum(axis=1) / valido.sum(axis=1)).round(1)
+    for col in ('FSO_volts', 'R2_regresion', 'RMSE_V', 'Precision_%FSO'):
+        drift[f'd{col}'] = (props[col].to_numpy() - props[col].to_numpy()[ref_idx]).round(5)
+    return drift
+
+
+def render_comparison(archive, coeffs, output_dir):
+    """Curvas ajustadas y residuos por peso de todas las corridas en una figura."""
+    runs = archive['runs']
+    fila, pesos, media, _ = _group_stats(archive['P'], archive['V'])
+    a, b, c = coeffs[fila].T
+    x = np.log(pesos)
+    resid_medio = media - ((a * x + b) * x + c)
+    p_lo, p_hi = np.nanmin(archive['P']), np.nanmax(archive['P'])
+    grid = np.geomspace(p_lo, p_hi, 200)
+    curvas = curve(coeffs, grid)
+
+    fig = Figure(figsize=(10, 8))
+    ax, ax_r = fig.add_subplot(211), fig.add_subplot(212)
+    colores = {s: f'C{i}' for i, s in enumerate(runs['Sensor'].unique())}
+    orden = runs.groupby('Sensor').cumcount().to_numpy()
+    estilos = ['-', '--', ':', '-.']
+    for i, run in runs.iterrows():
+        color, estilo = colores[run['Sensor']], estilos[orden[i] % len(estilos)]
+        sel = fila == i
+        ax.plot(pesos[sel], media[sel], 'o', color=color, ms=4, alpha=0.7)
+        ok = (grid >= np.nanmin(archive['P'][i])) & (grid <= np.nanmax(archive['P'][i]))
+        ax.plot(grid[ok], curvas[i, ok], estilo, color=color, label=run['Calibracion'])
+        ax_r.plot(pesos[sel], resid_medio[sel] * 1000, 'o' + estilo, color=color, ms=4)
+    ax.set_xscale('log')
+    ax.set_ylabel('Voltaje (V)', fontsize=12)
+    ax.set_title('Curvas características: todas las calibraciones', fontsize=14)
+    ax.legend(loc='best', fontsize=8)
+    ax.grid(True, alpha=0.3)
+    ax_r.set_xscale('log')
+    ax_r.axhline(0, color='gray', lw=1)
+    ax_r.set_xlabel('Peso (g)', fontsize=12)
+    ax_r.set_ylabel('Residuo medio (mV)', fontsize=12)
+    ax_r.grid(True, alpha=0.3)
+    fig.tight_layout()
+    plot_file = os.path.join(output_dir, PLOT_FILE)
+    fig.savefig(plot_file, dpi=150)
+    return plot_file
+
+
+def compare_all(data_dir, output_dir):
+    """
+    Reporte comparativo de todo el archivo: carga, ajuste, propiedades y
+    deriva de todas las corridas en arreglos apilados (sin process_file
+    por archivo). Escribe las dos tablas y la figura en output_dir y
+    devuelve (propiedades, deriva, figura, omitidas).
+    """
+    archive = load_archive(data_dir)
+    if archive['runs'].empty:
+        raise ValueError(f"No hay calibraciones con al menos 3 pesos en {data_dir}")
+    coeffs, _, resid = fit_stacked(archive['P'], archive['V'])
+    props = compare_properties(archive, coeffs, resid)
+    drift = compare_drift(props, coeffs)
+    os.makedirs(output_dir, exist_ok=True)
+    props.to_csv(os.path.join(output_dir, PROPERTIES_FILE), index=False)
+    drift.to_csv(os.path.join(output_dir, DRIFT_FILE), index=False)
+    plot_file = render_comparison(archive, coeffs, output_dir)
+    return props, drift, plot_file, archive['omitidas']
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Comparación de todas las calibraciones: curvas, residuos, propiedades y deriva.')
+    parser.add_argument('--data-dir', '-d', default='Data', help='Directorio raíz de datos')
+    parser.add_argument('--output-dir', '-o', default='Processed', help='Directorio de salida')
+    args = parser.parse_args()
+
+    props, drift, plot_file, omitidas = compare_all(args.data_dir, args.output_dir)
+    fmt = lambda v: f"{v:.4g}"
+    print(props.drop(columns=['a', 'b', 'c']).to_string(index=False, float_format=fmt))
+    print("\nDeriva respecto a la primera corrida de cada sensor:")
+    print(drift.to_string(index=False, float_format=fmt))
+    for base in omitidas:
+        print(f"Omitida (menos de 3 pesos): {base}")
+    print(f"Tablas y figura guardadas en {args.output_dir} ({PLOT_FILE})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import argparse
+import time
+import numpy as np
+
+# Puntos por defecto: del orden del ancho en píxeles de un canvas típico
+DEFAULT_POINTS = 2000
+
+
+def _bin_edges(n, n_bins):
+    return np.linspace(0, n, n_bins + 1).astype(np.int64)
+
+
+def minmax(x, y, n_out=DEFAULT_POINTS):
+    """
+    Decimación min-max: en cada cubeta conserva el mínimo y el máximo
+    (en su orden temporal), así los picos sobreviven a cualquier zoom.
+    Devuelve como mucho n_out puntos.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    n_bins = max(1, n_out // 2)
+    if n <= n_out:
+        return x, y
+    size = n // n_bins
+    full = n_bins * size
+    # Cubetas de igual tamaño como vista (sin copiar); el resto va a la última
+    blocks = y[:full].reshape(n_bins, size)
+    i_min = np.argmin(blocks, axis=1) + np.arange(n_bins) * size
+    i_max = np.argmax(blocks, axis=1) + np.arange(n_bins) * size
+    if full < n:
+        tail = y[full:]
+        last = n_bins - 1
+        if tail.min() < y[i_min[last]]:
+            i_min[last] = full + np.argmin(tail)
+        if tail.max() > y[i_max[last]]:
+            i_max[last] = full + np.argmax(tail)
+    idx = np.unique(np.concatenate([i_min, i_max]))
+    return x[idx], y[idx]
+
+
+def lttb(x, y, n_out=DEFAULT_POINTS):
+    """
+    Largest-Triangle-Three-Buckets: conserva el punto de cada cubeta que
+    forma el triángulo de mayor área con el punto anterior elegido y el
+    promedio de la cubeta siguiente. Preserva la forma visual de la serie.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return x, y
+    xf = x.astype(float)
+    yf = y.astype(float)
+    # Primer y último punto fijos; n_out - 2 cubetas en el interior
+    edges = _bin_edges(n - 2, n_out - 2) + 1
+    # Promedios de todas las cubetas (y del último punto) de una sola vez
+    sums_x = np.add.reduceat(xf[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(yf[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, xf[-1])
+    avg_y = np.append(sums_y / counts, yf[-1])
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Área (x2) del triángulo a - candidato - promedio siguiente
+        area = np.abs((xf[a] - avg_x[i + 1]) * (yf[lo:hi] - yf[a])
+                      - (xf[a] - xf[lo:hi]) * (avg_y[i + 1] - yf[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return x[idx], y[idx]
+
+
+METHODS = {'minmax': minmax, 'lttb': lttb}
+
+
+def decimate(x, y, n_out=DEFAULT_POINTS, method='minmax'):
+    """Reduce (x, y) a ~n_out puntos con el método indicado."""
+    return METHODS[method](x, y, n_out)
+
+
+def visible_slice(x, x0, x1, margin=1):
+    """Índices [i0, i1) de la ventana x0..x1 sobre x ordenado (más un punto de margen)."""
+    i0 = max(0, int(np.searchsorted(x, x0, side='left')) - margin)
+    i1 = min(len(x), int(np.searchsorted(x, x1, side='right')) + margin)
+    return i0, i1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de decimación para visualización.')
+    parser.add_argument('--points', '-n', type=int, default=10_000_000, help='Puntos de la serie')
+    parser.add_argument('--out', '-o', type=int, default=DEFAULT_POINTS, help='Puntos de salida')
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    x = np.arange(args.points, dtype=float)
+    y = np.cumsum(rng.standard_normal(args.points))
+    for name, fn in METHODS.items():
+        t = time.perf_counter()
+        xs, _ = fn(x, y, args.out)
+        print(f"{name:7s}: {args.points} -> {len(xs)} puntos en {(time.perf_counter() - t) * 1e3:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+import json
+import numpy as np
+
+# Número de particiones para la validación cruzada
+K_FOLDS = 5
+
+# Parada temprana de la calibración: los últimos EARLY_STOP_STEPS pesos
+# fueron predichos (antes de medirlos) con error menor que EARLY_STOP_TOL_V
+# o que EARLY_STOP_RMSE_FRAC veces el RMSE del ajuste (el resto es ruido)
+EARLY_STOP_STEPS = 2
+EARLY_STOP_TOL_V = 0.01
+EARLY_STOP_RMSE_FRAC = 0.6
+EARLY_STOP_MIN_STEPS = 5
+EARLY_STOP_R2 = 0.99
+
+
+class CandidateModel:
+    """Modelo candidato V(P) lineal en sus parámetros (o linealizable)."""
+    def __init__(self, name, equation, design, predict, inverse, log_target=False):
+        self.name = name
+        self.equation = equation      # coef -> texto de la ecuación
+        self.design = design          # (P, V) -> matriz de diseño X
+        self.predict = predict        # (coef, P) -> V
+        self.inverse = inverse        # (coef, V) -> P
+        self.log_target = log_target  # True si se ajusta ln(V) en lugar de V
+
+    def target(self, V):
+        return np.log(V) if self.log_target else V
+
+
+def _inv_log_quad(coef, V):
+    # Raíz de a·x² + b·x + (c - V) = 0 con x = ln(P); se toma la rama creciente.
+    # Acepta coeficientes en lote (cada k[i] de forma (B, 1)) para la incertidumbre.
+    a, b, c = coef
+    V = np.asarray(V, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        disc = np.sqrt(np.clip(b * b - 4 * a * (c - V), 0, None))
+        quad = np.exp((-b + disc) / (2 * a))
+        lin = np.exp((V - c) / b)
+    return np.where(np.abs(a) < 1e-12, lin, quad)
+
+
+def _inv_rational(coef, V):
+    a, b, c = coef
+    V = np.asarray(V, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (V - a) / (b - c * V)
+
+
+MODELS = {
+    # Modelo histórico de process_file: V = a·ln(P)² + b·ln(P) + c
+    'log_quad': CandidateModel(
+        'log_quad',
+        lambda k: f"V = {k[0]:.6f}(ln(P))² + {k[1]:.6f}ln(P) + {k[2]:.6f}",
+        lambda P, V: np.column_stack([np.log(P) ** 2, np.log(P), np.ones_like(P)]),
+        lambda k, P: k[0] * np.log(P) ** 2 + k[1] * np.log(P) + k[2],
+        _inv_log_quad),
+    # V = b·ln(P) + c
+    'log_lin': CandidateModel(
+        'log_lin',
+        lambda k: f"V = {k[0]:.6f}ln(P) + {k[1]:.6f}",
+        lambda P, V: np.column_stack([np.log(P), np.ones_like(P)]),
+        lambda k, P: k[0] * np.log(P) + k[1],
+        lambda k, V: np.exp((np.asarray(V, dtype=float) - k[1]) / k[0])),
+    # Ley de potencia V = A·P^n, ajustada como ln(V) = ln(A) + n·ln(P)
+    'power': CandidateModel(
+        'power',
+        lambda k: f"V = {np.exp(k[1]):.6f}·P^{k[0]:.6f}",
+        lambda P, V: np.column_stack([np.log(P), np.ones_like(P)]),
+        lambda k, P: np.exp(k[1]) * P ** k[0],
+        lambda k, V: (np.asarray(V, dtype=float) / np.exp(k[1])) ** (1.0 / k[0]),
+        log_target=True),
+    # Racional V = (a + b·P) / (1 + c·P), linealizado como V = a + b·P - c·P·V
+    'rational': CandidateModel(
+        'rational',
+        lambda k: f"V = ({k[0]:.6f} + {k[1]:.6e}·P) / (1 + {k[2]:.6e}·P)",
+        lambda P, V: np.column_stack([np.ones_like(P), P, -P * V]),
+        lambda k, P: (k[0] + k[1] * P) / (1 + k[2] * P),
+        _inv_rational),
+}
+
+
+class RunningFit:
+    """
+    Ajuste incremental de V = a·ln(P)² + b·ln(P) + c durante la calibración.
+    Guarda solo los estadísticos suficientes (XᵀX, Xᵀy, yᵀy) y la media por
+    peso, así que agregar o quitar muestras y resolver cuesta O(1).
+    """
+    def __init__(self):
+        self.model = MODELS['log_quad']
+        self.xtx = np.zeros((3, 3))
+        self.xty = np.zeros(3)
+        self.yty = 0.0
+        self.sy = 0.0
+        self.n = 0
+        self.groups = {}          # peso -> [n, suma de V, suma de V²]
+        self.step_errors = []     # error de predicción de cada paso antes de medirlo
+
+    def add(self, pesos, voltajes, sign=1):
+        """Agrega (sign=1) o quita (sign=-1) muestras."""
+        P = np.atleast_1d(np.asarray(pesos, dtype=float))
+        V = np.atleast_1d(np.asarray(voltajes, dtype=float))
+        if len(P) == 1 and len(V) > 1:
+            P = np.full(len(V), P[0])
+        X = self.model.design(P, V)
+        self.xtx += sign * (X.T @ X)
+        self.xty += sign * (X.T @ V)
+        self.yty += sign * float(V @ V)
+        self.sy += sign * float(V.sum())
+        self.n += sign * len(V)
+        for peso in np.unique(P):
+            g = self.groups.setdefault(float(peso), [0, 0.0, 0.0])
+            g[0] += sign * int((P == peso).sum())
+            g[1] += sign * float(V[P == peso].sum())
+            g[2] += sign * float((V[P == peso] ** 2).sum())
+            if g[0] <= 0:
+                del self.groups[float(peso)]
+
+    def solve(self):
+        """Coeficientes, R² y RMSE (V) actuales, o None con menos de 3 pesos distintos."""
+        if len(self.groups) < 3:
+            return None
+        coef = np.linalg.pinv(self.xtx) @ self.xty
+        sse = max(self.yty - 2 * coef @ self.xty + coef @ self.xtx @ coef, 0.0)
+        sst = self.yty - self.sy ** 2 / self.n
+        return {'coeffs': coef.tolist(),
+                'R2': float(1 - sse / sst) if sst > 0 else np.nan,
+                'RMSE_V': float(np.sqrt(sse / self.n)),
+                'N': int(self.n)}
+
+    def preview(self, peso, voltajes):
+        """Ajuste incluyendo muestras aún no confirmadas (el paso en curso), sin guardarlas."""
+        if len(voltajes) == 0:
+            return self.solve()
+        self.add(peso, voltajes)
+        try:
+            return self.solve()
+        finally:
+            self.add(peso, voltajes, sign=-1)
+
+    def residuals(self, coeffs=None):
+        """Residuo (V) de la media de cada peso respecto al ajuste: {peso: residuo}."""
+        if coeffs is None:
+            fit = self.solve()
+            if fit is None:
+                return {}
+            coeffs = fit['coeffs']
+        k = np.asarray(coeffs)
+        return {p: s / n - float(self.model.predict(k, p)) for p, (n, s, _) in sorted(self.groups.items())}
+
+    def noise_v(self):
+        """Desviación estándar dentro de cada peso (V), combinada entre pesos; NaN sin réplicas."""
+        ss = sum(s2 - s * s / n for n, s, s2 in self.groups.values())
+        dof = sum(n - 1 for n, _, _ in self.groups.values())
+        return float(np.sqrt(max(ss, 0.0) / dof)) if dof > 0 else np.nan
+
+    def force_sigma(self, pesos, extra=None):
+        """
+        Incertidumbre (g, 1σ) del peso que se estimaría con el ajuste actual en
+        cada peso dado: σ de la curva, σ²·xᵀ(XᵀX)⁻¹x, dividida por la sensibilidad
+        dV/dP. `extra` = (peso, n) la evalúa como si se midieran n muestras más ahí.
+        """
+        fit = self.solve()
+        P = np.atleast_1d(np.asarray(pesos, dtype=float))
+        if fit is None or self.n <= 3:
+            return np.full(len(P), np.inf)
+        a, b, _ = fit['coeffs']
+        s2 = fit['RMSE_V'] ** 2 * self.n / (self.n - 3)
+        X = self.model.design(P, P)
+        xtx = self.xtx
+        if extra is not None:
+            x = self.model.design(np.array([float(extra[0])]), None)[0]
+            xtx = xtx + extra[1] * np.outer(x, x)
+        var_v = s2 * np.einsum('ip,pq,iq->i', X, np.linalg.pinv(xtx), X)
+        with np.errstate(divide='ignore'):
+            return np.sqrt(var_v) / np.abs((2 * a * np.log(P) + b) / P)
+
+    def commit_step(self, peso, voltajes):
+        """
+        Incorpora un peso terminado. Antes de agregarlo se predice con el ajuste
+        actual: ese error de predicción alimenta el criterio de parada temprana.
+        """
+        fit = self.solve()
+        if fit is not None and len(voltajes):
+            pred = float(self.model.predict(np.asarray(fit['coeffs']), float(peso)))
+            self.step_errors.append(abs(float(np.mean(voltajes)) - pred))
+        self.add(peso, voltajes)
+        return self.solve()
+
+    def can_stop(self):
+        """True si los pesos restantes no cambiarían el modelo de forma apreciable."""
+        fit = self.solve()
+        recientes = self.step_errors[-EARLY_STOP_STEPS:]
+        if fit is None or len(self.groups) < EARLY_STOP_MIN_STEPS or len(recientes) < EARLY_STOP_STEPS:
+            return False
+        tol = max(EARLY_STOP_TOL_V, EARLY_STOP_RMSE_FRAC * fit['RMSE_V'])
+        return max(recientes) < tol and fit['R2'] >= EARLY_STOP_R2
+
+
+def fold_indices(P, k=K_FOLDS):
+    """Asigna cada muestra a una partición, repartiendo cada peso entre particiones."""
+    n = len(P)
+    k = max(2, min(k, n))
+    folds = np.empty(n, dtype=int)
+    folds[np.argsort(P, kind='stable')] = np.arange(n) % k
+    return folds, k
+
+
+def _batched_fit(X, y, weights):
+    # Resuelve todas las regresiones ponderadas (ajuste completo + particiones)
+    # en una sola llamada: (XᵀWX)⁻¹ XᵀWy para cada fila de `weights`.
+    xtx = np.einsum('fn,np,nq->fpq', weights, X, X)
+    xty = np.einsum('fn,np,n->fp', weights, X, y)
+    return (np.linalg.pinv(xtx) @ xty[..., None])[..., 0]
+
+
+def fit_models(pesos, voltajes, models=None, k=K_FOLDS):
+    """
+    Ajusta todos los modelos candidatos sobre (peso, voltaje) y los puntúa
+    por R², RMSE y RMSE de validación cruzada k-fold (todo en voltios).
+    Devuelve un dict {nombre: resultado} y el nombre del mejor modelo.
+    """
+    P = np.asarray(pesos, dtype=float)
+    V = np.asarray(voltajes, dtype=float)
+    if len(P) < 4:
+        raise ValueError("Se necesitan al menos 4 muestras para ajustar modelos.")
+    if np.any(P <= 0):
+        raise ValueError("Los pesos deben ser positivos para los modelos logarítmicos.")
+
+    folds, k = fold_indices(P, k)
+    # Fila 0: ajuste con todos los datos; filas 1..k: entrenamiento sin la partición f
+    weights = np.vstack([np.ones(len(P)), folds[None, :] != np.arange(k)[:, None]]).astype(float)
+    ss_tot = np.sum((V - V.mean()) ** 2)
+
+    results = {}
+    for name in (models or MODELS):
+        model = MODELS[name]
+        if model.log_target and np.any(V <= 0):
+            continue
+        X = model.design(P, V)
+        coefs = _batched_fit(X, model.target(V), weights)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            pred = np.stack([model.predict(c, P) for c in coefs])
+        resid = V - pred[0]
+        cv_resid = V - pred[1:][folds, np.arange(len(P))]
+        rmse = float(np.sqrt(np.mean(resid ** 2)))
+        cv_rmse = float(np.sqrt(np.mean(cv_resid ** 2)))
+        results[name] = {
+            'model': name,
+            'coeffs': coefs[0].tolist(),
+            'R2': float(1 - np.sum(resid ** 2) / ss_tot) if ss_tot else np.nan,
+            'RMSE_V': rmse,
+            'CV_RMSE_V': cv_rmse if np.isfinite(cv_rmse) else np.nan,
+            'equation': model.equation(coefs[0]),
+        }
+
+    if not results:
+        raise ValueError("Ningún modelo candidato es aplicable a los datos.")
+    best = min(results, key=lambda m: (np.nan_to_num(results[m]['CV_RMSE_V'], nan=np.inf),
+                                       -np.nan_to_num(results[m]['R2'], nan=-np.inf)))
+    return results, best
+
+
+def predict(model_name, coeffs, pesos):
+    """Voltaje estimado por el modelo para los pesos dados."""
+    return MODELS[model_name].predict(np.asarray(coeffs), np.asarray(pesos, dtype=float))
+
+
+def invert(model_name, coeffs, voltajes):
+    """Peso estimado (g) a partir del voltaje, usando la inversa del modelo."""
+    return MODELS[model_name].inverse(np.asarray(coeffs), voltajes)
+
+
+def save_model(path, result, rango_g):
+    """Guarda el mejor modelo y su rango de validez en JSON."""
+    data = dict(result)
+    data['Rango_g'] = [float(rango_g[0]), float(rango_g[1])]
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+    return path
+
+
+def load_model(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def results_table(results, best):
+    """Tabla (lista de filas) con la puntuación de cada candidato."""
+    rows = []
+    for name, r in sorted(results.items(), key=lambda kv: np.nan_to_num(kv[1]['CV_RMSE_V'], nan=np.inf)):
+        rows.append({
+            'Modelo': name,
+            'R2': round(r['R2'], 4),
+            'RMSE_V': round(r['RMSE_V'], 5),
+            'CV_RMSE_V': round(r['CV_RMSE_V'], 5),
+            'Optimo': name == best,
+            'Ecuacion': r['equation'],
+        })
+    return rows
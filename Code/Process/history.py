@@ -0,0 +1,164 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    from Process.segments import read_manifest, load_range, format_epoch, import_legacy, COMPRIMIDO, CERRADO
+    from Process.timing import TIME_COLUMN, SEQ_COLUMN, loss_stats
+    from Process.downsample import minmax
+except ImportError:  # ejecución directa desde Code/Process
+    from segments import read_manifest, load_range, format_epoch, import_legacy, COMPRIMIDO, CERRADO
+    from timing import TIME_COLUMN, SEQ_COLUMN, loss_stats
+    from downsample import minmax
+
+# Índice de sesiones y vistas previas, junto a los segmentos (Data/operacion)
+INDEX = 'sessions.csv'
+SENSORS = range(4)
+STATS = ['N', 'Media', 'Std', 'Min', 'Max']
+INDEX_FIELDS = (['Sesion', 'Origen', 'Inicio', 'Fin', 'Duracion_s', 'Segmentos', 'Filas', 'Perdida_pct'] +
+                [f'S{c}_{s}' for c in SENSORS for s in STATS])
+# Puntos por sensor de la vista previa (decimación min-max de la sesión completa)
+OVERVIEW_POINTS = 4000
+
+
+def overview_path(root, session):
+    return os.path.join(root, f"overview_{session}.npz")
+
+
+def read_index(root):
+    """Índice de sesiones (una fila por sesión); vacío si aún no existe."""
+    path = os.path.join(root, INDEX)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=INDEX_FIELDS)
+    return pd.read_csv(path, dtype={'Sesion': str})
+
+
+def _write_index(root, df):
+    tmp = os.path.join(root, INDEX + '.tmp')
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, os.path.join(root, INDEX))
+
+
+def index_session(root, session, segments):
+    """
+    Lee una vez los segmentos de la sesión: estadísticos por sensor, pérdida
+    de frames y vista previa decimada (overview_<sesion>.npz). Devuelve la fila del índice.
+    """
+    data = load_range(root, session=session)
+    row = {
+        'Sesion': session,
+        'Origen': segments['Origen'].iloc[0],
+        'Inicio': segments['Inicio'].min(),
+        'Fin': segments['Fin'].max(),
+        'Segmentos': len(segments),
+        'Filas': len(data),
+    }
+    row['Duracion_s'] = round(row['Fin'] - row['Inicio'], 3)
+    if data.empty:
+        return row
+
+    # Estadísticos de todos los sensores en una sola agrupación
+    stats = data.groupby('Sensor')['Valor'].agg(['count', 'mean', 'std', 'min', 'max'])
+    for c, values in stats.iterrows():
+        for name, value in zip(STATS, values):
+            row[f'S{int(c)}_{name}'] = round(float(value), 4)
+
+    if SEQ_COLUMN in data.columns:
+        seq = data[SEQ_COLUMN].to_numpy(dtype=float)
+        seq = seq[~np.isnan(seq)]
+        if len(seq):
+            # Un frame de varios canales/muestras ocupa filas consecutivas con la misma secuencia
+            seq = seq[np.concatenate([[True], np.diff(seq) != 0])]
+            row['Perdida_pct'] = loss_stats(seq)['Perdida_pct']
+
+    overview = {}
+    for c, grupo in data.groupby('Sensor'):
+        x, y = minmax(grupo[TIME_COLUMN].to_numpy(dtype=float) / 1e9,
+                      grupo['Valor'].to_numpy(dtype=float), OVERVIEW_POINTS)
+        overview[f'x{int(c)}'] = x
+        overview[f'y{int(c)}'] = y
+    np.savez(overview_path(root, session), **overview)
+    return row
+
+
+def update_index(root, progress=None):
+    """
+    Indexa las sesiones terminadas que falten en el índice (o que hayan
+    cambiado) y devuelve el índice completo. Las sesiones ya indexadas no
+    se vuelven a leer: abrir el historial cuesta solo leer este CSV.
+    El operacion.csv de versiones anteriores se importa antes como una sesión más.
+    """
+    import_legacy(root)
+    index = read_index(root)
+    manifest = read_manifest(root)
+    if manifest.empty:
+        return index
+    known = dict(zip(index['Sesion'], zip(index['Segmentos'], index['Filas'])))
+    pending = []
+    for session, segs in manifest.groupby('Sesion', sort=True):
+        if not segs['Estado'].isin([CERRADO, COMPRIMIDO]).all():
+            continue  # grabación en curso o interrumpida (ver segments.py --compress)
+        firma = (len(segs), int(segs['Filas'].sum()))
+        if known.get(session) != firma:
+            pending.append((session, segs))
+    if not pending:
+        return index
+
+    rows = []
+    for i, (session, segs) in enumerate(pending, 1):
+        if progress:
+            progress(i, len(pending), session)
+        rows.append(index_session(root, session, segs))
+    new = pd.DataFrame(rows, columns=INDEX_FIELDS)
+    index = index[~index['Sesion'].isin(new['Sesion'])]
+    index = pd.concat([index, new], ignore_index=True) if not index.empty else new
+    index = index.sort_values('Inicio', ignore_index=True)
+    _write_index(root, index)
+    return index
+
+
+def open_session(root, session, start=None, end=None, n_out=OVERVIEW_POINTS):
+    """
+    Series {sensor: (x, y)} de una sesión, con x en segundos de sesión.
+    Sin rango devuelve la vista previa guardada (no abre segmentos). Con
+    rango [start, end] (s) lee solo los segmentos que lo cubren y decima.
+    """
+    if start is None and end is None:
+        path = overview_path(root, session)
+        if os.path.exists(path):
+            with np.load(path) as z:
+                return {c: (z[f'x{c}'], z[f'y{c}']) for c in SENSORS if f'x{c}' in z}
+    index = read_index(root)
+    fila = index[index['Sesion'] == session]
+    origin = float(fila['Origen'].iloc[0]) if not fila.empty else 0.0
+    data = load_range(root,
+                      None if start is None else origin + start,
+                      None if end is None else origin + end,
+                      session=session)
+    if data.empty:
+        return {}
+    return {int(c): minmax(grupo[TIME_COLUMN].to_numpy(dtype=float) / 1e9,
+                           grupo['Valor'].to_numpy(dtype=float), n_out)
+            for c, grupo in data.groupby('Sensor')}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Índice de sesiones de operación: inicio, duración y estadísticos por sensor.')
+    parser.add_argument('--root', '-d', default=os.path.join('Data', 'operacion'),
+                        help='Directorio de segmentos y manifiesto')
+    args = parser.parse_args()
+
+    index = update_index(args.root, progress=lambda i, n, s: print(f"Indexando {i}/{n}: {s}"))
+    if index.empty:
+        print("No hay sesiones terminadas.")
+        return
+    table = index[['Sesion', 'Inicio', 'Duracion_s', 'Filas', 'Perdida_pct'] +
+                  [f'S{c}_Media' for c in SENSORS]].copy()
+    table['Inicio'] = [format_epoch(t) for t in table['Inicio']]
+    print(table.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
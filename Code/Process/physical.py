@@ -0,0 +1,184 @@
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares
+
+try:
+    from Process.validation import read_calibration
+    from Process.process_calibration import calibration_files
+except ImportError:  # ejecución directa desde Code/Process
+    from validation import read_calibration
+    from process_calibration import calibration_files
+
+# Circuito de Design/Relation.py: R_FSR = K / F^n y amplificador no inversor
+# Vout = VREF·(1 + R_feedback / R_FSR), saturado en VMAX. Se añade una
+# resistencia en serie R_s (piso del FSR y pistas), sin la cual el modelo no
+# reproduce la saturación del sensor a fuerzas altas.
+R_FEEDBACK = 100e3  # Ω montada en las calibraciones
+VREF = 1.0          # V nominal
+VMAX = 3.3
+G = 9.80665
+# Lecturas a menos de este margen de VMAX se consideran saturadas y no se ajustan
+SAT_MARGIN_V = 0.02
+# Un ajuste es válido si convergió, ningún parámetro quedó en su cota y R² llega a este mínimo
+MIN_R2 = 0.9
+PARAMS = ('K_FSR_ohm', 'Exponente', 'VREF_ef_V', 'R_s_ohm')
+RESULTS_FILE = 'modelo_fisico.csv'
+
+
+def _force_n(pesos_g):
+    return np.asarray(pesos_g, dtype=float) * G / 1000
+
+
+def model_voltage(theta, fuerza, r_feedback=R_FEEDBACK):
+    """Vout sin saturar para theta = (ln K, n, VREF efectivo, ln R_s) y fuerza en N."""
+    ln_k, n, v0, ln_rs = theta
+    return v0 * (1 + r_feedback / (np.exp(ln_rs) + np.exp(ln_k - n * np.log(fuerza))))
+
+
+def _residuals(theta, ln_f, V, r_feedback):
+    ln_k, n, v0, ln_rs = theta
+    return v0 * (1 + r_feedback / (np.exp(ln_rs) + np.exp(ln_k - n * ln_f))) - V
+
+
+def _jacobian(theta, ln_f, V, r_feedback):
+    # Derivadas analíticas del residuo respecto a (ln K, n, VREF efectivo, ln R_s)
+    ln_k, n, v0, ln_rs = theta
+    r_fsr = np.exp(ln_k - n * ln_f)
+    r_s = np.exp(ln_rs)
+    total = r_s + r_fsr
+    g = v0 * r_feedback / total ** 2  # -dV/dR_total
+    return np.column_stack([-g * r_fsr, g * r_fsr * ln_f, 1 + r_feedback / total, -g * r_s])
+
+
+def _initial_guesses(V, r_feedback):
+    # Varios VREF de partida por debajo de la lectura mínima; R_s según la ganancia máxima
+    for frac in (0.3, 0.6, 0.9):
+        v0 = max(frac * V.min(), 1e-3)
+        ganancia = max(V.max() / v0 - 1, 1e-3)
+        yield np.array([np.log(1e5), 0.8, v0, np.log(r_feedback / ganancia)])
+
+
+def fit_physical(pesos_g, voltajes, r_feedback=R_FEEDBACK, loss='linear'):
+    """
+    Ajusta K (Ω a 1 N), el exponente n, el VREF efectivo y R_s del circuito
+    a una calibración con least_squares y jacobiano analítico, desde varios
+    puntos de partida. Las muestras saturadas se excluyen. Devuelve un dict
+    con parámetros y calidad del ajuste; 'Valido' es False si algún parámetro
+    quedó en su cota ('En_limite') o R² < MIN_R2 (sensor sin respuesta o
+    ajuste degenerado): sus parámetros no sirven para predecir.
+    """
+    F = _force_n(pesos_g)
+    V = np.asarray(voltajes, dtype=float)
+    libre = (V < VMAX - SAT_MARGIN_V) & (F > 0)
+    if libre.sum() < 4:
+        raise ValueError("Se necesitan al menos 4 muestras sin saturar para el modelo físico.")
+    ln_f, Vf = np.log(F[libre]), V[libre]
+    res = None
+    for x0 in _initial_guesses(Vf, r_feedback):
+        r = least_squares(_residuals, x0, jac=_jacobian, args=(ln_f, Vf, r_feedback),
+                          bounds=([-np.inf, 0.05, 1e-3, -np.inf], [np.inf, 3.0, VMAX, np.inf]),
+                          loss=loss, f_scale=0.05, x_scale='jac')
+        if res is None or r.cost < res.cost:
+            res = r
+    resid = res.fun
+    ss_tot = np.sum((Vf - Vf.mean()) ** 2)
+    r2 = float(1 - np.sum(resid ** 2) / ss_tot) if ss_tot else np.nan
+    en_limite = [p for p, activo in zip(PARAMS, res.active_mask) if activo]
+    return {
+        'K_FSR_ohm': float(np.exp(res.x[0])),
+        'Exponente': float(res.x[1]),
+        'VREF_ef_V': float(res.x[2]),
+        'R_s_ohm': float(np.exp(res.x[3])),
+        'R_feedback_ohm': float(r_feedback),
+        'RMSE_V': float(np.sqrt(np.mean(resid ** 2))),
+        'R2': r2,
+        'N': int(libre.sum()),
+        'Saturadas': int((~libre).sum()),
+        'Convergio': bool(res.success),
+        'En_limite': ','.join(en_limite),
+        'Valido': bool(res.success and not en_limite and r2 >= MIN_R2),
+        'Evaluaciones': int(res.nfev),
+    }
+
+
+def predict_voltage(params, pesos_g, r_feedback=None, vref=None):
+    """
+    Vout esperado (saturado en VMAX) de un sensor ya ajustado con otra
+    resistencia de realimentación y/o otro VREF, sin recalibrar.
+    """
+    r_feedback = params['R_feedback_ohm'] if r_feedback is None else r_feedback
+    v0 = params['VREF_ef_V'] * (1.0 if vref is None else vref / VREF)
+    theta = (np.log(params['K_FSR_ohm']), params['Exponente'], v0, np.log(params['R_s_ohm']))
+    return np.clip(model_voltage(theta, _force_n(pesos_g), r_feedback), 0, VMAX)
+
+
+def _fit_job(csv_path, r_feedback):
+    # Tarea de proceso hijo: una calibración
+    P, V = read_calibration(csv_path)
+    return fit_physical(P, V, r_feedback)
+
+
+def fit_all(data_dir, r_feedback=R_FEEDBACK, workers=None, progress=None):
+    """
+    Ajusta el modelo físico a todas las calibraciones de data_dir/sensorN en
+    paralelo. Devuelve una tabla con una fila por calibración (errores en 'Error').
+    """
+    jobs = calibration_files(data_dir)
+    rows = []
+    if not jobs:
+        return pd.DataFrame(rows)
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {pool.submit(_fit_job, path, r_feedback): (sensor, path) for sensor, path in jobs}
+        for done, fut in enumerate(as_completed(futures), 1):
+            sensor, path = futures[fut]
+            row = {'Sensor': sensor, 'Calibracion': os.path.splitext(os.path.basename(path))[0]}
+            try:
+                row.update(fut.result())
+            except Exception as e:
+                row['Error'] = str(e)
+            rows.append(row)
+            if progress:
+                progress(done, len(jobs), path)
+    return pd.DataFrame(rows).sort_values(['Sensor', 'Calibracion'], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Ajuste del modelo físico FSR + amplificador (K, n, VREF, R_s) a las calibraciones.')
+    parser.add_argument('--data-dir', '-d', default='Data', help='Directorio raíz de datos')
+    parser.add_argument('--output-dir', '-o', default='Processed', help='Directorio de salida')
+    parser.add_argument('--rf', type=float, default=R_FEEDBACK, help='R_feedback usada al calibrar (Ω)')
+    parser.add_argument('--new-rf', type=float, help='Predice Vout en el rango calibrado con otra R_feedback (Ω)')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='Procesos en paralelo')
+    args = parser.parse_args()
+
+    table = fit_all(args.data_dir, args.rf, args.jobs,
+                    progress=lambda i, n, p: print(f"[{i}/{n}] {p}"))
+    if table.empty:
+        print("No hay calibraciones.")
+        return
+    os.makedirs(args.output_dir, exist_ok=True)
+    out = os.path.join(args.output_dir, RESULTS_FILE)
+    table.to_csv(out, index=False)
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    print(f"Parámetros guardados en {out}")
+
+    if args.new_rf:
+        pesos = np.array([250.0, 1000.0, 4000.0])
+        print(f"\nVout previsto con R_feedback = {args.new_rf:.0f} Ω (pesos {pesos.tolist()} g):")
+        for _, row in table.dropna(subset=['K_FSR_ohm']).iterrows():
+            if not row['Valido']:
+                print(f"  {row['Calibracion']}: ajuste no válido, se omite")
+                continue
+            v = predict_voltage(row, pesos, args.new_rf)
+            print(f"  {row['Calibracion']}: " + ", ".join(f"{x:.3f} V" for x in v))
+
+
+if __name__ == '__main__':
+    main()
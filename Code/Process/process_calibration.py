@@ -1,11 +1,42 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import argparse
 import os
+import re
 import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def process_file(csv_path, output_dir):
+try:
+    from Process.fitting import fit_models, results_table, save_model, predict
+    from Process.timing import read_timestamps, timing_stats
+    from Process.uncertainty import calibration_uncertainty
+except ImportError:  # ejecución directa desde Code/Process
+    from fitting import fit_models, results_table, save_model, predict
+    from timing import read_timestamps, timing_stats
+    from uncertainty import calibration_uncertainty
+
+class ProcessingCancelled(Exception):
+    """Procesamiento interrumpido a petición del usuario."""
+
+
+def _checkpoint(progress, cancel, pct, msg):
+    # Punto de control entre etapas: reporta avance y atiende la cancelación
+    if cancel is not None and cancel.is_set():
+        raise ProcessingCancelled(msg)
+    if progress:
+        progress(pct, msg)
+
+
+def analyze_file(csv_path, output_dir, progress=None, cancel=None):
+    """
+    Etapa numérica: propiedades estáticas, regresión y selección de modelo.
+    Escribe properties/coeffs/models y devuelve (props_df, fit) donde `fit`
+    contiene lo necesario para render_regression.
+    `progress(pct, msg)` y `cancel` (threading.Event) son opcionales.
+    """
+    _checkpoint(progress, cancel, 5, "Cargando datos")
     # Leer datos
     df = pd.read_csv(csv_path)
     if not {'Peso_g', 'Lectura'}.issubset(df.columns):
@@ -47,9 +78,19 @@ def process_file(csv_path, output_dir):
     ss_tot = np.sum((y - np.mean(y)) ** 2)
     r2 = (1 - ss_res / ss_tot).round(4) if ss_tot else np.nan
 
+    # Selección de modelo entre todos los candidatos (R², RMSE y k-fold)
+    _checkpoint(progress, cancel, 30, "Ajustando modelos")
+    modelos, mejor = fit_models(pesos.values, y)
+    best = modelos[mejor]
+
+    # Intervalos bootstrap de a, b, c y banda de predicción de la fuerza
+    _checkpoint(progress, cancel, 40, "Calculando intervalos de confianza")
+    incert, banda, extra = calibration_uncertainty(pesos.values, y, best)
+
     # Ecuación de sensibilidad: dV/dP = (2a ln(P) + b) / P
     sens_eq = f"S(P) = (2*{a:.6f}*ln(P) + {b:.6f}) / P"
 
+    _checkpoint(progress, cancel, 50, "Guardando propiedades")
     # Guardar propiedades globales en CSV
     base = os.path.splitext(os.path.basename(csv_path))[0]
     props = {
@@ -63,8 +104,19 @@ def process_file(csv_path, output_dir):
         'Resolucion_V_per_g': [resol],
         'R2_regresion': [r2],
         'Sensibilidad_eq': [sens_eq],
-        'Ecuacion_regresion': [f"V = {a:.6f}(ln(P))² + {b:.6f}ln(P) + {c:.6f}"]
+        'Ecuacion_regresion': [f"V = {a:.6f}(ln(P))² + {b:.6f}ln(P) + {c:.6f}"],
+        'Modelo_optimo': [mejor],
+        'RMSE_V': [round(best['RMSE_V'], 5)],
+        'CV_RMSE_V': [round(best['CV_RMSE_V'], 5)],
+        'Ecuacion_modelo_optimo': [best['equation']]
     }
+    props.update({k: [v] for k, v in incert.items()})
+    # Tasa efectiva y jitter (solo archivos con marcas de tiempo)
+    tiempos = read_timestamps(df)
+    if tiempos is not None:
+        stats = timing_stats(tiempos)
+        props['Tasa_Hz'] = [stats['Tasa_Hz']]
+        props['Jitter_ms'] = [stats['Jitter_ms']]
     props_df = pd.DataFrame(props)
     props_file = os.path.join(output_dir, f"{base}_properties.csv")
     props_df.to_csv(props_file, index=False)
@@ -83,32 +135,76 @@ def process_file(csv_path, output_dir):
         f.write(f"  {sens_eq}\n")
     print(f"Guardados coeficientes, R^2 y sensibilidad en {coef_file}")
 
+    # Guardar comparación de modelos y el modelo óptimo (con su inversa)
+    models_file = os.path.join(output_dir, f"{base}_models.csv")
+    pd.DataFrame(results_table(modelos, mejor)).to_csv(models_file, index=False)
+    save_model(os.path.join(output_dir, f"{base}_model.json"), best, (min_p, max_p))
+    print(f"Comparación de modelos guardada en {models_file} (óptimo: {mejor})")
+
+    band_file = os.path.join(output_dir, f"{base}_band.csv")
+    banda.round(3).to_csv(band_file, index=False)
+    print(f"Banda de fuerza (IC 95%) guardada en {band_file}")
+
+    fit = {'base': base, 'x': x, 'y': y, 'coeffs': (a, b, c), 'r2': r2,
+           'mejor': mejor, 'best': best, 'band': extra}
+    _checkpoint(progress, cancel, 60, "Propiedades listas")
+    return props_df, fit
+
+
+def render_regression(fit, output_dir, progress=None, cancel=None):
+    """
+    Etapa gráfica: curva característica en PNG. Usa la API orientada a
+    objetos de matplotlib (sin pyplot), por lo que es segura fuera del hilo de la GUI.
+    """
+    _checkpoint(progress, cancel, 70, "Renderizando gráfica")
+    base, x, y = fit['base'], fit['x'], fit['y']
+    a, b, c = fit['coeffs']
+    r2, mejor, best = fit['r2'], fit['mejor'], fit['best']
+
     # Graficar regresión (con ecuación)
     xs = np.linspace(x.min(), x.max(), 200)
     ys = a*xs**2 + b*xs + c
-    plt.figure(figsize=(8, 6))
+    fig = Figure(figsize=(8, 6))
+    ax = fig.add_subplot(111)
     
     # Scatter plot
-    plt.scatter(x, y, label='Datos', alpha=0.6)
+    ax.scatter(x, y, label='Datos', alpha=0.6)
+
+    # Banda de confianza bootstrap del ajuste cuadrático
+    band = fit.get('band')
+    if band is not None:
+        ax.fill_between(np.log(band['P_grid']), band['V_band'][0], band['V_band'][1],
+                        color='r', alpha=0.2, label='IC 95% (bootstrap)')
     
     # Regression line
-    plt.plot(xs, ys, 'r-', label=f'Ajuste cuadrático (R²={r2:.4f})', linewidth=2)
+    ax.plot(xs, ys, 'r-', label=f'Ajuste cuadrático (R²={r2:.4f})', linewidth=2)
+    if mejor != 'log_quad':
+        ax.plot(xs, predict(mejor, best['coeffs'], np.exp(xs)), 'g--',
+                label=f"Modelo {mejor} (R²={best['R2']:.4f})", linewidth=2)
     
     # Add equation annotation
     eq_text = f"$V = {a:.4f}(\\ln P)^2 + {b:.4f}\\ln P + {c:.4f}$"
-    plt.annotate(eq_text, xy=(0.05, 0.95), xycoords='axes fraction',
+    ax.annotate(eq_text, xy=(0.05, 0.95), xycoords='axes fraction',
                 fontsize=12, bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="gray", alpha=0.8))
     
-    plt.xlabel('ln(Peso_g)', fontsize=12)
-    plt.ylabel('Voltaje (V)', fontsize=12)
-    plt.title(f'Curva Característica: {base}', fontsize=14)
-    plt.legend(loc='best')
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
+    ax.set_xlabel('ln(Peso_g)', fontsize=12)
+    ax.set_ylabel('Voltaje (V)', fontsize=12)
+    ax.set_title(f'Curva Característica: {base}', fontsize=14)
+    ax.legend(loc='best')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
     
+    _checkpoint(progress, cancel, 90, "Guardando gráfica")
     plot_file = os.path.join(output_dir, f"{base}_regression.png")
-    plt.savefig(plot_file, dpi=150)
-    plt.close()
+    fig.savefig(plot_file, dpi=150)
+    if progress:
+        progress(100, "Reporte completo")
+    return plot_file
+
+
+def process_file(csv_path, output_dir, progress=None, cancel=None):
+    props_df, fit = analyze_file(csv_path, output_dir, progress, cancel)
+    plot_file = render_regression(fit, output_dir, progress, cancel)
 
     # ———> DEVUELVO lo que me interesa para el reporte on‑the‑fly:
     # 1) el DataFrame de propiedades
@@ -116,20 +212,129 @@ def process_file(csv_path, output_dir):
     return props_df, plot_file
 
 
-def process_all(data_dir, output_dir):
+# Sufijos de los archivos que genera process_file para cada calibración
+OUTPUT_SUFFIXES = ('_properties.csv', '_coeffs.txt', '_models.csv', '_model.json', '_band.csv',
+                   '_regression.png')
+
+# Módulos de análisis: si cambian, todos los reportes quedan desactualizados
+_ANALYSIS_MODULES = [os.path.abspath(__file__),
+                     os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fitting.py'),
+                     os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uncertainty.py')]
+
+
+# Calibraciones en data_dir: sensorN/calibracion_sensorN_k.csv. Otras carpetas
+# de Data (p. ej. los segmentos de operación) y sus CSV no son calibraciones.
+SENSOR_FOLDER = re.compile(r"^sensor(\d+)$")
+CALIBRATION_FILE = re.compile(r"^calibracion_sensor(\d+)_(\d+)\.csv$")
+
+
+def calibration_index(fname, sensor=None):
+    """Número de corrida k de calibracion_sensorN_k.csv (del sensor dado, si se indica), o None."""
+    m = CALIBRATION_FILE.match(fname)
+    if m is None or (sensor is not None and m.group(1) != str(sensor)):
+        return None
+    return int(m.group(2))
+
+
+def calibration_files(data_dir):
+    """Pares (carpeta del sensor, csv) de todas las calibraciones, en orden numérico de sensor y corrida."""
+    found = []
     if not os.path.isdir(data_dir):
-        print(f"Error: No existe el directorio de datos: {data_dir}")
-        sys.exit(1)
-    os.makedirs(output_dir, exist_ok=True)
-    for sensor_folder in sorted(os.listdir(data_dir)):
+        return found
+    for sensor_folder in os.listdir(data_dir):
+        m = SENSOR_FOLDER.match(sensor_folder)
         sensor_path = os.path.join(data_dir, sensor_folder)
-        if not os.path.isdir(sensor_path):
+        if m is None or not os.path.isdir(sensor_path):
             continue
+        for fname in os.listdir(sensor_path):
+            k = calibration_index(fname, m.group(1))
+            if k is not None:
+                found.append(((int(m.group(1)), k), sensor_folder, os.path.join(sensor_path, fname)))
+    return [(sensor_folder, path) for _, sensor_folder, path in sorted(found)]
+
+
+def list_jobs(data_dir, output_dir):
+    """Pares (csv, carpeta de salida) de todas las calibraciones en data_dir."""
+    return [(path, os.path.join(output_dir, sensor_folder))
+            for sensor_folder, path in calibration_files(data_dir)]
+
+
+def is_stale(csv_path, output_dir):
+    """True si falta algún resultado o es más antiguo que el CSV o que el código de análisis."""
+    base = os.path.splitext(os.path.basename(csv_path))[0]
+    try:
+        out_mtime = min(os.path.getmtime(os.path.join(output_dir, base + s)) for s in OUTPUT_SUFFIXES)
+    except OSError:
+        return True
+    ref = max([os.path.getmtime(csv_path)] + [os.path.getmtime(m) for m in _ANALYSIS_MODULES if os.path.exists(m)])
+    return out_mtime < ref
+
+
+def find_stale(data_dir, output_dir):
+    return [job for job in list_jobs(data_dir, output_dir) if is_stale(*job)]
+
+
+def _process_job(csv_path, output_dir):
+    # Tarea de proceso hijo: sin gráfica en pantalla, solo archivos
+    os.makedirs(output_dir, exist_ok=True)
+    props_df, _ = process_file(csv_path, output_dir)
+    return props_df
+
+
+def process_many(jobs, workers=None, progress=None, cancel=None):
+    """
+    Procesa varias calibraciones en paralelo (un proceso por núcleo).
+    Devuelve {csv: props_df} y {csv: mensaje de error}; un archivo con
+    errores no detiene al resto. `progress(hechos, total, csv)` es opcional.
+    """
+    results, errors = {}, {}
+    if not jobs:
+        return results, errors
+    # 'spawn': se llama desde hilos de la GUI, y hacer fork de un proceso Qt multihilo puede bloquearse
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {pool.submit(_process_job, csv_path, out): csv_path for csv_path, out in jobs}
+        for done, fut in enumerate(as_completed(futures), 1):
+            csv_path = futures[fut]
+            try:
+                results[csv_path] = fut.result()
+            except Exception as e:
+                errors[csv_path] = str(e)
+            if progress:
+                progress(done, len(jobs), csv_path)
+            if cancel is not None and cancel.is_set():
+                for f in futures:
+                    f.cancel()
+                break
+    return results, errors
+
+
+def summary_table(output_dir):
+    """Propiedades de todas las calibraciones procesadas, una fila por archivo."""
+    frames = []
+    for sensor_folder in sorted(os.listdir(output_dir)) if os.path.isdir(output_dir) else []:
         sensor_out = os.path.join(output_dir, sensor_folder)
-        os.makedirs(sensor_out, exist_ok=True)
-        for fname in sorted(os.listdir(sensor_path)):
-            if fname.lower().endswith('.csv'):
-                process_file(os.path.join(sensor_path, fname), sensor_out)
+        if not os.path.isdir(sensor_out):
+            continue
+        for fname in sorted(os.listdir(sensor_out)):
+            if fname.endswith('_properties.csv'):
+                df = pd.read_csv(os.path.join(sensor_out, fname))
+                df.insert(0, 'Calibracion', fname[:-len('_properties.csv')])
+                df.insert(0, 'Sensor', sensor_folder)
+                frames.append(df)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def process_all(data_dir, output_dir, only_stale=False, workers=None):
+    if not os.path.isdir(data_dir):
+        print(f"Error: No existe el directorio de datos: {data_dir}")
+        sys.exit(1)
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = find_stale(data_dir, output_dir) if only_stale else list_jobs(data_dir, output_dir)
+    print(f"{len(jobs)} calibraciones por procesar")
+    _, errors = process_many(jobs, workers,
+                             progress=lambda i, n, p: print(f"[{i}/{n}] {p}"))
+    for csv_path, msg in errors.items():
+        print(f"Error procesando {csv_path}: {msg}")
 
 
 def main():
@@ -137,8 +342,11 @@ def main():
         description='Procesa datos de calibración: propiedades estáticas, regresión y sensibilidad.')
     parser.add_argument('--data-dir', '-d', default='Data', help='Directorio raíz de datos')
     parser.add_argument('--output-dir', '-o', default='Processed', help='Directorio de salida')
+    parser.add_argument('--stale', '-s', action='store_true',
+                        help='Solo calibraciones sin resultados o con resultados desactualizados')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='Procesos en paralelo')
     args = parser.parse_args()
-    process_all(args.data_dir, args.output_dir)
+    process_all(args.data_dir, args.output_dir, args.stale, args.jobs)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,344 @@
+import argparse
+import csv
+import gzip
+import lzma
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    from Process.timing import TIME_COLUMN, SEQ_COLUMN, LEGACY_PERIOD_S
+except ImportError:  # ejecución directa desde Code/Process
+    from timing import TIME_COLUMN, SEQ_COLUMN, LEGACY_PERIOD_S
+
+MANIFEST = 'manifest.csv'
+MANIFEST_FIELDS = ['Sesion', 'Segmento', 'Archivo', 'Origen', 'Inicio', 'Fin', 'Filas', 'Bytes', 'Estado']
+# Estados de un segmento
+ABIERTO, CERRADO, COMPRIMIDO = 'abierto', 'cerrado', 'comprimido'
+CODECS = {'gz': gzip.open, 'xz': lzma.open}
+# Archivo único de operación de versiones anteriores (junto a la carpeta de
+# segmentos); al importarlo se renombra con este sufijo
+LEGACY_CSV = 'operacion.csv'
+IMPORTED_SUFFIX = '.importado'
+
+
+def _write_manifest(root, entries):
+    # Escritura atómica: nunca queda un manifiesto a medias
+    tmp = os.path.join(root, MANIFEST + '.tmp')
+    with open(tmp, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+        writer.writeheader()
+        writer.writerows(entries)
+    os.replace(tmp, os.path.join(root, MANIFEST))
+
+
+def _read_manifest_rows(root):
+    path = os.path.join(root, MANIFEST)
+    if not os.path.exists(path):
+        return []
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def compress_segment(path, codec='gz'):
+    """Comprime un segmento cerrado y borra el original; devuelve la ruta nueva."""
+    out = f"{path}.{codec}"
+    tmp = out + '.tmp'
+    with open(path, 'rb') as src, CODECS[codec](tmp, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    os.replace(tmp, out)
+    os.remove(path)
+    return out
+
+
+class SegmentWriter:
+    """
+    Escritor de una sesión de operación en segmentos CSV dentro de `root`.
+    Rota a un segmento nuevo al superar `max_bytes` o `max_seconds` de datos;
+    los segmentos cerrados se comprimen en un hilo de fondo. El manifiesto
+    (root/manifest.csv) lista cada segmento con su rango de tiempo (epoch)
+    y número de filas. Interfaz tipo csv.writer: writerow/writerows.
+    """
+    def __init__(self, root, header, origin=None, max_bytes=8 << 20, max_seconds=600, codec='gz'):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.header = list(header)
+        self.time_index = self.header.index(TIME_COLUMN)
+        # Epoch que corresponde a T_ns = 0 de la sesión
+        self.origin = time.time() if origin is None else origin
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.codec = codec
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.pending = []
+        self.entries = _read_manifest_rows(root)
+        session = time.strftime('%Y%m%d_%H%M%S', time.localtime(self.origin))
+        taken = {e['Sesion'] for e in self.entries}
+        self.session, n = session, 1
+        while self.session in taken:  # dos sesiones en el mismo segundo
+            n += 1
+            self.session = f"{session}_{n}"
+        self.index = -1
+        self._file = None
+        self._writer = None
+        self._entry = None
+        self._open_segment()
+
+    def _open_segment(self):
+        self.index += 1
+        name = f"operacion_{self.session}_{self.index:03d}.csv"
+        self._file = open(os.path.join(self.root, name), 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.header)
+        self._entry = {'Sesion': self.session, 'Segmento': self.index, 'Archivo': name,
+                       'Origen': f"{self.origin:.6f}", 'Inicio': '', 'Fin': '',
+                       'Filas': 0, 'Bytes': 0, 'Estado': ABIERTO}
+        self._t_first = None
+        self._t_last = None
+        with self.lock:
+            self.entries.append(self._entry)
+            _write_manifest(self.root, self.entries)
+
+    def writerow(self, row):
+        self.writerows([row])
+
+    def writerows(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        self._writer.writerows(rows)
+        if self._t_first is None:
+            self._t_first = int(rows[0][self.time_index])
+        self._t_last = int(rows[-1][self.time_index])
+        self._entry['Filas'] += len(rows)
+        if (self._file.tell() >= self.max_bytes or
+                self._t_last - self._t_first >= self.max_seconds * 1e9):
+            self.rotate()
+
+    def _update_entry(self, estado):
+        entry = self._entry
+        if self._t_first is not None:
+            entry['Inicio'] = f"{self.origin + self._t_first / 1e9:.6f}"
+            entry['Fin'] = f"{self.origin + self._t_last / 1e9:.6f}"
+        entry['Bytes'] = os.path.getsize(self._file.name)
+        entry['Estado'] = estado
+        _write_manifest(self.root, self.entries)
+
+    def flush(self):
+        """Vacía el segmento y actualiza su rango en el manifiesto (legible en vivo o tras un corte)."""
+        self._file.flush()
+        with self.lock:
+            self._update_entry(ABIERTO)
+
+    def _close_segment(self):
+        self._file.close()
+        path = self._file.name
+        with self.lock:
+            entry = self._entry
+            self._update_entry(CERRADO)
+        if entry['Filas'] == 0:
+            # Segmento vacío (sesión sin datos o rotación justo al cerrar)
+            with self.lock:
+                self.entries.remove(entry)
+                _write_manifest(self.root, self.entries)
+            os.remove(path)
+            return
+        self.pending.append(self.pool.submit(self._compress, path, entry))
+
+    def _compress(self, path, entry):
+        out = compress_segment(path, self.codec)
+        with self.lock:
+            entry['Archivo'] = os.path.basename(out)
+            entry['Bytes'] = os.path.getsize(out)
+            entry['Estado'] = COMPRIMIDO
+            _write_manifest(self.root, self.entries)
+
+    def rotate(self):
+        """Cierra el segmento actual (se comprime en segundo plano) y abre otro."""
+        self._close_segment()
+        self._open_segment()
+
+    def close(self, wait=True):
+        """Cierra el último segmento; con wait=False la compresión sigue en segundo plano (ver join)."""
+        self._close_segment()
+        if wait:
+            self.join()
+
+    def join(self):
+        """Espera a que terminen las compresiones."""
+        self.pool.shutdown(wait=True)
+        for fut in self.pending:
+            fut.result()  # propaga errores de compresión
+
+
+def read_manifest(root):
+    """Manifiesto como DataFrame (vacío si no hay grabaciones)."""
+    rows = _read_manifest_rows(root)
+    df = pd.DataFrame(rows, columns=MANIFEST_FIELDS)
+    for col in ('Segmento', 'Filas', 'Bytes'):
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+    for col in ('Origen', 'Inicio', 'Fin'):
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def sessions(root):
+    """Una fila por sesión: inicio, fin, duración, filas, segmentos y bytes."""
+    df = read_manifest(root)
+    if df.empty:
+        return pd.DataFrame(columns=['Sesion', 'Inicio', 'Fin', 'Duracion_s', 'Filas', 'Segmentos', 'Bytes'])
+    g = df.groupby('Sesion', sort=True)
+    out = pd.DataFrame({
+        'Inicio': g['Inicio'].min(),
+        'Fin': g['Fin'].max(),
+        'Filas': g['Filas'].sum(),
+        'Segmentos': g['Segmento'].count(),
+        'Bytes': g['Bytes'].sum(),
+    }).reset_index()
+    out['Duracion_s'] = (out['Fin'] - out['Inicio']).round(3)
+    return out[['Sesion', 'Inicio', 'Fin', 'Duracion_s', 'Filas', 'Segmentos', 'Bytes']]
+
+
+def load_range(root, start=None, end=None, session=None):
+    """
+    Filas de operación entre `start` y `end` (epoch, s) y/o de una sesión.
+    Solo se abren (y descomprimen) los segmentos cuyo rango se solapa.
+    Agrega las columnas 'Sesion' y 'Tiempo' (epoch, s).
+    """
+    df = read_manifest(root)
+    sel = df['Filas'].fillna(0) > 0
+    if session is not None:
+        sel &= df['Sesion'] == session
+    if start is not None:
+        sel &= df['Fin'] >= start
+    if end is not None:
+        sel &= df['Inicio'] <= end
+    frames = []
+    for _, seg in df[sel].iterrows():
+        path = os.path.join(root, seg['Archivo'])
+        if not os.path.exists(path):
+            continue  # compresión en curso: el nombre cambia al terminar
+        part = pd.read_csv(path)  # .gz/.xz se detectan por la extensión
+        part['Sesion'] = seg['Sesion']
+        part['Tiempo'] = seg['Origen'] + part[TIME_COLUMN].to_numpy(dtype=float) / 1e9
+        frames.append(part)
+    if not frames:
+        return pd.DataFrame()
+    data = pd.concat(frames, ignore_index=True)
+    mask = np.ones(len(data), dtype=bool)
+    if start is not None:
+        mask &= data['Tiempo'].to_numpy() >= start
+    if end is not None:
+        mask &= data['Tiempo'].to_numpy() <= end
+    return data[mask].reset_index(drop=True)
+
+
+def latest_session(root):
+    """Identificador de la sesión más reciente, o None."""
+    s = sessions(root)
+    return None if s.empty else s['Sesion'].iloc[-1]
+
+
+def format_epoch(t):
+    """Fecha y hora local de un epoch (s), o '' si falta."""
+    return '' if pd.isna(t) else time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t))
+
+
+def legacy_path(root):
+    """Ruta del CSV de operación antiguo que corresponde a `root` (Data/operacion → Data/operacion.csv)."""
+    return os.path.join(os.path.dirname(os.path.abspath(root)), LEGACY_CSV)
+
+
+def import_legacy(root, path=None, period_s=LEGACY_PERIOD_S):
+    """
+    Importa una sola vez el CSV de operación antiguo (Sensor,Valor[,T_ns,Seq])
+    como una sesión más de `root`, y lo renombra a <csv>.importado para no
+    repetirlo. Las filas sin T_ns (archivos anteriores al reloj de sesión)
+    o con el reloj reiniciado por varias sesiones anexadas reciben un
+    tiempo sintético: un frame por grupo de sensores, cada `period_s` (el
+    del modo texto del firmware, no el de la operación rápida). El
+    origen es la fecha de modificación del archivo (fin de la grabación).
+    Devuelve el identificador de la sesión creada, o None si no había nada que importar.
+    """
+    path = legacy_path(root) if path is None else path
+    if not os.path.exists(path):
+        return None
+    data = pd.read_csv(path)
+    if data.empty:
+        os.replace(path, path + IMPORTED_SUFFIX)
+        return None
+    if 'Sensor' not in data.columns or 'Valor' not in data.columns:
+        raise ValueError(f"{path}: se esperaban las columnas Sensor y Valor")
+    sensor = data['Sensor'].to_numpy(dtype=int)
+    t_ns = (pd.to_numeric(data[TIME_COLUMN], errors='coerce').to_numpy()
+            if TIME_COLUMN in data.columns else np.full(len(data), np.nan))
+    if np.isnan(t_ns).any() or (np.diff(t_ns) < 0).any():
+        # Nuevo frame cada vez que el canal no avanza (0,1,2,3,0,1,...)
+        frame = np.concatenate([[0], np.cumsum(np.diff(sensor) <= 0)])
+        t_ns = frame * int(round(period_s * 1e9))
+    else:
+        t_ns = t_ns.astype(np.int64)
+    seq = (pd.to_numeric(data[SEQ_COLUMN], errors='coerce').to_numpy()
+           if SEQ_COLUMN in data.columns else np.full(len(data), np.nan))
+    origin = os.path.getmtime(path) - t_ns[-1] / 1e9
+    writer = SegmentWriter(root, ['Sensor', 'Valor', TIME_COLUMN, SEQ_COLUMN], origin)
+    writer.writerows(zip(sensor, data['Valor'].map('{:.2f}'.format), t_ns,
+                         ['' if np.isnan(s) else int(s) for s in seq]))
+    writer.close()
+    os.replace(path, path + IMPORTED_SUFFIX)
+    return writer.session
+
+
+def compress_leftovers(root, codec='gz'):
+    """
+    Comprime segmentos que quedaron sin comprimir (p. ej. tras un corte).
+    No debe usarse mientras hay una grabación en curso.
+    """
+    entries = _read_manifest_rows(root)
+    done = []
+    for entry in entries:
+        path = os.path.join(root, entry['Archivo'])
+        if entry['Estado'] != COMPRIMIDO and path.endswith('.csv') and os.path.exists(path):
+            out = compress_segment(path, codec)
+            entry['Archivo'] = os.path.basename(out)
+            entry['Bytes'] = os.path.getsize(out)
+            entry['Estado'] = COMPRIMIDO
+            done.append(out)
+    if done:
+        _write_manifest(root, entries)
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Sesiones de operación grabadas en segmentos comprimidos.')
+    parser.add_argument('--root', '-d', default=os.path.join('Data', 'operacion'),
+                        help='Directorio de segmentos y manifiesto')
+    parser.add_argument('--compress', action='store_true',
+                        help='Comprime segmentos pendientes de sesiones interrumpidas '
+                             '(sin grabación en curso)')
+    args = parser.parse_args()
+
+    sesion = import_legacy(args.root)
+    if sesion:
+        print(f"Importado {LEGACY_CSV} antiguo como sesión {sesion}")
+    if args.compress:
+        for path in compress_leftovers(args.root):
+            print(f"Comprimido {path}")
+    table = sessions(args.root)
+    if table.empty:
+        print("No hay sesiones grabadas.")
+        return
+    for col in ('Inicio', 'Fin'):
+        table[col] = [format_epoch(t) for t in table[col]]
+    print(table.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
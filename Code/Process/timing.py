@@ -0,0 +1,118 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+# Columna de marca de tiempo: ns (int64) desde el inicio de la sesión
+TIME_COLUMN = 'T_ns'
+# Secuencia uint16 del frame (operación), vacía si el firmware no la envía
+SEQ_COLUMN = 'Seq'
+SEQ_MODULO = 1 << 16
+# Periodo de un frame de operación en modo texto ('o' de Com_Protocol_v1):
+# 4 × 10 ms de asentamiento + delay(500). Calibracion_Multiplex era aún más lento
+LEGACY_PERIOD_S = 0.54
+
+
+class SessionClock:
+    """Reloj monotónico de sesión: marcas en ns relativas al inicio."""
+    def __init__(self):
+        self.t0 = time.monotonic_ns()
+
+    def stamp(self):
+        return time.monotonic_ns() - self.t0
+
+
+def timing_stats(t_ns):
+    """Tasa efectiva y jitter de una secuencia de marcas de tiempo (ns)."""
+    t = np.asarray(t_ns, dtype=np.int64)
+    n = len(t)
+    if n < 2:
+        return {'Muestras': n, 'Duracion_s': 0.0, 'Tasa_Hz': np.nan,
+                'Periodo_ms': np.nan, 'Jitter_ms': np.nan, 'Max_gap_ms': np.nan}
+    dt_ms = np.diff(t) / 1e6
+    dur_s = (t[-1] - t[0]) / 1e9
+    return {
+        'Muestras': n,
+        'Duracion_s': round(float(dur_s), 3),
+        'Tasa_Hz': round(float((n - 1) / dur_s), 3) if dur_s > 0 else np.nan,
+        'Periodo_ms': round(float(np.median(dt_ms)), 3),
+        'Jitter_ms': round(float(dt_ms.std()), 3),
+        'Max_gap_ms': round(float(dt_ms.max()), 3),
+    }
+
+
+def loss_stats(seq):
+    """Frames esperados, perdidos y fuera de orden de una secuencia uint16 con vuelta a cero."""
+    s = np.asarray(seq, dtype=np.int64)
+    if len(s) == 0:
+        return {'Esperados': 0, 'Perdidos': 0, 'Reordenados': 0, 'Perdida_pct': np.nan}
+    # Deltas con signo módulo 2^16 → secuencia extendida
+    d = (np.diff(s) + SEQ_MODULO // 2) % SEQ_MODULO - SEQ_MODULO // 2
+    ext = np.concatenate([[0], np.cumsum(d)])
+    esperados = int(ext.max() - ext.min() + 1)
+    perdidos = esperados - len(np.unique(ext))
+    return {
+        'Esperados': esperados,
+        'Perdidos': perdidos,
+        'Reordenados': int(np.count_nonzero(d < 0)),
+        'Perdida_pct': round(100.0 * perdidos / esperados, 3),
+    }
+
+
+def split_sessions(t_ns):
+    """Índices de inicio de cada sesión (el reloj vuelve a cero en cada una)."""
+    t = np.asarray(t_ns, dtype=np.int64)
+    return np.concatenate([[0], np.flatnonzero(np.diff(t) < 0) + 1])
+
+
+def read_timestamps(df):
+    """Marcas de tiempo válidas de un DataFrame, o None si el archivo no tiene tiempo."""
+    if TIME_COLUMN not in df.columns:
+        return None
+    t = df[TIME_COLUMN].dropna()
+    if t.empty:
+        return None
+    return t.astype(np.int64).values
+
+
+def session_report(csv_path):
+    """Tasa y jitter por sesión de un CSV de operación o calibración."""
+    df = pd.read_csv(csv_path)
+    t = read_timestamps(df)
+    if t is None:
+        return pd.DataFrame()
+    columns = ['Sesion', 'Muestras', 'Duracion_s', 'Tasa_Hz', 'Periodo_ms', 'Jitter_ms', 'Max_gap_ms']
+    seq = None
+    if SEQ_COLUMN in df.columns:
+        seq = df.loc[df[TIME_COLUMN].notna(), SEQ_COLUMN].to_numpy(dtype=float)
+        columns += ['Esperados', 'Perdidos', 'Reordenados', 'Perdida_pct']
+    starts = split_sessions(t)
+    bounds = np.append(starts, len(t))
+    rows = []
+    for i, (a, b) in enumerate(zip(bounds[:-1], bounds[1:]), 1):
+        stats = timing_stats(t[a:b])
+        stats['Sesion'] = i
+        if seq is not None:
+            s = seq[a:b]
+            s = s[~np.isnan(s)]
+            # Un frame de 4 canales ocupa 4 filas con la misma secuencia
+            s = s[np.concatenate([[True], np.diff(s) != 0])] if len(s) else s
+            stats.update(loss_stats(s))
+        rows.append(stats)
+    return pd.DataFrame(rows, columns=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Tasa efectiva y jitter por sesión de un CSV con marcas de tiempo.')
+    parser.add_argument('csv', help='CSV de operación o calibración')
+    args = parser.parse_args()
+    report = session_report(args.csv)
+    if report.empty:
+        print("El archivo no contiene marcas de tiempo.")
+    else:
+        print(report.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+import argparse
+import time
+import warnings
+import numpy as np
+import pandas as pd
+
+try:
+    from Process.fitting import MODELS, _batched_fit
+except ImportError:  # ejecución directa desde Code/Process
+    from fitting import MODELS, _batched_fit
+
+N_BOOT = 2000
+LEVEL = 0.95
+# Voltajes en los que se evalúa la banda de fuerza
+BAND_POINTS = 200
+
+
+def resample_weights(P, n_boot=N_BOOT, method='bootstrap', seed=0):
+    """
+    Matriz (B × n) de pesos de remuestreo. 'bootstrap' remuestrea con
+    reemplazo dentro de cada grupo de peso (el peso de una muestra es el
+    número de veces que sale); 'jackknife' deja fuera una muestra por fila.
+    Ajustar con estos pesos equivale a apilar B matrices de diseño remuestreadas.
+    Un grupo de una sola muestra no varía en el bootstrap (ver resampling_method).
+    """
+    P = np.asarray(P, dtype=float)
+    n = len(P)
+    if method == 'jackknife':
+        return 1.0 - np.eye(n)
+    rng = np.random.default_rng(seed)
+    weights = np.zeros((n_boot, n))
+    # Un sorteo multinomial por grupo cubre todas las réplicas a la vez
+    for peso in np.unique(P):
+        idx = np.flatnonzero(P == peso)
+        weights[:, idx] = rng.multinomial(len(idx), np.full(len(idx), 1.0 / len(idx)), size=n_boot)
+    return weights
+
+
+def resampling_method(P, method='bootstrap'):
+    """
+    Método de remuestreo utilizable con estos pesos. Con alguna muestra
+    única por peso el bootstrap por grupos repite siempre los mismos datos
+    y da intervalos de ancho cero: se pasa al jackknife con un aviso.
+    """
+    if method != 'bootstrap':
+        return method
+    _, counts = np.unique(np.asarray(P, dtype=float), return_counts=True)
+    if counts.min() < 2:
+        warnings.warn(f"{int((counts < 2).sum())} de {len(counts)} pesos con una sola muestra: "
+                      "el bootstrap por grupos no varía, se usa jackknife")
+        return 'jackknife'
+    return method
+
+
+def resampled_coeffs(P, V, model_name, weights):
+    """Coeficientes de cada réplica (B × p) en una sola resolución por lotes."""
+    model = MODELS[model_name]
+    P = np.asarray(P, dtype=float)
+    V = np.asarray(V, dtype=float)
+    return _batched_fit(model.design(P, V), model.target(V), weights)
+
+
+def coef_intervals(samples, level=LEVEL, method='bootstrap', full=None):
+    """
+    Intervalos (inferior, superior) por coeficiente. Bootstrap: percentiles.
+    Jackknife: ± z·error estándar alrededor del ajuste completo `full`.
+    """
+    samples = np.asarray(samples)
+    alpha = (1 - level) / 2
+    if method == 'jackknife':
+        n = len(samples)
+        se = np.sqrt((n - 1) / n * np.sum((samples - samples.mean(axis=0)) ** 2, axis=0))
+        z = {0.9: 1.645, 0.95: 1.96, 0.99: 2.576}.get(level, 1.96)
+        center = samples.mean(axis=0) if full is None else np.asarray(full)
+        return center - z * se, center + z * se
+    lo, hi = np.nanpercentile(samples, [100 * alpha, 100 * (1 - alpha)], axis=0)
+    return lo, hi
+
+
+def force_band(model_name, samples, residuals, v_grid, p_max, level=LEVEL, seed=0):
+    """
+    Bandas de la fuerza estimada (g) sobre `v_grid` (V), invirtiendo todas
+    las réplicas a la vez: 'confianza' (incertidumbre de la curva) y
+    'prediccion' (además un residuo remuestreado por réplica y voltaje).
+    Las estimaciones se acotan a [0, 2·p_max]: fuera del rango calibrado la
+    inversa no tiene sentido (y en sensores sin respuesta diverge).
+    Devuelve un DataFrame con Voltaje, P_med, IC_inf/sup y Pred_inf/sup.
+    """
+    model = MODELS[model_name]
+    k = np.asarray(samples).T[..., None]  # (p, B, 1): cada coeficiente en lote
+    rng = np.random.default_rng(seed)
+    noise = rng.choice(np.asarray(residuals, dtype=float), size=(k.shape[1], len(v_grid)))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        curve = np.clip(model.inverse(k, v_grid[None, :]), 0, 2 * p_max)
+        pred = np.clip(model.inverse(k, v_grid[None, :] + noise), 0, 2 * p_max)
+    alpha = 100 * (1 - level) / 2
+    ci = np.nanpercentile(curve, [alpha, 50, 100 - alpha], axis=0)
+    pi = np.nanpercentile(pred, [alpha, 100 - alpha], axis=0)
+    return pd.DataFrame({'Voltaje': v_grid, 'P_med_g': ci[1],
+                         'IC_inf_g': ci[0], 'IC_sup_g': ci[2],
+                         'Pred_inf_g': pi[0], 'Pred_sup_g': pi[1]})
+
+
+def curve_band(model_name, samples, P_grid, level=LEVEL):
+    """Banda de confianza del voltaje predicho V(P) sobre `P_grid` (para la gráfica)."""
+    model = MODELS[model_name]
+    k = np.asarray(samples).T[..., None]
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        V = model.predict(k, P_grid[None, :])
+    alpha = 100 * (1 - level) / 2
+    return np.nanpercentile(V, [alpha, 100 - alpha], axis=0)
+
+
+def calibration_uncertainty(P, V, best, n_boot=N_BOOT, method='bootstrap', level=LEVEL, seed=0):
+    """
+    Incertidumbre de una calibración: intervalos de a, b, c del modelo
+    histórico (log_quad) y banda de fuerza del modelo óptimo `best`
+    (resultado de fit_models). Devuelve (props, band, extra) donde props
+    son columnas para el CSV de propiedades.
+    """
+    P = np.asarray(P, dtype=float)
+    V = np.asarray(V, dtype=float)
+    method = resampling_method(P, method)
+    weights = resample_weights(P, n_boot, method, seed)
+    tag = f"IC{int(level * 100)}"
+    props = {'Remuestreo': f"{method} ({len(weights)})"}
+
+    quad = resampled_coeffs(P, V, 'log_quad', weights)
+    full = resampled_coeffs(P, V, 'log_quad', np.ones((1, len(P))))[0]
+    lo, hi = coef_intervals(quad, level, method, full)
+    for name, l, h in zip('abc', lo, hi):
+        props[f'{name}_{tag}_inf'] = round(float(l), 6)
+        props[f'{name}_{tag}_sup'] = round(float(h), 6)
+
+    name = best['model']
+    samples = quad if name == 'log_quad' else resampled_coeffs(P, V, name, weights)
+    residuals = V - MODELS[name].predict(np.asarray(best['coeffs']), P)
+    v_lo, v_hi = np.percentile(V, [1, 99])
+    band = force_band(name, samples, residuals, np.linspace(v_lo, v_hi, BAND_POINTS), P.max(), level, seed)
+    half = (band['Pred_sup_g'] - band['Pred_inf_g']) / 2
+    props[f'Banda_pred_{tag}_g'] = round(float(np.nanmedian(half)), 2)
+    props[f'Banda_pred_{tag}_max_g'] = round(float(np.nanmax(half)), 2)
+
+    P_grid = np.exp(np.linspace(np.log(P.min()), np.log(P.max()), BAND_POINTS))
+    extra = {'P_grid': P_grid, 'V_band': curve_band('log_quad', quad, P_grid, level)}
+    return props, band, extra
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Intervalos bootstrap/jackknife de una calibración y tiempo de cálculo.')
+    parser.add_argument('csv', help='CSV de calibración (Peso_g, Lectura)')
+    parser.add_argument('--boot', '-b', type=int, default=N_BOOT, help='Número de réplicas')
+    parser.add_argument('--method', '-m', choices=['bootstrap', 'jackknife'], default='bootstrap')
+    args = parser.parse_args()
+
+    try:
+        from Process.fitting import fit_models
+    except ImportError:
+        from fitting import fit_models
+    df = pd.read_csv(args.csv)
+    P = df['Peso_g'].to_numpy(dtype=float)
+    V = (df['Lectura'] * (3.3 / 1023.0)).round(3).to_numpy()
+    results, mejor = fit_models(P, V)
+    t = time.perf_counter()
+    props, band, _ = calibration_uncertainty(P, V, results[mejor], args.boot, args.method)
+    dt = time.perf_counter() - t
+    for k, v in props.items():
+        print(f"{k:24s} {v}")
+    print(f"Modelo de la banda: {mejor}; {dt * 1e3:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
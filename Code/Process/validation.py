@@ -0,0 +1,175 @@
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+try:
+    from Process.fitting import fit_models, invert, load_model
+    from Process.process_calibration import calibration_files
+except ImportError:  # ejecución directa desde Code/Process
+    from fitting import fit_models, invert, load_model
+    from process_calibration import calibration_files
+
+# Archivos de validación por sensor (en la carpeta de salida del sensor)
+CROSS_FILE = 'validacion_cruzada.csv'
+MATRIX_FILE = 'validacion_matriz_rmse.csv'
+
+
+def read_calibration(csv_path):
+    """Pesos (g) y voltajes (V) de un CSV de calibración, con la misma conversión que process_file."""
+    df = pd.read_csv(csv_path)
+    if not {'Peso_g', 'Lectura'}.issubset(df.columns):
+        raise ValueError(f"El CSV {csv_path} debe contener las columnas 'Peso_g' y 'Lectura'.")
+    P = df['Peso_g'].to_numpy(dtype=float)
+    V = (df['Lectura'] * (3.3 / 1023.0)).round(3).to_numpy()
+    return P, V
+
+
+def calibration_model(csv_path, output_dir=None):
+    """
+    Modelo óptimo de una calibración: el {base}_model.json de output_dir si
+    existe y es más reciente que el CSV; si no, se ajusta en el momento.
+    """
+    base = os.path.splitext(os.path.basename(csv_path))[0]
+    if output_dir:
+        path = os.path.join(output_dir, f"{base}_model.json")
+        if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(csv_path):
+            return load_model(path)
+    P, V = read_calibration(csv_path)
+    results, mejor = fit_models(P, V)
+    model = dict(results[mejor])
+    model['Rango_g'] = [float(P.min()), float(P.max())]
+    return model
+
+
+def validate(model, P, V):
+    """
+    Error en gramos del modelo sobre datos no usados en el ajuste: invierte
+    todos los voltajes a la vez y compara con el peso aplicado. Devuelve
+    (resumen, tabla por peso). Las muestras sin inversa válida (fuera del
+    dominio del modelo) se cuentan en No_invertibles y no entran en el error.
+    Como en la banda de fuerza, las estimaciones se acotan a [0, 2·Pmax]
+    del rango calibrado (Acotadas): en sensores sin respuesta la inversa diverge.
+    """
+    P = np.asarray(P, dtype=float)
+    lo, hi = model.get('Rango_g', (P.min(), P.max()))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        est = np.asarray(invert(model['model'], model['coeffs'], V), dtype=float)
+    fuera = (est < 0) | (est > 2 * hi)
+    est = np.clip(est, 0, 2 * hi)
+    err = est - P
+    ok = np.isfinite(err)
+    summary = {
+        'N': int(len(P)),
+        'No_invertibles': int((~ok).sum()),
+        'Acotadas': int((fuera & ok).sum()),
+        'Fuera_rango': int(((P < lo) | (P > hi)).sum()),
+        'RMSE_g': round(float(np.sqrt(np.mean(err[ok] ** 2))), 2) if ok.any() else np.nan,
+        'Error_max_g': round(float(np.max(np.abs(err[ok]))), 2) if ok.any() else np.nan,
+        'Sesgo_g': round(float(np.mean(err[ok])), 2) if ok.any() else np.nan,
+    }
+    summary['RMSE_%FS'] = round(100 * summary['RMSE_g'] / hi, 2) if hi else np.nan
+
+    df = pd.DataFrame({'Peso_g': P[ok], 'Error_g': err[ok], 'Abs': np.abs(err[ok])})
+    g = df.groupby('Peso_g')
+    per_weight = pd.DataFrame({
+        'N': g['Error_g'].count(),
+        'Error_medio_g': g['Error_g'].mean().round(2),
+        'RMSE_g': np.sqrt(g['Error_g'].apply(lambda e: np.mean(e ** 2))).round(2),
+        'Error_max_g': g['Abs'].max().round(2),
+    }).reset_index()
+    return summary, per_weight
+
+
+def validate_pair(model_csv, test_csv, output_dir=None):
+    """Valida el modelo de la calibración `model_csv` contra la corrida `test_csv`."""
+    model = calibration_model(model_csv, output_dir)
+    return validate(model, *read_calibration(test_csv))
+
+
+def _row_job(model_csv, test_csvs, output_dir):
+    # Tarea de proceso hijo: un modelo contra todas las corridas del sensor
+    model = calibration_model(model_csv, output_dir)
+    rows = []
+    for test_csv in test_csvs:
+        summary, _ = validate(model, *read_calibration(test_csv))
+        rows.append({'Modelo': os.path.splitext(os.path.basename(model_csv))[0],
+                     'Prueba': os.path.splitext(os.path.basename(test_csv))[0],
+                     'Misma_corrida': model_csv == test_csv,
+                     'Modelo_optimo': model['model'], **summary})
+    return rows
+
+
+def cross_matrix(runs, output_dir=None, workers=None):
+    """
+    Validación de todos los pares (modelo de una corrida, datos de otra) de
+    un sensor, un proceso por corrida-modelo. Devuelve la tabla larga y la
+    matriz de RMSE (g) con filas = modelo y columnas = corrida de prueba;
+    la diagonal es el error dentro de la muestra, como referencia.
+    """
+    runs = sorted(runs)
+    rows = []
+    if runs:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(_row_job, r, runs, output_dir) for r in runs]
+            for fut in as_completed(futures):
+                rows.extend(fut.result())
+    long = pd.DataFrame(rows)
+    if long.empty:
+        return long, pd.DataFrame()
+    long = long.sort_values(['Modelo', 'Prueba'], ignore_index=True)
+    matrix = long.pivot(index='Modelo', columns='Prueba', values='RMSE_g')
+    return long, matrix
+
+
+def cross_validate_all(data_dir, output_dir, workers=None):
+    """Matriz de validación cruzada de cada sensor de data_dir, guardada en su carpeta de salida."""
+    out = {}
+    por_sensor = {}
+    for sensor_folder, path in calibration_files(data_dir):
+        por_sensor.setdefault(sensor_folder, []).append(path)
+    for sensor_folder, runs in por_sensor.items():
+        runs = [r for r in runs if len(pd.read_csv(r, nrows=4)) >= 4]  # corridas vacías no se ajustan
+        if not runs:
+            continue
+        sensor_out = os.path.join(output_dir, sensor_folder)
+        long, matrix = cross_matrix(runs, sensor_out, workers)
+        os.makedirs(sensor_out, exist_ok=True)
+        long.to_csv(os.path.join(sensor_out, CROSS_FILE), index=False)
+        matrix.to_csv(os.path.join(sensor_out, MATRIX_FILE))
+        out[sensor_folder] = (long, matrix)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Validación en gramos de una calibración contra otra corrida del mismo sensor.')
+    parser.add_argument('model_csv', nargs='?', help='CSV de la calibración cuyo modelo se valida')
+    parser.add_argument('test_csv', nargs='?', help='CSV de la corrida de prueba')
+    parser.add_argument('--data-dir', '-d', default='Data', help='Directorio raíz de datos')
+    parser.add_argument('--output-dir', '-o', default='Processed', help='Directorio de salida')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='Procesos en paralelo')
+    args = parser.parse_args()
+
+    if args.model_csv and args.test_csv:
+        # Usa el _model.json ya guardado para el sensor (Processed/sensorN) si está al día
+        sensor_folder = os.path.basename(os.path.dirname(os.path.abspath(args.model_csv)))
+        sensor_out = os.path.join(args.output_dir, sensor_folder)
+        summary, per_weight = validate_pair(args.model_csv, args.test_csv, sensor_out)
+        for k, v in summary.items():
+            print(f"{k:16s} {v}")
+        print(per_weight.to_string(index=False))
+        return
+
+    # Sin par explícito: matriz de todas las corridas de cada sensor
+    for sensor, (_, matrix) in cross_validate_all(args.data_dir, args.output_dir, args.jobs).items():
+        print(f"\n{sensor}: RMSE (g), filas = modelo, columnas = corrida de prueba")
+        print(matrix.to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from Process.process_calibration import is_stale, _process_job, calibration_index, SENSOR_FOLDER
+except ImportError:  # ejecución directa desde Code/Process
+    from process_calibration import is_stale, _process_job, calibration_index, SENSOR_FOLDER
+
+
+class CalibrationWatcher:
+    """
+    Vigila data_dir/sensorN/calibracion_sensorN_k.csv por sondeo (índice de mtime y tamaño).
+    Un archivo nuevo o modificado se procesa cuando su firma no cambia
+    durante `settle` segundos, a través de una cola acotada de procesos.
+    """
+    def __init__(self, data_dir, output_dir, interval=2.0, settle=3.0, workers=2, max_pending=8):
+        self.data_dir = data_dir
+        self.output_dir = output_dir
+        self.interval = interval
+        self.settle = settle
+        self.workers = workers
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.index = {}      # ruta -> (mtime_ns, tamaño)
+        self.changed = {}    # ruta -> instante en que se vio la firma actual
+        self.in_flight = set()
+        self.lock = threading.RLock()  # los callbacks de fin llegan desde otro hilo (o en línea)
+        self.stop_event = threading.Event()
+
+    def scan(self):
+        """
+        Firma (mtime_ns, tamaño) de cada CSV de calibración, con un stat por
+        archivo. Otras carpetas de data_dir (los segmentos de operación y su
+        manifiesto, que cambia en cada volcado) no se vigilan.
+        """
+        index = {}
+        if not os.path.isdir(self.data_dir):
+            return index
+        with os.scandir(self.data_dir) as sensors:
+            for sensor in sensors:
+                m = SENSOR_FOLDER.match(sensor.name)
+                if m is None or not sensor.is_dir():
+                    continue
+                with os.scandir(sensor.path) as files:
+                    for f in files:
+                        if calibration_index(f.name, m.group(1)) is not None and f.is_file():
+                            st = f.stat()
+                            index[f.path] = (st.st_mtime_ns, st.st_size)
+        return index
+
+    def _output_dir_for(self, csv_path):
+        sensor_folder = os.path.basename(os.path.dirname(csv_path))
+        return os.path.join(self.output_dir, sensor_folder)
+
+    def poll_once(self, pool, now=None):
+        """Un ciclo de sondeo; devuelve las rutas enviadas a procesar."""
+        now = time.monotonic() if now is None else now
+        index = self.scan()
+        submitted = []
+        with self.lock:
+            self._update(pool, index, now, submitted)
+        return submitted
+
+    def _update(self, pool, index, now, submitted):
+        for path, sig in index.items():
+            if self.index.get(path) != sig:
+                # Firma nueva: reinicia la espera de estabilidad
+                self.changed[path] = now
+                continue
+            since = self.changed.get(path)
+            if since is None or now - since < self.settle or path in self.in_flight:
+                continue
+            out_dir = self._output_dir_for(path)
+            if not is_stale(path, out_dir):
+                del self.changed[path]
+                continue
+            if not self.slots.acquire(blocking=False):
+                continue  # cola llena: sigue en `changed` y se reintenta en el próximo sondeo
+            self.in_flight.add(path)
+            fut = pool.submit(_process_job, path, out_dir)
+            fut.add_done_callback(lambda f, p=path: self._on_done(p, f))
+            submitted.append(path)
+        for path in set(self.changed) - set(index):
+            del self.changed[path]  # archivo borrado
+        self.index = index
+
+    def _on_done(self, path, fut):
+        with self.lock:
+            self.in_flight.discard(path)
+            self.changed.pop(path, None)
+        self.slots.release()
+        try:
+            fut.result()
+            print(f"Procesado {path}")
+        except Exception as e:
+            print(f"Error procesando {path}: {e}")
+
+    def run(self):
+        """Bucle de vigilancia hasta stop(); entre sondeos el hilo duerme."""
+        # El primer índice marca todos los CSV como vistos; los ya procesados se descartan por is_stale
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while not self.stop_event.is_set():
+                self.poll_once(pool)
+                self.stop_event.wait(self.interval)
+
+    def start(self):
+        """Inicia la vigilancia en un hilo demonio."""
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Vigila Data/ y procesa automáticamente calibraciones nuevas o modificadas.')
+    parser.add_argument('--data-dir', '-d', default='Data', help='Directorio raíz de datos')
+    parser.add_argument('--output-dir', '-o', default='Processed', help='Directorio de salida')
+    parser.add_argument('--interval', '-i', type=float, default=2.0, help='Segundos entre sondeos')
+    parser.add_argument('--settle', type=float, default=3.0,
+                        help='Segundos sin cambios antes de procesar un archivo')
+    parser.add_argument('--jobs', '-j', type=int, default=2, help='Procesos en paralelo')
+    args = parser.parse_args()
+
+    watcher = CalibrationWatcher(args.data_dir, args.output_dir, args.interval, args.settle, args.jobs)
+    print(f"Vigilando {args.data_dir} (Ctrl+C para salir)")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
+        print("Vigilancia detenida.")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,11 +2,22 @@ import asyncio
 import csv
 import os
 import sys
-import re
 from bleak import BleakClient, BleakScanner, BleakError
 import matplotlib.pyplot as plt
-from Process.process_calibration import process_file
+import numpy as np
+from Process.process_calibration import process_file, process_many, calibration_index
+from Process.fitting import RunningFit
+from Process.timing import SessionClock, timing_stats, TIME_COLUMN, SEQ_COLUMN
+from Process.segments import SegmentWriter
+from commands import CommandChannel
+from buffers import CalibrationBuffer, VOLTS_PER_COUNT
+from schedule import FixedSchedule, DEFAULT_WEIGHTS, make_schedule, schedule_from_dict
+from checkpoint import (partial_path, checkpoint_path, save_checkpoint, load_checkpoint,
+                        find_checkpoints, remove_checkpoint, describe, PARTIAL_SUFFIX)
+from frames import decode, parse_calib, adc_to_value, OP, BIN, BATCH
+from sequence import SequenceTracker
 import threading
+import time
 
 # directorio raíz de reportes
 dir_processed = "Processed"
@@ -22,13 +33,24 @@ DIR_DATA = "Data"
 
 # Variables globales
 datos_por_peso = None
-buffer_datos = []
+buffer_calib = None  # CalibrationBuffer de la calibración en curso
 peso_actual = None
 sensor_actual = None
 ble_client = None  # Cliente BLE global
 ble_connected = False  # Estado de conexión BLE
 calibration_canceled = False  # Bandera de cancelación
 
+# Lecturas atípicas que se vuelven a adquirir en un peso antes de darlo por
+# inestable y pedir que se coloque de nuevo (fracción de las muestras, con mínimo)
+MAX_REJECT_FRAC = 0.5
+MIN_REJECTS = 3
+
+# Canales del multiplexor (calibración simultánea de todos los sensores)
+CHANNELS = ("0", "1", "2", "3")
+
+# micros() del firmware es uint32: da la vuelta cada ~71.6 min
+MICROS_MASK = 0xFFFFFFFF
+
 async def discover_and_connect(name_filter="ProtsenFSR", timeout=5, retries=5):
     global ble_client, ble_connected
     
@@ -76,36 +98,133 @@ def ensure_sensor_folder(sensor):
     os.makedirs(path, exist_ok=True)
     return path
 
+def ensure_time_header(path, header):
+    """Crea el CSV con cabecera o añade las columnas nuevas (al final) a un archivo antiguo."""
+    if not os.path.exists(path):
+        with open(path, 'w', newline='') as f:
+            csv.writer(f).writerow(header)
+        return
+    with open(path, newline='') as f:
+        lines = f.read().splitlines(keepends=True)
+    if lines and lines[0].strip() != ','.join(header):
+        # Las filas antiguas quedan sin las columnas nuevas (pandas las lee como NaN)
+        lines[0] = ','.join(header) + '\r\n'
+        with open(path, 'w', newline='') as f:
+            f.writelines(lines)
+
+def append_session_summary(path, stats):
+    """Agrega una fila de resumen de sesión (tasa, pérdida, parada) al CSV de sesiones."""
+    fields = list(stats)
+    if os.path.exists(path):
+        with open(path, newline='') as f:
+            fields = next(csv.reader(f), [])
+        # Columnas nuevas (p. ej. las de operación rápida) se agregan al final
+        fields += [k for k in stats if k not in fields]
+    ensure_time_header(path, fields)
+    with open(path, 'a', newline='') as f:
+        csv.DictWriter(f, fieldnames=fields, restval='').writerow(stats)
+
+def print_timing(label, t_ns):
+    stats = timing_stats(t_ns)
+    print(f"{label}: {stats['Muestras']} muestras, {stats['Tasa_Hz']} Hz, "
+          f"jitter {stats['Jitter_ms']} ms, hueco máx {stats['Max_gap_ms']} ms")
+    return stats
+
+def print_link(stats):
+    if stats.get('Esperados'):
+        print(f"Enlace: {stats['Frames']} frames, {stats['Perdidos']} perdidos ({stats['Perdida_pct']} %), "
+              f"{stats['Duplicados']} duplicados, {stats['Reordenados']} fuera de orden")
+    else:
+        print(f"Enlace: {stats['Frames']} frames (el firmware no envía secuencia)")
+
 def list_calibrations(sensor):
     folder = ensure_sensor_folder(sensor)
     files = []
-    pattern = re.compile(rf"^calibracion_sensor{sensor}_(\d+)\.csv$")
     for fn in os.listdir(folder):
-        m = pattern.match(fn)
-        if m:
-            files.append((int(m.group(1)), fn))
+        k = calibration_index(fn, sensor)
+        if k is not None:
+            files.append((k, fn))
     files.sort()
     return [fn for _, fn in files]
 
 def next_calibration_index(sensor):
     nums = []
-    for fn in list_calibrations(sensor):
-        m = re.search(rf"_{sensor}_(\d+)\.csv$", fn)
-        if m:
-            nums.append(int(m.group(1)))
+    # Incluye las calibraciones interrumpidas (.csv.part), que reservan su número
+    for fn in os.listdir(ensure_sensor_folder(sensor)):
+        k = calibration_index(fn[:-len(PARTIAL_SUFFIX)] if fn.endswith(PARTIAL_SUFFIX) else fn, sensor)
+        if k is not None:
+            nums.append(k)
     return max(nums, default=0) + 1
 
+def _console_progress(current, total, message, extra):
+    # Progreso de calibracion_ble_wrapper en consola: el peso se confirma con Enter
+    global calibration_canceled
+    if extra.get('esperar_confirmacion'):
+        print(f"\n[{current}/{total}] {message.replace('Continuar', 'Enter')}")
+        opciones = "(C)ancelar calibración"
+        if extra.get('parada_temprana'):
+            opciones += ", (T)erminar ahora: los pesos restantes no cambiarían el ajuste"
+        opt = input(opciones + ": ").strip().lower()
+        if opt == 'c':
+            calibration_canceled = True
+        elif opt == 't' and extra.get('parada_temprana'):
+            request_early_stop()
+        else:
+            confirm_weight()
+    elif extra.get('espera_segundos', 10) == 10:
+        print(f"[{current}/{total}] {message}")
+
+async def calibrar_consola(client, handler, commands, samples, sensor, schedule=None, resume=None):
+    """
+    Calibración desde el menú de consola por el mismo camino que la GUI
+    (calibracion_ble_wrapper, con checkpoints). `handler` y `commands` son
+    los del menú, que se restauran al terminar. Las calibraciones
+    multicanal se procesan en paralelo al final.
+    """
+    global sensor_actual
+    sensor_menu = sensor_actual
+    set_progress_callback(_console_progress)
+    await client.stop_notify(CHAR_RESULT_UUID)
+    try:
+        result = await calibracion_ble_wrapper(samples, sensor, schedule, resume)
+    except Exception as e:
+        print(f"Error en calibración: {e}")
+        result = None
+    finally:
+        set_progress_callback(None)
+        sensor_actual = sensor_menu
+        await client.start_notify(CHAR_RESULT_UUID, handler)
+        await commands.send(f"s{sensor_actual}", strict=False)
+    if not result:
+        return
+    paths = result if isinstance(result, list) else [result]
+    print("Terminada calibración: " + ", ".join(os.path.basename(p) for p in paths))
+    if len(paths) > 1:
+        print("Procesando las calibraciones en paralelo...")
+        results, errors = process_calibrations(paths, progress=lambda i, n, p: print(f"[{i}/{n}] {p}"))
+        for path in paths:
+            if path in errors:
+                print(f"{path}: error al procesar: {errors[path]}")
+            else:
+                print(f"\n=== {path} ===")
+                print(results[path].to_string(index=False))
+
 async def calibracion_ble(client):
-    global datos_por_peso, buffer_datos, peso_actual, sensor_actual, calibration_canceled
+    global datos_por_peso, buffer_calib, peso_actual, sensor_actual, calibration_canceled
 
     if not client.is_connected:
         raise Exception("BLE no conectado para calibración")
 
-    # Handler BLE → buffer_datos
+    clock = SessionClock()
+    commands = CommandChannel(client, CHAR_CMD_UUID)
+
+    # Handler BLE → buffer_calib (desde bytes, con marca de tiempo) o confirmaciones de comandos
     def handler(_, data):
-        msg = data.decode().strip()
-        if msg.startswith("Calib"):
-            buffer_datos.append(msg)
+        t = clock.stamp()
+        if buffer_calib is not None and data.startswith(b"Calib"):
+            buffer_calib.push(data, t)
+        else:
+            commands.feed(data.decode().strip())
 
     await client.start_notify(CHAR_RESULT_UUID, handler)
 
@@ -128,8 +247,7 @@ async def calibracion_ble(client):
             s = input("Sensor (0-3): ").strip()
             if s in ("0","1","2","3"):
                 sensor_actual = s
-                await client.write_gatt_char(CHAR_CMD_UUID, f"s{sensor_actual}".encode())
-                await asyncio.sleep(0.2)
+                await commands.send(f"s{sensor_actual}")
                 break
             print("Sensor inválido.")
 
@@ -140,6 +258,8 @@ async def calibracion_ble(client):
             print(f"\n--- Gestión Sensor {sensor_actual} ---")
             print("(L)istar calibraciones")
             print("(N)ueva calibración automática")
+            print("(M)ulticanal: calibrar los 4 sensores a la vez")
+            print("(P)endientes: reanudar una calibración interrumpida")
             print("(D)eleción de calibración")
             print("(R)eportar calibración")
             print("(C)ancelar calibración")
@@ -182,89 +302,55 @@ async def calibracion_ble(client):
                     print("Índice inválido.")
 
             elif opt == 'n':
-                # Nueva calibración automática
-                n = next_calibration_index(sensor_actual)
-                filename = f"calibracion_sensor{sensor_actual}_{n}.csv"
-                fullpath = os.path.join(sensor_folder, filename)
-                with open(fullpath, 'w', newline='') as f:
-                    csv.writer(f).writerow(['Sensor','Peso_g','Lectura'])
-                print(f"Iniciando calibración: {filename}")
-                print("Presione 'c' en cualquier momento para cancelar")
-
-                await client.write_gatt_char(CHAR_CMD_UUID, b"b")
-                await asyncio.sleep(0.5)
-
-                for peso in range(250, 4001, 250):
-                    if calibration_canceled:
-                        print("Calibración cancelada por el usuario")
-                        break
-                        
-                    print(f"\nPeso actual: {peso} g")
-                    print(f"Coloque {peso}g en el sensor y presione Enter")
-                    print("(C)ancelar calibración")
-                    
-                    user_input = input().strip().lower()
-                    if user_input == 'c':
-                        calibration_canceled = True
-                        print("Calibración cancelada por el usuario")
-                        break
-                    
-                    buffer_datos.clear()
-                    print(f"Recolectando {datos_por_peso} muestras para {peso} g...")
-                    
-                    for i in range(datos_por_peso):
-                        if calibration_canceled:
-                            break
-                            
-                        # Verificar si el usuario quiere cancelar durante la recolección
-                        if i > 0 and i % 5 == 0:  # Cada 5 muestras
-                            print(f"Muestra {i+1}/{datos_por_peso} (presione 'c' para cancelar)")
+                # Nueva calibración automática, con el programa de pesos elegido
+                schedule = None
+                while schedule is None:
+                    modo = input("Programa de pesos: (F)ijo 250-4000 g, (P)ersonalizado, (A)daptativo [F]: ").strip().lower()
+                    try:
+                        if modo in ('', 'f'):
+                            schedule = make_schedule('fija', datos_por_peso)
+                        elif modo == 'p':
+                            texto = input("Pesos en g, con muestras opcionales (ej. 250, 500:20, 1000): ")
+                            schedule = make_schedule('personalizada', datos_por_peso, texto)
+                        elif modo == 'a':
+                            texto = input("Pesos disponibles en g (Enter = 250-4000 g): ").strip()
+                            schedule = make_schedule('adaptativa', datos_por_peso, texto or None)
                         else:
-                            print(f"Muestra {i+1}/{datos_por_peso}")
-                        
-                        await client.write_gatt_char(CHAR_CMD_UUID, b"t")
-                        await asyncio.sleep(0.1)
-                        
-                        # Esperar respuesta o posible cancelación
-                        start_time = asyncio.get_event_loop().time()
-                        while len(buffer_datos) <= i and not calibration_canceled:
-                            elapsed = asyncio.get_event_loop().time() - start_time
-                            if elapsed > 2.0:  # Timeout de 2 segundos
-                                print("Timeout esperando respuesta, reintentando...")
-                                await client.write_gatt_char(CHAR_CMD_UUID, b"t")
-                                start_time = asyncio.get_event_loop().time()
-                            await asyncio.sleep(0.1)
-                            
-                        # Verificar si el usuario presionó c durante la espera
-                        if calibration_canceled:
-                            break
-                            
-                        # Esperar 10 segundos entre muestras
-                        if i < datos_por_peso - 1:
-                            print("Esperando 10 segundos para próxima muestra...")
-                            await asyncio.sleep(10)
-                    
-                    if calibration_canceled:
-                        break
-                        
-                    # Guardar las muestras recolectadas para este peso
-                    with open(fullpath, 'a', newline='') as f:
-                        writer = csv.writer(f)
-                        for msg in buffer_datos[:datos_por_peso]:
-                            lectura = msg.split(':')[-1].strip()
-                            writer.writerow([sensor_actual, peso, lectura])
-                    print(f"Guardadas {min(len(buffer_datos), datos_por_peso)} muestras para {peso} g.")
-
-                await client.write_gatt_char(CHAR_CMD_UUID, b"i")
-                await asyncio.sleep(0.2)
-                
-                if not calibration_canceled:
-                    print(f"Terminada calibración {filename}")
-                else:
-                    # Eliminar archivo si se canceló
-                    if os.path.exists(fullpath):
-                        os.remove(fullpath)
-                        print("Archivo de calibración eliminado debido a cancelación")
+                            print("Opción inválida.")
+                    except ValueError as e:
+                        print(e)
+                await calibrar_consola(client, handler, commands, datos_por_peso, sensor_actual, schedule)
+
+            elif opt == 'm':
+                # Todos los canales con una sola pasada de pesos
+                texto = input("Pesos en g, con muestras opcionales (Enter = 250-4000 g): ").strip()
+                try:
+                    schedule = make_schedule('personalizada' if texto else 'fija', datos_por_peso, texto or None)
+                except ValueError as e:
+                    print(e)
+                    continue
+                await calibrar_consola(client, handler, commands, datos_por_peso, list(CHANNELS), schedule)
+
+            elif opt == 'p':
+                # Calibraciones interrumpidas (cancelación, fallo o desconexión)
+                pendientes = find_checkpoints(DIR_DATA)
+                if not pendientes:
+                    print("No hay calibraciones interrumpidas.")
+                    continue
+                for i, path in enumerate(pendientes, 1):
+                    print(f" {i}: {describe(load_checkpoint(path))}")
+                try:
+                    path = pendientes[int(input("Número: ")) - 1]
+                except (ValueError, IndexError):
+                    print("Selección inválida.")
+                    continue
+                accion = input("(R)eanudar desde el último peso o (D)escartar: ").strip().lower()
+                if accion == 'r':
+                    await calibrar_consola(client, handler, commands, None, None, resume=path)
+                elif accion == 'd':
+                    if input("Se borrarán los datos parciales. ¿Confirmar? (s/N): ").strip().lower() == 's':
+                        discard_checkpoint(path)
+                        print("Calibración interrumpida descartada.")
 
             elif opt == 'c':
                 calibration_canceled = True
@@ -312,50 +398,216 @@ async def calibracion_ble(client):
                 print("Opción inválida.")
 
     finally:
-        await client.write_gatt_char(CHAR_CMD_UUID, b"i")
-        await asyncio.sleep(0.2)
+        await commands.send("i", strict=False)
         await client.stop_notify(CHAR_RESULT_UUID)
 
-async def operacion_ble(client):
-    import threading
-
-    if not client.is_connected:
-        raise Exception("BLE no conectado para operación")
-    
+class OperationSession:
+    """
+    Sesión de operación cancelable. stop() puede llamarse desde cualquier
+    hilo; la sesión se detiene en la siguiente notificación (o en el
+    siguiente sondeo de `poll_s` si no llegan notificaciones), cierra el
+    segmento en curso, envía 'i' al dispositivo y mide la latencia
+    parada→idle. Los datos van a segmentos rotativos y comprimidos en
+    `root` (ver Process/segments.py); `segment_opts` ajusta la rotación.
+    Si los frames traen secuencia, cuenta huecos, duplicados (que no se
+    guardan) y desorden, y cada `status_s` publica tasa y pérdida en vivo.
+    Con `rate_hz` pide esa tasa ('r<Hz>') y usa la operación rápida ('f'),
+    que envía lotes binarios de varias muestras por notificación.
+    """
+    def __init__(self, client, root, cancel_event=None, poll_s=0.05, flush_s=1.0, status_s=1.0,
+                 rate_hz=None, segment_opts=None):
+        self.client = client
+        self.root = root
+        self.segment_opts = segment_opts or {}
+        self.cancel_event = cancel_event  # threading.Event opcional (GUI)
+        self.rate_hz = rate_hz
+        # Periodo entero en µs, igual que periodoUs en el firmware
+        self.period_ns = (1_000_000 // rate_hz) * 1000 if rate_hz else 0
+        self.poll_s = poll_s
+        self.flush_s = flush_s
+        self.status_s = status_s
+        self.clock = SessionClock()
+        self.commands = CommandChannel(client, CHAR_CMD_UUID)
+        self.sequence = SequenceTracker()
+        self.tiempos = []
+        self.samples = 0
+        self._last_status = (0, 0, 0)  # (t, frames, muestras) del último reporte
+        self.stop_requested_ns = None
+        self.stop_latency_ms = None
+        self._loop = None
+        self._stop = None
+        self.started = None
+        self.session_id = None
+        self._sink = None
+        self._writer = None
+        self._last_flush = 0
+        self._device_offset_ns = None  # reloj del dispositivo → reloj de sesión
+        self._device_last_us = None  # micros() extendido más alto visto
+        self._sample_span = None  # (primera, última) marca de muestra de los lotes
+
+    def stop(self):
+        """Solicita la parada (seguro desde cualquier hilo)."""
+        if self.stop_requested_ns is None:
+            self.stop_requested_ns = time.monotonic_ns()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def _cancelled(self):
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def _handler(self, _, data):
+        t = self.clock.stamp()
+        frame = decode(data)
+        if frame is None:
+            # No es un frame de datos: confirmación de comando u otro mensaje
+            self.commands.feed(bytes(data).decode(errors='replace').strip())
+            return
+        if self._stop.is_set() or self._cancelled():
+            self.stop()
+            return
+        kind, seq, payload = frame
+        if kind not in (OP, BIN, BATCH):
+            return
+        if seq is not None and not self.sequence.update(seq):
+            return  # duplicado
+        seq = '' if seq is None else seq
+        if kind == BATCH:
+            self._write_batch(t, seq, *payload)
+        else:
+            muestras = payload if kind == OP else list(enumerate(adc_to_value(payload)))
+            for canal, valor in muestras:
+                self._writer.writerow([canal, f"{valor:.2f}", t, seq])
+                log_message(f"Sensor {canal} = {valor:.2f}")
+            self.samples += len(muestras)
+        self.tiempos.append(t)
+        if t - self._last_flush > self.flush_s * 1e9:
+            self._sink.flush()
+            self._last_flush = t
+        self._report_link(t)
+
+    def _write_batch(self, t, seq, t0_us, adc):
+        # Tiempo de cada muestra según el reloj del dispositivo (micros, uint32),
+        # anclado a la llegada del primer lote: sin el jitter de BLE entre muestras.
+        # micros() se extiende con el delta con signo módulo 2^32 (como la
+        # secuencia): sólo un paso corto hacia delante que cruza 2^32 es una
+        # vuelta; un lote que llega con t0 algo menor no suma 2^32 µs
+        if self._device_last_us is None:
+            t0_ext = self._device_last_us = t0_us
+        else:
+            delta = (t0_us - self._device_last_us) & MICROS_MASK
+            if delta > MICROS_MASK >> 1:
+                delta -= MICROS_MASK + 1
+            t0_ext = self._device_last_us + delta
+            self._device_last_us = max(self._device_last_us, t0_ext)
+        t0_ns = t0_ext * 1000
+        n = len(adc)
+        if self._device_offset_ns is None:
+            self._device_offset_ns = t - t0_ns - (n - 1) * self.period_ns
+        tiempos = (self._device_offset_ns + t0_ns + np.arange(n) * self.period_ns).tolist()
+        first = tiempos[0] if self._sample_span is None else self._sample_span[0]
+        self._sample_span = (first, tiempos[-1])
+        valores = adc_to_value(adc).tolist()
+        self._writer.writerows([canal, f"{v:.2f}", ts, seq]
+                               for ts, fila in zip(tiempos, valores)
+                               for canal, v in enumerate(fila))
+        for fila in valores:
+            log_message("  ".join(f"S{canal} = {v:.2f}" for canal, v in enumerate(fila)))
+        self.samples += adc.size
+
+    def link_stats(self):
+        """Frames recibidos, pérdida y desorden de la sesión hasta ahora."""
+        stats = self.sequence.stats()
+        stats['Frames'] = len(self.tiempos) + self.sequence.duplicates
+        return stats
+
+    def _report_link(self, t):
+        # Tasa efectiva de la última ventana y pérdida acumulada, cada status_s
+        t0, frames0, samples0 = self._last_status
+        if t - t0 < self.status_s * 1e9 or _progress_handler.link_callback is None:
+            return
+        dt = (t - t0) / 1e9
+        stats = self.link_stats()
+        stats['Frames_s'] = round((len(self.tiempos) - frames0) / dt, 2)
+        stats['Muestras_s'] = round((self.samples - samples0) / dt, 2)
+        self._last_status = (t, len(self.tiempos), self.samples)
+        _progress_handler.link_callback(stats)
+
+    async def _watch_cancel(self):
+        # Respaldo si no llegan notificaciones: sondea el evento de la GUI
+        while not self._stop.is_set():
+            if self._cancelled():
+                self.stop()
+                return
+            self._report_link(self.clock.stamp())  # tasa 0 si el enlace se queda mudo
+            await asyncio.sleep(self.poll_s)
+
+    async def run(self):
+        if not self.client.is_connected:
+            raise Exception("BLE no conectado para operación")
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self.started = time.time()
+        if self.stop_requested_ns is not None:
+            self._stop.set()
+
+        # Epoch de T_ns = 0 para el manifiesto
+        origin = self.started - self.clock.stamp() / 1e9
+        self._sink = self._writer = SegmentWriter(
+            self.root, ['Sensor','Valor',TIME_COLUMN,SEQ_COLUMN], origin, **self.segment_opts)
+        self.session_id = self._sink.session
+        watcher = asyncio.ensure_future(self._watch_cancel())
+        try:
+            await self.client.start_notify(CHAR_RESULT_UUID, self._handler)
+            if self.rate_hz:
+                ack = await self.commands.send(f"r{self.rate_hz}")
+                log_message(ack)
+                await self.commands.send("f")
+            else:
+                await self.commands.send("o")
+            await self._stop.wait()
+        finally:
+            watcher.cancel()
+            self._sink.close(wait=False)  # vacía todo lo recibido; la compresión sigue aparte
+            try:
+                await self.commands.send("i", strict=False)
+                await self.client.stop_notify(CHAR_RESULT_UUID)
+            finally:
+                if self.stop_requested_ns is not None:
+                    self.stop_latency_ms = (time.monotonic_ns() - self.stop_requested_ns) / 1e6
+                await asyncio.get_running_loop().run_in_executor(None, self._sink.join)
+        stats = timing_stats(self.tiempos)
+        stats.update(self.link_stats())
+        if self.rate_hz:
+            # Tasa por canal lograda, con las marcas de muestra del dispositivo
+            stats['Tasa_pedida_Hz'] = self.rate_hz
+            span = self._sample_span
+            stats['Tasa_muestreo_Hz'] = (round((self.samples / 4 - 1) / ((span[1] - span[0]) / 1e9), 2)
+                                         if span and span[1] > span[0] else None)
+        stats['Parada_ms'] = self.stop_latency_ms
+        return stats
+
+async def operacion_ble(client, cancel_event=None, rate_hz=None):
     os.makedirs(DIR_DATA, exist_ok=True)
-    op_path = os.path.join(DIR_DATA, "operacion.csv")
-    nuevo = not os.path.exists(op_path)
-    with open(op_path, 'a', newline='') as f:
-        if nuevo:
-            csv.writer(f).writerow(['Sensor','Valor'])
-
-    def handler_save(_, data):
-        msg = data.decode().strip()
-        if msg.startswith("Op S"):
-            parts = msg[4:].split(':')
-            canal = int(parts[0]); valor = float(parts[1])
-            with open(op_path, 'a', newline='') as f2:
-                csv.writer(f2).writerow([canal, f"{valor:.2f}"])
-            print(f"Sensor {canal} = {valor:.2f}")
-
-    await client.start_notify(CHAR_RESULT_UUID, handler_save)
-    await client.write_gatt_char(CHAR_CMD_UUID, b"o")
-    await asyncio.sleep(0.2)
-
-    print("Recolección en curso. Presiona Enter para detener...")
-    stop_event = asyncio.Event()
-
-    def esperar_enter():
-        input()
-        asyncio.run_coroutine_threadsafe(stop_event.set(), asyncio.get_event_loop())
-    threading.Thread(target=esperar_enter, daemon=True).start()
-
-    await stop_event.wait()
-
-    await client.write_gatt_char(CHAR_CMD_UUID, b"i")
-    await asyncio.sleep(0.2)
-    await client.stop_notify(CHAR_RESULT_UUID)
+    session = OperationSession(client, os.path.join(DIR_DATA, "operacion"), cancel_event, rate_hz=rate_hz)
+
+    if cancel_event is None:
+        # Modo consola: Enter detiene la sesión desde un hilo aparte
+        print("Recolección en curso. Presiona Enter para detener...")
+        def esperar_enter():
+            input()
+            session.stop()
+        threading.Thread(target=esperar_enter, daemon=True).start()
+
+    stats = await session.run()
     print("Modo operación finalizado.")
+    print_timing("Sesión de operación", session.tiempos)
+    print_link(stats)
+    append_session_summary(os.path.join(DIR_DATA, "operacion_sesiones.csv"),
+                           {'Inicio': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(session.started)),
+                            **stats, 'Sesion': session.session_id})
+    if session.stop_latency_ms is not None:
+        log_message(f"Parada a idle en {session.stop_latency_ms:.1f} ms")
+    return stats
 
 def gestion_calibraciones_offline():
     # Selección de sensor
@@ -478,8 +730,12 @@ async def main():
             if not ble_connected:
                 print("Primero debe conectar BLE")
                 continue
+            tasa = input("Tasa de muestreo en Hz (enter = modo normal): ").strip()
+            if tasa and not tasa.isdigit():
+                print("Tasa inválida.")
+                continue
             try:
-                await operacion_ble(ble_client)
+                await operacion_ble(ble_client, rate_hz=int(tasa) if tasa else None)
             except Exception as e:
                 print(f"Error en operación: {e}")
         
@@ -510,16 +766,6 @@ async def main():
         else:
             print("Opción inválida.")
 
-if __name__ == '__main__':
-    try:
-        asyncio.run(main())
-    except KeyboardInterrupt:
-        print("Interrumpido por usuario.")
-        sys.exit(0)
-    except Exception as e:
-        print(f"Error: {e}")
-        sys.exit(1)
-
 # ================== FUNCIONES WRAPPER PARA GUI ==================
 
 class CalibrationProgress:
@@ -528,6 +774,9 @@ class CalibrationProgress:
         self.confirmed = False
         self.progress_callback = None
         self.cancel_event = None
+        self.log_callback = None
+        self.link_callback = None
+        self.stop_requested = False  # parada temprana pedida desde la GUI
 
 # Instancia global para manejar confirmaciones
 _progress_handler = CalibrationProgress()
@@ -536,6 +785,25 @@ def set_progress_callback(callback):
     """Establece el callback de progreso para la GUI"""
     _progress_handler.progress_callback = callback
 
+def set_log_callback(callback):
+    """Establece el callback de mensajes de operación para la GUI"""
+    _progress_handler.log_callback = callback
+
+def set_link_callback(callback):
+    """Establece el callback de estado del enlace (tasa y pérdida) para la GUI"""
+    _progress_handler.link_callback = callback
+
+def log_message(msg):
+    """Envía un mensaje a la consola o, si hay GUI, a su log de operación"""
+    if _progress_handler.log_callback:
+        _progress_handler.log_callback(msg)
+    else:
+        print(msg)
+
+def request_early_stop():
+    """Termina la calibración en el próximo peso, conservando los ya medidos"""
+    _progress_handler.stop_requested = True
+
 def confirm_weight():
     """Confirma que el peso ha sido colocado"""
     _progress_handler.confirmed = True
@@ -544,175 +812,345 @@ def set_cancel_event(event):
     """Establece el evento de cancelación"""
     _progress_handler.cancel_event = event
 
-async def calibracion_ble_wrapper(samples, sensor):
-    """Wrapper para calibración BLE desde GUI"""
-    global buffer_datos, sensor_actual, calibration_canceled
+def _restore_fit(path, pesos, conteos):
+    """RunningFit de los pesos ya guardados en un CSV parcial, en el orden en que se midieron."""
+    ajuste = RunningFit()
+    if not pesos:
+        return ajuste
+    adc = np.loadtxt(path, delimiter=',', skiprows=1, usecols=2, ndmin=1)
+    inicio = 0
+    for peso, n in zip(pesos, conteos):
+        ajuste.commit_step(peso, np.round(adc[inicio:inicio + n] * VOLTS_PER_COUNT, 3))
+        inicio += n
+    return ajuste
+
+def discard_checkpoint(path):
+    """Descarta una calibración interrumpida: sus CSV parciales y el checkpoint."""
+    for csv_path in load_checkpoint(path)['csv'].values():
+        if os.path.exists(partial_path(csv_path)):
+            os.remove(partial_path(csv_path))
+    remove_checkpoint(path)
+
+async def calibracion_ble_wrapper(samples, sensor, schedule=None, resume=None):
+    """
+    Wrapper para calibración BLE desde GUI (schedule: programa de pesos, por
+    defecto el fijo). `sensor` es un canal ('0') o una lista de canales para
+    calibrarlos juntos en una sola pasada de pesos (fixture que carga todos
+    los sensores a la vez): en cada muestra se recorren los canales y se
+    escribe un CSV por sensor. Devuelve la ruta del CSV, o la lista de rutas
+    si se dio una lista de canales; None si se canceló.
+
+    Los datos van a <csv>.part y tras cada peso terminado se guarda un
+    checkpoint (checkpoint.py); si la calibración se cancela o falla con
+    algún peso hecho, ambos se conservan y `resume` (ruta del checkpoint)
+    la continúa desde el peso siguiente con la configuración guardada.
+    """
+    global buffer_calib, sensor_actual, calibration_canceled
+    
+    estado = load_checkpoint(resume) if resume else None
+    if estado:
+        # Un .part más corto que lo registrado perdió datos ya confirmados: no se
+        # rellena (truncate lo completaría con ceros), se rechaza sin tocarlo
+        for s, csv_path in estado['csv'].items():
+            parcial = partial_path(csv_path)
+            tam = os.path.getsize(parcial) if os.path.exists(parcial) else None
+            if tam is None or tam < estado['bytes'][s]:
+                raise ValueError(f"{os.path.basename(parcial)}: datos parciales incompletos "
+                                 f"({tam or 0} de {estado['bytes'][s]} bytes); no se puede reanudar")
+        sensor = estado['sensores'] if estado['multi'] else estado['sensores'][0]
+        samples = estado['muestras']
+        schedule = schedule_from_dict(estado['programa'])
+    multi = not isinstance(sensor, str)
+    sensores = [str(s) for s in sensor] if multi else [sensor]
+    schedule = schedule or FixedSchedule(DEFAULT_WEIGHTS, samples)
+    if multi and schedule.adaptive:
+        raise ValueError("El programa adaptativo elige pesos para un solo sensor; use el fijo o uno personalizado.")
     
     # Verificar conexión BLE
     if not ble_connected or not ble_client or not ble_client.is_connected:
         raise Exception("BLE no conectado")
     
-    # Inicializar variables
-    buffer_datos = []
-    sensor_actual = sensor
+    # Inicializar variables: un buffer y un ajuste por canal
+    buffers = {s: CalibrationBuffer(schedule.candidates, schedule.max_samples) for s in sensores}
+    ajustes = {s: RunningFit() for s in sensores}  # regresión ln(P) cuadrática actualizada muestra a muestra
+    buffer_calib = buffers[sensores[0]]
+    ajuste = ajustes[sensores[0]]  # el que guía al programa adaptativo (un solo sensor)
+    sensor_actual = sensores[0]
     calibration_canceled = False
+    _progress_handler.stop_requested = False
+    clock = SessionClock()
+    commands = CommandChannel(ble_client, CHAR_CMD_UUID)
+    fullpaths = {}
+    partials = {}
+    ckpt = None
     
     try:
-        # Handler BLE → buffer_datos
+        # Handler BLE → buffer del canal del frame (desde bytes, con marca de tiempo) o confirmaciones de comandos
         def handler(_, data):
-            msg = data.decode().strip()
-            if msg.startswith("Calib"):
-                buffer_datos.append(msg)
+            t = clock.stamp()
+            frame = parse_calib(data)
+            if frame is None:
+                commands.feed(data.decode().strip())
+            elif multi:
+                buf = buffers.get(str(frame[0]))
+                if buf is not None:
+                    buf.push_value(frame[0], frame[1], t)
+            else:
+                buffer_calib.push_value(frame[0], frame[1], t)
         
         await ble_client.start_notify(CHAR_RESULT_UUID, handler)
         
-        # Configurar sensor
-        await ble_client.write_gatt_char(CHAR_CMD_UUID, f"s{sensor_actual}".encode())
-        await asyncio.sleep(0.2)
+        # Configurar sensor (con varios, el canal se cambia antes de cada muestra)
+        await commands.send(f"s{sensores[0]}")
         
-        # Crear archivo de calibración
-        n = next_calibration_index(sensor_actual)
-        filename = f"calibracion_sensor{sensor_actual}_{n}.csv"
-        sensor_folder = ensure_sensor_folder(sensor_actual)
-        fullpath = os.path.join(sensor_folder, filename)
-        
-        with open(fullpath, 'w', newline='') as f:
-            csv.writer(f).writerow(['Sensor','Peso_g','Lectura'])
+        if estado:
+            # Reanudar: descartar lo escrito después del último checkpoint y rehacer los ajustes
+            fullpaths = dict(estado['csv'])
+            partials = {s: partial_path(p) for s, p in fullpaths.items()}
+            for s in sensores:
+                with open(partials[s], 'r+b') as f:
+                    f.truncate(estado['bytes'][s])
+                ajustes[s] = _restore_fit(partials[s], estado['pesos_hechos'], estado['conteos'][s])
+            ajuste = ajustes[sensores[0]]
+            # T_ns continúa desde la última muestra más el tiempo interrumpido
+            clock.t0 -= estado['t_ns'] + max(time.time_ns() - estado['epoch_ns'], 0)
+            ckpt = resume
+            log_message(f"Reanudando calibración tras {len(estado['pesos_hechos'])} pesos")
+        else:
+            # Crear un archivo de calibración por sensor (parcial hasta terminar)
+            for s in sensores:
+                n = next_calibration_index(s)
+                fullpaths[s] = os.path.join(ensure_sensor_folder(s), f"calibracion_sensor{s}_{n}.csv")
+                partials[s] = partial_path(fullpaths[s])
+                with open(partials[s], 'w', newline='') as f:
+                    csv.writer(f).writerow(['Sensor','Peso_g','Lectura',TIME_COLUMN])
+            estado = {'sensores': sensores, 'multi': multi, 'muestras': samples,
+                      'csv': fullpaths, 'pesos_hechos': [], 'conteos': {s: [] for s in sensores}}
         
         # Iniciar modo calibración
-        await ble_client.write_gatt_char(CHAR_CMD_UUID, b"b")
-        await asyncio.sleep(0.5)
+        await commands.send("b")
         
-        weights = list(range(250, 4001, 250))
-        total_steps = len(weights) * samples
-        current_step = 0
+        total_steps = schedule.total_samples() * len(sensores)
+        hechas = sum(sum(c) for c in estado['conteos'].values())  # muestras de los pesos ya terminados
+        etiqueta = (lambda s: f" (S{s})") if multi else (lambda s: "")
+
+        def cancelado():
+            return (calibration_canceled or
+                    (_progress_handler.cancel_event and _progress_handler.cancel_event.is_set()))
         
-        for peso in weights:
-            # Verificar cancelación
-            if (calibration_canceled or 
-                (_progress_handler.cancel_event and _progress_handler.cancel_event.is_set())):
-                break
-                
-            # Notificar a la GUI que espere confirmación
-            if _progress_handler.progress_callback:
-                _progress_handler.progress_callback(
-                    current_step, 
-                    total_steps, 
-                    f"Coloque {peso}g en el sensor y presione Continuar",
-                    {'peso_actual': peso, 'esperar_confirmacion': True}
-                )
-            
-            # Esperar confirmación del usuario
-            _progress_handler.confirmed = False
-            while not _progress_handler.confirmed and not calibration_canceled:
-                if (_progress_handler.cancel_event and 
-                    _progress_handler.cancel_event.is_set()):
-                    calibration_canceled = True
-                    break
-                await asyncio.sleep(0.1)
-            
-            if calibration_canceled:
+        while True:
+            # Próximo peso del programa (el adaptativo lo elige con el ajuste actual)
+            paso = schedule.next(ajuste)
+            if paso is None:
                 break
-                
-            # Limpiar buffer y recolectar muestras
-            buffer_datos.clear()
-            
-            for i in range(samples):
-                if (calibration_canceled or 
-                    (_progress_handler.cancel_event and _progress_handler.cancel_event.is_set())):
+            step, peso, muestras = paso
+            reintento = False
+            while True:  # se repite el paso hasta que las lecturas sean estables
+                # Verificar cancelación
+                if cancelado():
                     break
-                    
-                current_step += 1
-                
-                # Actualizar progreso
+
+                # Se limpian antes de notificar: un callback síncrono (consola)
+                # confirma o pide la parada temprana dentro de la propia llamada
+                _progress_handler.confirmed = False
+                _progress_handler.stop_requested = False
+
+                # Notificar a la GUI que espere confirmación (con el ajuste hasta ahora
+                # y si los pesos restantes ya no cambiarían el modelo)
                 if _progress_handler.progress_callback:
+                    donde = "los sensores" if multi else "el sensor"
+                    mensaje = (f"Lectura inestable en {peso}g: vuelva a colocar el peso y presione Continuar"
+                               if reintento else f"Coloque {peso}g en {donde} y presione Continuar")
+                    vivo = ajuste.solve()
                     _progress_handler.progress_callback(
-                        current_step, 
-                        total_steps, 
-                        f"Recolectando muestra {i+1}/{samples} para {peso}g",
-                        {'muestra_actual': i+1, 'muestras_total': samples}
+                        hechas,
+                        total_steps,
+                        mensaje,
+                        {'peso_actual': peso, 'esperar_confirmacion': True, 'reintento': reintento,
+                         'ajuste': vivo, 'residuos': ajuste.residuals(),
+                         'parada_temprana': all(a.can_stop() for a in ajustes.values())}
                     )
-                
-                # Solicitar muestra
-                await ble_client.write_gatt_char(CHAR_CMD_UUID, b"t")
-                
-                # Esperar respuesta con timeout
-                start_time = asyncio.get_event_loop().time()
-                while len(buffer_datos) <= i:
-                    elapsed = asyncio.get_event_loop().time() - start_time
-                    if elapsed > 2.0:  # Timeout de 2 segundos
-                        await ble_client.write_gatt_char(CHAR_CMD_UUID, b"t")
-                        start_time = asyncio.get_event_loop().time()
-                    
-                    if (calibration_canceled or 
-                        (_progress_handler.cancel_event and _progress_handler.cancel_event.is_set())):
+
+                # Esperar confirmación del usuario (o la parada temprana)
+                while (not _progress_handler.confirmed and not calibration_canceled and
+                       not _progress_handler.stop_requested):
+                    if (_progress_handler.cancel_event and
+                        _progress_handler.cancel_event.is_set()):
+                        calibration_canceled = True
                         break
-                        
                     await asyncio.sleep(0.1)
-                
-                if calibration_canceled:
+
+                if calibration_canceled or _progress_handler.stop_requested:
                     break
-                    
-                # Esperar entre muestras (excepto la última)
-                if i < samples - 1:
-                    for sec in range(10, 0, -1):
-                        if (calibration_canceled or 
-                            (_progress_handler.cancel_event and _progress_handler.cancel_event.is_set())):
+
+                # Reiniciar el paso en los buffers y recolectar muestras; las lecturas
+                # atípicas (mediana/MAD) se descartan y se vuelven a pedir, por canal
+                for buf in buffers.values():
+                    buf.begin_step(step, muestras)
+                rechazadas = dict.fromkeys(sensores, 0)
+                max_rechazos = max(MIN_REJECTS, int(muestras * MAX_REJECT_FRAC))
+
+                def faltan():
+                    return [s for s in sensores if buffers[s].count < muestras]
+
+                def estable():
+                    return max(rechazadas.values()) <= max_rechazos
+
+                while faltan() and estable():
+                    # Una muestra de cada canal incompleto con el peso puesto
+                    for s in faltan():
+                        if cancelado():
                             break
-                            
+                        buf = buffers[s]
+                        i = buf.count
+                        current_step = min(hechas + sum(b.count for b in buffers.values()) + 1, total_steps)
+
+                        # Actualizar progreso (con estadísticas y ajuste en vivo, incluido el paso en curso)
                         if _progress_handler.progress_callback:
+                            media, sigma = buf.step_stats()
+                            vivo = ajustes[s].preview(peso, buf.step_volts())
                             _progress_handler.progress_callback(
                                 current_step,
                                 total_steps,
-                                f"Esperando {sec} segundos para próxima muestra...",
-                                {'espera_segundos': sec}
+                                f"Recolectando muestra {i+1}/{muestras} para {peso}g{etiqueta(s)}",
+                                {'muestra_actual': i+1, 'muestras_total': muestras, 'sensor': s,
+                                 'media_adc': media, 'std_adc': sigma, 'rechazadas': rechazadas[s],
+                                 'ajuste': vivo,
+                                 'residuos': ajustes[s].residuals(vivo['coeffs']) if vivo else {}}
                             )
-                        await asyncio.sleep(1)
+
+                        # Solicitar muestra (antes, seleccionar el canal si se calibran varios)
+                        if multi:
+                            await commands.send(f"s{s}")
+                        await commands.write("t")
+
+                        # Esperar respuesta con timeout
+                        start_time = asyncio.get_event_loop().time()
+                        while buf.count <= i:
+                            elapsed = asyncio.get_event_loop().time() - start_time
+                            if elapsed > 2.0:  # Timeout de 2 segundos
+                                await commands.write("t")
+                                start_time = asyncio.get_event_loop().time()
+
+                            if cancelado():
+                                break
+
+                            await asyncio.sleep(0.1)
+
+                        if cancelado():
+                            break
+
+                        descartadas = buf.reject_outliers()
+                        if descartadas:
+                            rechazadas[s] += descartadas
+                            log_message(f"{peso}g{etiqueta(s)}: {descartadas} lectura(s) atípica(s) descartada(s), "
+                                        f"se vuelven a adquirir ({rechazadas[s]}/{max_rechazos})")
+
+                    if cancelado():
+                        break
+
+                    # Esperar entre muestras (excepto la última)
+                    if faltan() and estable():
+                        for sec in range(10, 0, -1):
+                            if cancelado():
+                                break
+
+                            if _progress_handler.progress_callback:
+                                _progress_handler.progress_callback(
+                                    current_step,
+                                    total_steps,
+                                    f"Esperando {sec} segundos para próxima muestra...",
+                                    {'espera_segundos': sec}
+                                )
+                            await asyncio.sleep(1)
+
+                if cancelado() or not faltan():
+                    break
+                # Demasiados rechazos: el peso se movió o un sensor no se estabiliza
+                for s in sensores:
+                    if rechazadas[s] > max_rechazos:
+                        log_message(f"{peso}g{etiqueta(s)}: lecturas inestables tras {rechazadas[s]} rechazos; "
+                                    f"se repite el paso")
+                reintento = True
             
-            if calibration_canceled:
+            if cancelado():
+                calibration_canceled = True
+                break
+            if _progress_handler.stop_requested:
+                log_message(f"Parada temprana: calibración terminada antes de {peso}g")
                 break
                 
-            # Guardar muestras para este peso
-            with open(fullpath, 'a', newline='') as f:
-                writer = csv.writer(f)
-                for msg in buffer_datos[:samples]:
-                    lectura = msg.split(':')[-1].strip()
-                    writer.writerow([sensor_actual, peso, lectura])
+            # Guardar muestras para este peso e incorporarlas al ajuste de cada sensor
+            for s in sensores:
+                buffers[s].append_csv(partials[s], s, step, sync=True)
+                fit = ajustes[s].commit_step(peso, buffers[s].step_volts(step))
+                hechas += buffers[s].counts[step]
+                estado['conteos'][s].append(int(buffers[s].counts[step]))
+                if fit:
+                    log_message(f"{peso}g{etiqueta(s)}: R² = {fit['R2']:.4f}, RMSE = {fit['RMSE_V'] * 1000:.1f} mV")
+            schedule.done(step)
+
+            # Checkpoint del peso terminado (junto al CSV del primer sensor)
+            estado.update(paso=step, programa=schedule.to_dict(), t_ns=clock.stamp(),
+                          bytes={s: os.path.getsize(partials[s]) for s in sensores})
+            estado['pesos_hechos'].append(peso)
+            ckpt = checkpoint_path(fullpaths[sensores[0]])
+            save_checkpoint(ckpt, estado)
         
         # Finalizar modo calibración
-        await ble_client.write_gatt_char(CHAR_CMD_UUID, b"i")
-        await asyncio.sleep(0.2)
+        await commands.send("i")
         await ble_client.stop_notify(CHAR_RESULT_UUID)
         
         # Verificar si se completó o se canceló
         if calibration_canceled:
-            if os.path.exists(fullpath):
-                os.remove(fullpath)
+            _keep_or_remove(partials, ckpt)
             return None
         else:
-            return fullpath
+            print_timing("Sesión de calibración", np.sort(np.concatenate([b.timestamps() for b in buffers.values()])))
+            for s in sensores:
+                os.replace(partials[s], fullpaths[s])
+            if ckpt:
+                remove_checkpoint(ckpt)
+            return [fullpaths[s] for s in sensores] if multi else fullpaths[sensor]
             
     except Exception as e:
         # Limpiar en caso de error
         try:
-            await ble_client.write_gatt_char(CHAR_CMD_UUID, b"i")
+            await commands.send("i", strict=False)
             await ble_client.stop_notify(CHAR_RESULT_UUID)
         except:
             pass
         
-        if 'fullpath' in locals() and os.path.exists(fullpath):
-            os.remove(fullpath)
+        _keep_or_remove(partials, ckpt)
         raise e
 
-async def operacion_ble_wrapper():
-    """Wrapper para operación BLE desde GUI"""
+def _keep_or_remove(partials, ckpt):
+    # Calibración interrumpida: con algún peso guardado queda reanudable; si no, se borra
+    if ckpt and os.path.exists(ckpt):
+        log_message(f"Progreso guardado; puede reanudarse desde {os.path.basename(ckpt)}")
+        return
+    for path in partials.values():
+        if os.path.exists(path):
+            os.remove(path)
+
+def calibration_jobs(paths):
+    """Pares (csv, carpeta de reportes de su sensor) para process_many."""
+    return [(p, os.path.join(dir_processed, os.path.basename(os.path.dirname(p)))) for p in paths]
+
+def process_calibrations(paths, workers=None, progress=None):
+    """
+    Procesa en paralelo (un proceso por calibración) los CSV de una
+    calibración multicanal. Devuelve ({csv: props_df}, {csv: error}) como process_many.
+    """
+    return process_many(calibration_jobs(paths), workers, progress)
+
+async def operacion_ble_wrapper(rate_hz=None):
+    """Wrapper para operación BLE desde GUI (rate_hz: operación rápida a esa tasa)"""
     if not ble_connected or not ble_client:
         raise Exception("BLE no conectado")
     
-    try:
-        await operacion_ble(ble_client)
-    finally:
-        pass  # No desconectar automáticamente
+    # No desconectar automáticamente; "Detener" en la GUI fija cancel_event
+    return await operacion_ble(ble_client, _progress_handler.cancel_event, rate_hz)
 
 async def connect_ble_wrapper():
     """Wrapper para conectar BLE desde GUI"""
@@ -724,4 +1162,14 @@ async def disconnect_ble_wrapper():
 
 def is_ble_connected():
     """Verifica si BLE está conectado"""
-    return ble_connected and ble_client and ble_client.is_connected
\ No newline at end of file
+    return ble_connected and ble_client and ble_client.is_connected
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Interrumpido por usuario.")
+        sys.exit(0)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Ejecutable desde Code/ o Code/Test
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Protocol import OperationSession, set_log_callback
+from simulated_device import SimulatedDevice
+
+
+async def run_session(rate_hz, duration, latency_s, loss, root):
+    device = SimulatedDevice(latency_s=latency_s, loss=loss)
+    session = OperationSession(device, root, rate_hz=rate_hz or None)
+    asyncio.get_running_loop().call_later(duration, session.stop)
+    stats = await session.run()
+    return device, session, stats
+
+
+def summarize(rate_hz, device, session, stats):
+    lat = np.array(device.latencies) * 1e3 if device.latencies else np.full((1, 2), np.nan)
+    handler_us = np.array(device.handler_s) * 1e6 if device.handler_s else np.array([np.nan])
+    dur = stats['Duracion_s'] or np.nan
+    lograda = stats.get('Tasa_muestreo_Hz') or round((session.samples / 4 - 1) / dur, 1)
+    return {
+        'Pedida_Hz': rate_hz or 'texto',
+        'Lograda_Hz': lograda,
+        'Notif_s': stats['Tasa_Hz'],
+        'Perdida_%': stats['Perdida_pct'],
+        'Lat_p50_ms': round(float(np.median(lat[:, 0])), 1),
+        'Lat_p95_ms': round(float(np.percentile(lat[:, 0], 95)), 1),
+        'Handler_us': round(float(np.median(handler_us)), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Tasa lograda y latencia de la operación contra el dispositivo simulado.')
+    parser.add_argument('--rates', '-r', default='0,50,100,200,500,1000',
+                        help='Tasas a probar en Hz (0 = modo texto clásico)')
+    parser.add_argument('--duration', '-t', type=float, default=3.0, help='Segundos por tasa')
+    parser.add_argument('--latency', type=float, default=0.008, help='Retardo del enlace (s)')
+    parser.add_argument('--loss', type=float, default=0.0, help='Probabilidad de perder una notificación')
+    args = parser.parse_args()
+    set_log_callback(lambda msg: None)  # sin una línea de consola por muestra
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rate in (int(r) for r in args.rates.split(',')):
+            root = os.path.join(tmp, f"operacion_{rate}")
+            device, session, stats = asyncio.run(
+                run_session(rate, args.duration, args.latency, args.loss, root))
+            rows.append(summarize(rate, device, session, stats))
+
+    cols = list(rows[0])
+    print("  ".join(f"{c:>11s}" for c in cols))
+    for row in rows:
+        print("  ".join(f"{str(row[c]):>11s}" for c in cols))
+
+
+if __name__ == '__main__':
+    main()
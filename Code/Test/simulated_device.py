@@ -0,0 +1,131 @@
+import asyncio
+import math
+import random
+import time
+
+from frames import BATCH_MAGIC, BATCH_HEADER
+from Process.timing import LEGACY_PERIOD_S
+
+# Mismos límites que Com_Protocol_v1.ino
+BATCH_MAX = 8
+NOTIFY_MAX_HZ = 25
+TASA_MAX_HZ = 1000
+
+
+class SimulatedDevice:
+    """
+    Dispositivo simulado con la interfaz de BleakClient que usa Protocol
+    (is_connected, start_notify, stop_notify, write_gatt_char). Responde
+    como Com_Protocol_v1: 'o' (texto cada ~540 ms), 'r<Hz>' + 'f' (lotes
+    binarios), 's<N>', 'b', 't' e 'i'. `latency_s` es el retardo del enlace
+    y `loss` la probabilidad de perder una notificación. Por cada lote
+    entregado guarda la latencia adquisición→fin del handler del host.
+    """
+    is_connected = True
+
+    def __init__(self, latency_s=0.008, loss=0.0, seed=0):
+        self.latency_s = latency_s
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.callback = None
+        self.mode = 'i'
+        self.canal = 0
+        self.configure_rate(100)
+        self.seq = 0
+        self.boot = time.perf_counter()
+        self.task = None
+        self.latencies = []    # (primera muestra, última muestra) en s
+        self.handler_s = []    # duración del handler por notificación
+
+    # --- Interfaz de BleakClient ---
+    async def start_notify(self, uuid, callback):
+        self.callback = callback
+
+    async def stop_notify(self, uuid):
+        self.callback = None
+
+    async def write_gatt_char(self, uuid, data):
+        cmd = data.decode()
+        await asyncio.sleep(self.latency_s)
+        if cmd in ('o', 'f'):
+            self.mode = cmd
+            self.seq = 0
+            self._reply("Modo: Operacion" if cmd == 'o' else "Modo: Operacion rapida")
+            if self.task is None or self.task.done():
+                self.task = asyncio.ensure_future(self._stream())
+        elif cmd.startswith('r') and cmd[1:].isdigit():
+            hz = int(cmd[1:])
+            if 1 <= hz <= TASA_MAX_HZ:
+                self.configure_rate(hz)
+                self._reply(f"Tasa: {self.rate_hz} Hz, lote {self.batch}")
+            else:
+                self._reply("Error: tasa fuera de rango")
+        elif cmd.startswith('s') and cmd[1:].isdigit():
+            self.canal = int(cmd[1:])
+            self._reply(f"Canal Calib set a {self.canal}")
+        elif cmd == 'b':
+            self.mode = cmd
+            self._reply(f"Modo: Calibracion, Canal={self.canal}")
+        elif cmd == 't':
+            self._reply(f"Calib S{self.canal}:{self._adc(self.canal, time.perf_counter())}")
+        elif cmd == 'i':
+            self.mode = cmd
+            self._reply("Modo: Idle")
+        else:
+            self._reply("Cmd no reconocido")
+
+    def configure_rate(self, hz):
+        self.rate_hz = hz
+        self.period_us = 1_000_000 // hz
+        self.batch = min(max((hz + NOTIFY_MAX_HZ - 1) // NOTIFY_MAX_HZ, 1), BATCH_MAX)
+
+    # --- Señal y envío ---
+    def _adc(self, canal, t):
+        # Carga periódica tipo marcha (1 Hz), desfasada por canal
+        return int(264 + 380 * (1 + math.sin(2 * math.pi * t + canal * math.pi / 2)))
+
+    def _reply(self, msg):
+        asyncio.get_running_loop().call_later(self.latency_s, self._deliver, msg.encode(), None)
+
+    def _deliver(self, payload, t_samples):
+        if self.callback is None:
+            return
+        t0 = time.perf_counter()
+        self.callback(None, bytearray(payload))
+        done = time.perf_counter()
+        if t_samples is not None:
+            self.handler_s.append(done - t0)
+            self.latencies.append((done - t_samples[0], done - t_samples[-1]))
+
+    def _send(self, payload, t_samples):
+        if self.loss and self.rng.random() < self.loss:
+            return
+        asyncio.get_running_loop().call_later(self.latency_s, self._deliver, payload, t_samples)
+
+    async def _stream(self):
+        next_t = time.perf_counter()
+        while self.mode in ('o', 'f'):
+            if self.mode == 'o':
+                next_t += LEGACY_PERIOD_S
+                await asyncio.sleep(max(0.0, next_t - time.perf_counter()))
+                if self.mode != 'o':
+                    break
+                t = time.perf_counter()
+                vals = [min(max((self._adc(c, t) - 264) * 11.0 / 1023.0, 0.0), 11.0) for c in range(4)]
+                text = " ".join(f"S{c}:{v:.2f}" for c, v in enumerate(vals)) + f" #{self.seq & 0xFFFF}"
+                self._send(text.encode(), [t])
+            else:
+                # Un lote: `batch` muestras separadas por period_us, enviado tras la última
+                period = self.period_us / 1e6
+                t_samples = [next_t + k * period for k in range(self.batch)]
+                next_t = t_samples[-1] + period
+                await asyncio.sleep(max(0.0, t_samples[-1] - time.perf_counter()))
+                if self.mode != 'f':
+                    break
+                t0_us = int((t_samples[0] - self.boot) * 1e6) & 0xFFFFFFFF
+                payload = bytearray(BATCH_HEADER.pack(BATCH_MAGIC, self.seq & 0xFFFF, self.batch, t0_us))
+                for ts in t_samples:
+                    for c in range(4):
+                        payload += self._adc(c, ts).to_bytes(2, 'little')
+                self._send(bytes(payload), t_samples)
+            self.seq += 1
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+pytest.importorskip('bleak')
+
+import Protocol
+from checkpoint import find_checkpoints, load_checkpoint, partial_path
+from schedule import make_schedule
+from simulated_device import SimulatedDevice
+
+
+class Balanza(SimulatedDevice):
+    """Lectura según el peso colocado (curva ln(P) cuadrática con ruido)."""
+    peso = 250
+    ruido = np.random.default_rng(0)
+
+    def _adc(self, canal, t):
+        lp = np.log(self.peso)
+        V = -0.1771 * lp ** 2 + 2.9836 * lp - 9.4634 + self.ruido.normal(0, 0.004)
+        return int(round(V * 1023 / 3.3))
+
+
+@pytest.fixture
+def dispositivo(tmp_path, monkeypatch):
+    real_sleep = asyncio.sleep
+
+    async def fast_sleep(d, *a):
+        await real_sleep(min(d, 0.002))
+
+    monkeypatch.setattr(asyncio, 'sleep', fast_sleep)
+    monkeypatch.chdir(tmp_path)
+    dev = Balanza(latency_s=0.001)
+    monkeypatch.setattr(Protocol, 'ble_client', dev)
+    monkeypatch.setattr(Protocol, 'ble_connected', True)
+    Protocol.set_log_callback(lambda msg: None)
+    yield dev
+    Protocol.set_progress_callback(None)
+    Protocol.set_log_callback(None)
+
+
+def test_confirmacion_sincrona_no_se_pierde(dispositivo, monkeypatch):
+    # Consola: input() y confirm_weight() ocurren dentro del propio callback
+    monkeypatch.setattr('builtins.input', lambda prompt='': '')
+
+    def progress(cur, tot, msg, extra):
+        if extra.get('esperar_confirmacion'):
+            dispositivo.peso = extra['peso_actual']
+        Protocol._console_progress(cur, tot, msg, extra)
+
+    Protocol.set_progress_callback(progress)
+    schedule = make_schedule('personalizada', 4, "250,500,1000")
+    path = asyncio.run(asyncio.wait_for(Protocol.calibracion_ble_wrapper(4, "0", schedule), 10))
+    assert os.path.exists(path)
+    with open(path) as f:
+        assert len(f.readlines()) == 1 + 3 * 4
+
+
+def test_reanudar_rechaza_parcial_truncado(dispositivo):
+    def progress(cur, tot, msg, extra):
+        if extra.get('esperar_confirmacion'):
+            dispositivo.peso = extra['peso_actual']
+            if dispositivo.peso == 1000:
+                Protocol.calibration_canceled = True  # corte tras dos pesos guardados
+            else:
+                Protocol.confirm_weight()
+
+    Protocol.set_progress_callback(progress)
+    schedule = make_schedule('personalizada', 4, "250,500,1000")
+    assert asyncio.run(asyncio.wait_for(Protocol.calibracion_ble_wrapper(4, "0", schedule), 10)) is None
+    ckpt, = find_checkpoints(Protocol.DIR_DATA)
+    parcial = partial_path(load_checkpoint(ckpt)['csv']['0'])
+
+    # El disco perdió la cola del .part (escritura sin fsync antes del corte)
+    with open(parcial, 'r+b') as f:
+        f.truncate(os.path.getsize(parcial) - 10)
+    tam = os.path.getsize(parcial)
+    with pytest.raises(ValueError):
+        asyncio.run(Protocol.calibracion_ble_wrapper(None, None, resume=ckpt))
+    # Ni se rellena con ceros ni se borra: queda para revisarlo a mano
+    assert os.path.getsize(parcial) == tam
+    assert os.path.exists(ckpt)
+
+
+def test_reanudar_salta_los_pesos_medidos(dispositivo):
+    colocados = []
+    cortar = [True]
+
+    def progress(cur, tot, msg, extra):
+        if extra.get('esperar_confirmacion'):
+            dispositivo.peso = extra['peso_actual']
+            colocados.append(dispositivo.peso)
+            if dispositivo.peso == 1000 and cortar[0]:
+                Protocol.calibration_canceled = True
+            else:
+                Protocol.confirm_weight()
+
+    Protocol.set_progress_callback(progress)
+    schedule = make_schedule('personalizada', 4, "250,500,1000,2000")
+    assert asyncio.run(asyncio.wait_for(Protocol.calibracion_ble_wrapper(4, "0", schedule), 10)) is None
+    ckpt, = find_checkpoints(Protocol.DIR_DATA)
+    estado = load_checkpoint(ckpt)
+    assert estado['pesos_hechos'] == [250, 500]
+    assert os.path.exists(partial_path(estado['csv']['0']))
+
+    cortar[0] = False
+    colocados.clear()
+    path = asyncio.run(asyncio.wait_for(Protocol.calibracion_ble_wrapper(None, None, resume=ckpt), 10))
+    assert path == estado['csv']['0']
+    assert colocados == [1000, 2000]  # solo se piden los pesos que faltaban
+    assert not os.path.exists(ckpt) and not os.path.exists(partial_path(path))
+    with open(path) as f:
+        pesos = [int(float(line.split(',')[1])) for line in f.readlines()[1:]]
+    assert pesos == [250] * 4 + [500] * 4 + [1000] * 4 + [2000] * 4
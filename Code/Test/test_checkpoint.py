@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from checkpoint import (save_checkpoint, load_checkpoint, find_checkpoints, describe,
+                        remove_checkpoint, checkpoint_path, partial_path, CHECKPOINT_VERSION)
+from schedule import make_schedule, schedule_from_dict
+
+
+def _estado(csv_path, pesos=(250, 500)):
+    programa = make_schedule('personalizada', 4, '250, 500, 1000')
+    for step in range(len(pesos)):
+        programa.done(step)
+    return {'sensores': ['0'], 'multi': False, 'muestras': 4, 'csv': {'0': csv_path},
+            'programa': programa.to_dict(), 'pesos_hechos': list(pesos),
+            'conteos': {'0': [4] * len(pesos)}, 'bytes': {'0': 321}, 't_ns': 1_500_000_000}
+
+
+def _checkpoint(data_dir, sensor, n, mtime):
+    folder = os.path.join(data_dir, f'sensor{sensor}')
+    os.makedirs(folder, exist_ok=True)
+    csv_path = os.path.join(folder, f'calibracion_sensor{sensor}_{n}.csv')
+    ckpt = checkpoint_path(csv_path)
+    save_checkpoint(ckpt, _estado(csv_path))
+    os.utime(ckpt, (mtime, mtime))
+    return ckpt
+
+
+def test_ida_y_vuelta(tmp_path):
+    csv_path = str(tmp_path / 'calibracion_sensor0_1.csv')
+    ckpt = checkpoint_path(csv_path)
+    save_checkpoint(ckpt, _estado(csv_path))
+    assert not os.path.exists(ckpt + '.tmp')
+
+    estado = load_checkpoint(ckpt)
+    assert estado['version'] == CHECKPOINT_VERSION and estado['epoch_ns'] > 0
+    assert estado['csv'] == {'0': csv_path} and estado['bytes'] == {'0': 321}
+    programa = schedule_from_dict(estado['programa'])
+    assert programa.measured == [0, 1]
+    assert programa.next() == (2, 1000, 4)  # sigue por el primer peso sin medir
+    assert describe(estado).startswith("Sensor 0: 2 pesos (último 500 g), ")
+
+
+def test_sobrescribe_de_forma_atomica(tmp_path):
+    ckpt = str(tmp_path / 'c.csv.ckpt.json')
+    save_checkpoint(ckpt, _estado('c.csv'))
+    save_checkpoint(ckpt, _estado('c.csv', pesos=(250, 500, 1000)))
+    assert load_checkpoint(ckpt)['pesos_hechos'] == [250, 500, 1000]
+    assert os.listdir(tmp_path) == ['c.csv.ckpt.json']
+
+
+def test_version_no_soportada(tmp_path):
+    ckpt = tmp_path / 'c.csv.ckpt.json'
+    ckpt.write_text(json.dumps(dict(_estado('c.csv'), version=CHECKPOINT_VERSION + 1)))
+    with pytest.raises(ValueError, match="versión"):
+        load_checkpoint(str(ckpt))
+
+
+def test_busqueda_del_mas_reciente_al_mas_antiguo(tmp_path):
+    data_dir = str(tmp_path / 'Data')
+    assert find_checkpoints(data_dir) == []
+    viejo = _checkpoint(data_dir, 0, 1, 1_000_000)
+    nuevo = _checkpoint(data_dir, 2, 1, 3_000_000)
+    medio = _checkpoint(data_dir, 10, 4, 2_000_000)
+    # Otros archivos no son checkpoints: CSV terminados, parciales, temporales
+    folder = os.path.join(data_dir, 'sensor0')
+    for nombre in ('calibracion_sensor0_0.csv', partial_path('calibracion_sensor0_1.csv'),
+                   'calibracion_sensor0_1.csv.ckpt.json.tmp'):
+        open(os.path.join(folder, nombre), 'w').close()
+    open(os.path.join(data_dir, 'suelto.ckpt.json'), 'w').close()
+
+    assert find_checkpoints(data_dir) == [nuevo, medio, viejo]
+
+    remove_checkpoint(medio)
+    remove_checkpoint(viejo)
+    assert not os.path.exists(viejo + '.tmp')
+    assert find_checkpoints(data_dir) == [nuevo]
+    remove_checkpoint(viejo)  # ya borrado: no falla
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from commands import CommandChannel, CommandError, ack_pattern
+
+
+class FakeClient:
+    """write_gatt_char falso: responde cada comando con `replies[cmd]` a través de feed()."""
+    def __init__(self, replies):
+        self.replies = replies
+        self.written = []
+        self.channel = None
+
+    async def write_gatt_char(self, uuid, data):
+        cmd = data.decode()
+        self.written.append(cmd)
+        for msg in self.replies.get(cmd, []):
+            asyncio.get_running_loop().call_later(0.001, self.channel.feed, msg)
+
+
+def _channel(replies, timeout=0.2):
+    client = FakeClient(replies)
+    client.channel = CommandChannel(client, 'cmd-uuid', timeout=timeout)
+    return client, client.channel
+
+
+@pytest.mark.parametrize('reply', ["Canal Calib set a 3", "Canal seleccionado: S3"])
+def test_canal_de_ambos_firmwares(reply):
+    async def run():
+        _, ch = _channel({'s3': [reply]})
+        return await ch.send('s3')
+    assert asyncio.run(run()) == reply
+
+
+def test_canal_equivocado_no_confirma():
+    assert ack_pattern('s3').match("Canal Calib set a 1") is None
+    assert ack_pattern('s1').match("Canal seleccionado: S12") is None
+    assert ack_pattern('r200').match("Tasa: 200 Hz, lote 8")
+    assert ack_pattern('x') is None
+
+
+def test_pipeline_resuelve_cada_comando():
+    async def run():
+        # Las respuestas llegan en otro orden que los comandos
+        _, ch = _channel({'s1': ["Canal Calib set a 1"], 'b': []})
+        tarea = asyncio.ensure_future(ch.send_all('s1', 'b'))
+        await asyncio.sleep(0.01)
+        assert ch.feed("Modo: Calibracion, Canal=1") is True
+        return await tarea, ch
+    msgs, ch = asyncio.run(run())
+    assert msgs == ["Canal Calib set a 1", "Modo: Calibracion, Canal=1"]
+    assert not ch.pending and ch.last_rtt_ms is not None
+
+
+def test_error_falla_el_pendiente_mas_antiguo():
+    async def run():
+        _, ch = _channel({})
+        primero = asyncio.ensure_future(ch.send('r5000'))
+        segundo = asyncio.ensure_future(ch.send('i'))
+        await asyncio.sleep(0.01)
+        assert ch.feed("Error: tasa fuera de rango") is True
+        with pytest.raises(CommandError, match="r5000"):
+            await primero
+        assert not segundo.done()
+        ch.feed("Modo: Idle")
+        return await segundo
+    assert asyncio.run(run()) == "Modo: Idle"
+
+
+def test_notificacion_ajena_no_se_consume():
+    async def run():
+        _, ch = _channel({})
+        assert ch.feed("Cmd no reconocido") is False  # sin pendientes: no es de nadie
+        assert ch.feed("Calib S0:500") is False
+    asyncio.run(run())
+
+
+def test_timeout_y_strict():
+    async def run():
+        _, ch = _channel({}, timeout=0.02)
+        with pytest.raises(CommandError, match="Sin confirmación"):
+            await ch.send('i')
+        assert await ch.send('i', strict=False) is None
+        # Un rechazo con strict=False también devuelve None
+        tarea = asyncio.ensure_future(ch.send('o', timeout=1.0, strict=False))
+        await asyncio.sleep(0.01)
+        ch.feed("Cmd no reconocido")
+        assert await tarea is None
+        assert not ch.pending
+    asyncio.run(run())
+
+
+def test_comando_sin_confirmacion_no_espera():
+    async def run():
+        client, ch = _channel({})
+        assert await ch.send('x') is None
+        return client.written
+    assert asyncio.run(run()) == ['x']
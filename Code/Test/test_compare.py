@@ -0,0 +1,18 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Process.compare import load_archive
+
+
+def test_corridas_en_orden_numerico(tmp_path):
+    for sensor, runs in (('sensor2', (10, 2, 1)), ('sensor10', (1,))):
+        folder = tmp_path / sensor
+        folder.mkdir()
+        for k in runs:
+            filas = ''.join(f'{sensor[6:]},{p},{300 + p // 10}\n' for p in (250, 500, 1000, 2000))
+            (folder / f'calibracion_{sensor}_{k}.csv').write_text('Sensor,Peso_g,Lectura\n' + filas)
+    runs = load_archive(str(tmp_path))['runs']
+    assert list(runs['Calibracion']) == ['calibracion_sensor2_1', 'calibracion_sensor2_2',
+                                         'calibracion_sensor2_10', 'calibracion_sensor10_1']
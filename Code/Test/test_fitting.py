@@ -0,0 +1,80 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Process.fitting import RunningFit
+
+COEFFS = (-0.1771, 2.9836, -9.4634)
+PESOS = [250, 500, 750, 1000, 1500, 2000, 3000, 4000]
+
+
+def _muestras(pesos, n=6, ruido=0.004, seed=0):
+    rng = np.random.default_rng(seed)
+    P = np.repeat(np.asarray(pesos, dtype=float), n)
+    lp = np.log(P)
+    V = COEFFS[0] * lp ** 2 + COEFFS[1] * lp + COEFFS[2] + rng.normal(0, ruido, len(P))
+    return P, V
+
+
+def test_incremental_igual_a_polyfit():
+    P, V = _muestras(PESOS)
+    fit = RunningFit()
+    for peso in PESOS:  # un paso por peso, como en la calibración
+        fit.add(peso, V[P == peso])
+    res = fit.solve()
+    coef = np.polyfit(np.log(P), V, 2)
+    np.testing.assert_allclose(res['coeffs'], coef, rtol=1e-8, atol=1e-10)
+    pred = np.polyval(coef, np.log(P))
+    r2 = 1 - np.sum((V - pred) ** 2) / np.sum((V - V.mean()) ** 2)
+    assert abs(res['R2'] - r2) < 1e-9
+    assert abs(res['RMSE_V'] - np.sqrt(np.mean((V - pred) ** 2))) < 1e-9
+    assert res['N'] == len(P)
+
+
+def test_quitar_muestras_deshace_el_ajuste():
+    P, V = _muestras(PESOS)
+    fit = RunningFit()
+    fit.add(P, V)
+    antes = fit.solve()
+    fit.add(5000.0, [2.5, 2.6])
+    fit.add(5000.0, [2.5, 2.6], sign=-1)
+    assert 5000.0 not in fit.groups
+    np.testing.assert_allclose(fit.solve()['coeffs'], antes['coeffs'], rtol=1e-9)
+    assert fit.preview(5000.0, [2.5])['N'] == antes['N'] + 1
+    assert fit.solve()['N'] == antes['N']
+
+
+def test_menos_de_tres_pesos_no_resuelve():
+    fit = RunningFit()
+    fit.add(250.0, [0.5, 0.51])
+    fit.add(500.0, [0.9, 0.91])
+    assert fit.solve() is None
+    assert np.isinf(fit.force_sigma([1000.0])).all()
+
+
+def test_sigma_de_fuerza_baja_con_mas_muestras():
+    P, V = _muestras(PESOS)
+    fit = RunningFit()
+    fit.add(P, V)
+    sigma = fit.force_sigma(PESOS)
+    assert np.all(np.isfinite(sigma)) and np.all(sigma > 0)
+    con_extra = fit.force_sigma([4000.0], extra=(4000.0, 20))
+    assert con_extra[0] < sigma[-1]
+
+
+def test_parada_temprana():
+    P, V = _muestras(PESOS, ruido=0.002)
+    fit = RunningFit()
+    for peso in PESOS[:4]:
+        fit.commit_step(peso, V[P == peso])
+    assert not fit.can_stop()  # menos de EARLY_STOP_MIN_STEPS pesos
+    for peso in PESOS[4:]:
+        fit.commit_step(peso, V[P == peso])
+    assert fit.can_stop()
+
+    # Un peso que no sigue la curva reinicia el criterio
+    fit.commit_step(5000.0, np.full(6, 3.2))
+    assert not fit.can_stop()
@@ -0,0 +1,73 @@
+import os
+import struct
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from frames import (decode, parse_binary_batch, adc_to_value, CALIB, OP, BIN, BATCH,
+                    BIN_MAGIC, BATCH_MAGIC)
+
+
+def test_binario_de_11_bytes():
+    data = struct.pack('<BH4H', 0xA5, 65535, 0, 264, 1023, 512)
+    assert len(data) == 11
+    assert decode(data) == (BIN, 65535, (0, 264, 1023, 512))
+    assert decode(memoryview(data)) == (BIN, 65535, (0, 264, 1023, 512))
+    assert decode(bytearray(data)) == (BIN, 65535, (0, 264, 1023, 512))
+
+
+def test_lote_de_operacion_rapida():
+    adc = np.arange(3 * 4, dtype='<u2').reshape(3, 4) * 80
+    data = struct.pack('<BHBI', 0xA6, 7, 3, 0xFFFFFFF0) + adc.tobytes()
+    tipo, seq, (t0_us, muestras) = decode(data)
+    assert (tipo, seq, t0_us) == (BATCH, 7, 0xFFFFFFF0)
+    assert muestras.shape == (3, 4)
+    np.testing.assert_array_equal(muestras, adc)
+
+
+def test_lote_vacio():
+    tipo, seq, (t0_us, muestras) = decode(struct.pack('<BHBI', 0xA6, 1, 0, 5))
+    assert (tipo, seq, t0_us) == (BATCH, 1, 5) and muestras.shape == (0, 4)
+
+
+@pytest.mark.parametrize('data', [
+    struct.pack('<BH4H', 0xA5, 1, 1, 2, 3, 4)[:-1],              # binario truncado
+    struct.pack('<BH4H', 0xA5, 1, 1, 2, 3, 4) + b'\x00',          # binario con un byte de más
+    struct.pack('<BHBI', 0xA6, 1, 2, 0) + b'\x00' * 15,           # lote con una lectura de menos
+    struct.pack('<BHB', 0xA6, 1, 2),                              # cabecera de lote incompleta
+    b'\xff\x00\x13garbage',
+    b'',
+])
+def test_frames_invalidos(data):
+    assert decode(data) is None
+
+
+def test_texto_de_ambos_firmwares():
+    assert decode(b"Calib S2:494") == (CALIB, None, (2, 494))
+    assert decode(b"Op S1:3.25 #12") == (OP, 12, [(1, 3.25)])
+    assert decode(b"Op S1:3.25") == (OP, None, [(1, 3.25)])
+    assert decode(b"S0:0.00 S1:1.50 S2:  2.25 S3:11.00 #65535") == (
+        OP, 65535, [(0, 0.0), (1, 1.5), (2, 2.25), (3, 11.0)])
+
+
+def test_confirmaciones_no_son_datos():
+    # Respuestas de comandos: caen al texto y no se decodifican como frames
+    for msg in (b"Modo: Calibracion, Canal=0", b"Canal Calib set a 3", b"Cmd no reconocido",
+                b"Calib Sx:abc", b"Op S:1"):
+        assert decode(msg) is None
+
+
+def test_binarios_concatenados():
+    blob = b''.join(struct.pack('<BH4H', BIN_MAGIC, i, i, i + 1, i + 2, i + 3) for i in range(5))
+    frames = parse_binary_batch(blob)
+    assert frames['seq'].tolist() == list(range(5))
+    assert frames['adc'][4].tolist() == [4, 5, 6, 7]
+    with pytest.raises(ValueError):
+        parse_binary_batch(bytes([BATCH_MAGIC]) + blob[1:])
+
+
+def test_conversion_adc():
+    np.testing.assert_allclose(adc_to_value([0, 264, 1287, 5000]), [0.0, 0.0, 11.0, 11.0])
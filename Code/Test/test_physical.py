@@ -0,0 +1,26 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Process.physical import fit_physical, model_voltage, _force_n
+
+
+PESOS = np.array([50, 100, 200, 300, 500, 700, 1000, 1500, 2000, 3000], dtype=float)
+
+
+def test_ajuste_sano_es_valido():
+    theta = (np.log(8e4), 1.3, 0.47, np.log(1.7e4))
+    V = model_voltage(theta, _force_n(PESOS))
+    fit = fit_physical(PESOS, V)
+    assert fit['Valido'] and fit['En_limite'] == ''
+
+
+def test_sensor_sin_respuesta_no_es_valido():
+    # Lectura plana con ruido (como sensor2): R² ≈ 0 aunque least_squares "converja"
+    V = 0.08 + np.random.default_rng(0).normal(0, 0.004, len(PESOS))
+    fit = fit_physical(PESOS, V)
+    assert fit['Convergio']
+    assert not fit['Valido']
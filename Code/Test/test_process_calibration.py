@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Process.process_calibration import list_jobs, calibration_index
+
+
+def test_solo_calibraciones_de_carpetas_de_sensor(tmp_path):
+    data = tmp_path / 'Data'
+    for rel in ('sensor0/calibracion_sensor0_2.csv', 'sensor0/calibracion_sensor0_10.csv',
+                'sensor0/notas.csv', 'sensor0/calibracion_sensor1_1.csv',
+                'operacion/manifest.csv', 'operacion/sessions.csv'):
+        (data / rel).parent.mkdir(parents=True, exist_ok=True)
+        (data / rel).write_text('Sensor,Peso_g,Lectura\n')
+    jobs = list_jobs(str(data), 'Processed')
+    assert [os.path.basename(csv) for csv, _ in jobs] == ['calibracion_sensor0_2.csv',
+                                                          'calibracion_sensor0_10.csv']
+    assert {out for _, out in jobs} == {os.path.join('Processed', 'sensor0')}
+
+
+def test_indice_de_calibracion():
+    assert calibration_index('calibracion_sensor3_12.csv') == 12
+    assert calibration_index('calibracion_sensor3_12.csv', '2') is None
+    assert calibration_index('manifest.csv') is None
@@ -0,0 +1,110 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from schedule import (parse_schedule, make_schedule, schedule_from_dict, FixedSchedule,
+                      AdaptiveSchedule, DEFAULT_WEIGHTS, MIN_STEPS)
+from Process.fitting import RunningFit
+
+
+def _voltajes(peso, n, rng, ruido=0.004):
+    lp = np.log(peso)
+    return -0.1771 * lp ** 2 + 2.9836 * lp - 9.4634 + rng.normal(0, ruido, n)
+
+
+def _calibrar(schedule, seed=0):
+    """Recorre el programa como la calibración: mide, ajusta y marca cada paso."""
+    rng = np.random.default_rng(seed)
+    fit = RunningFit()
+    pasos = []
+    while (siguiente := schedule.next(fit)) is not None:
+        step, peso, n = siguiente
+        fit.commit_step(peso, _voltajes(peso, n, rng))
+        schedule.done(step)
+        pasos.append((peso, n))
+    return pasos
+
+
+def test_programa_con_muestras_por_peso():
+    assert parse_schedule('250, 500:20 1000', 10) == ([250, 500, 1000], [10, 20, 10])
+    assert parse_schedule(' 1500.0:5 ,, ', 10) == ([1500], [5])
+
+
+@pytest.mark.parametrize('texto, mensaje', [
+    ('250, abc', "inválida: 'abc'"),
+    ('250:x', "inválida: '250:x'"),
+    ('', 'vacío'),
+    (' , ', 'vacío'),
+    ('250, -500', 'positivos'),
+    ('250:0', 'positivos'),
+])
+def test_programa_invalido(texto, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        parse_schedule(texto, 10)
+
+
+def test_programa_fijo():
+    s = make_schedule('personalizada', 10, '250, 500:20, 1000')
+    assert s.total_samples() == 40
+    assert _calibrar(s) == [(250, 10), (500, 20), (1000, 10)]
+    assert s.next() is None
+    assert make_schedule('fija', 5).candidates == DEFAULT_WEIGHTS
+    with pytest.raises(ValueError):
+        FixedSchedule([250, 500], [10])
+    with pytest.raises(ValueError):
+        make_schedule('aleatoria')
+
+
+def test_semillas_adaptativas():
+    s = AdaptiveSchedule([4000, 250, 500, 1000, 2000], samples=8)
+    assert s.candidates == [250, 500, 1000, 2000, 4000]
+    # Extremos y el más cercano a la media geométrica (1000 g)
+    assert s.seeds == [0, 4, 2]
+    fit = RunningFit()
+    for esperado in (250, 4000, 1000):
+        step, peso, n = s.next(fit)
+        assert (peso, n) == (esperado, 8)
+        s.done(step)
+    with pytest.raises(ValueError):
+        AdaptiveSchedule([250, 500])
+
+
+def test_adaptativo_para_antes_con_datos_limpios():
+    s = AdaptiveSchedule(DEFAULT_WEIGHTS, samples=20, target_g=30.0)
+    pasos = _calibrar(s)
+    pesos = [p for p, _ in pasos]
+    assert MIN_STEPS <= len(pasos) < len(DEFAULT_WEIGHTS)
+    assert len(set(pesos)) == len(pesos)  # ningún peso se repite
+    assert all(s.min_samples <= n <= s.max_samples for _, n in pasos)
+
+
+def test_adaptativo_respeta_max_pasos():
+    s = AdaptiveSchedule(DEFAULT_WEIGHTS, samples=10, target_g=0.001, max_steps=7)
+    assert len(_calibrar(s)) == 7
+    assert s.total_samples() == 70
+
+
+@pytest.mark.parametrize('schedule', [
+    FixedSchedule([250, 500, 1000, 2000], [10, 20, 10, 10]),
+    AdaptiveSchedule(DEFAULT_WEIGHTS, samples=12, target_g=20.0, max_steps=9, min_samples=4),
+])
+def test_ida_y_vuelta_por_dict(schedule):
+    fit = RunningFit()
+    rng = np.random.default_rng(1)
+    for _ in range(3):
+        step, peso, n = schedule.next(fit)
+        fit.commit_step(peso, _voltajes(peso, n, rng))
+        schedule.done(step)
+
+    copia = schedule_from_dict(schedule.to_dict())
+    assert type(copia) is type(schedule)
+    assert copia.to_dict() == schedule.to_dict()
+    assert copia.measured == schedule.measured
+    # Reanudado: sigue por el mismo paso, sin repetir los ya medidos
+    siguiente = copia.next(fit)
+    assert siguiente == schedule.next(fit)
+    assert siguiente[0] not in copia.measured
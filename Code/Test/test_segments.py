@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Process.segments import import_legacy, load_range, sessions
+
+
+def test_importa_operacion_antigua(tmp_path):
+    legacy = tmp_path / 'operacion.csv'
+    legacy.write_text('Sensor,Valor\n' + ''.join(f'{c},{c + f / 10:.2f}\n'
+                                                 for f in range(5) for c in range(4)))
+    root = str(tmp_path / 'operacion')
+
+    sesion = import_legacy(root)
+    assert sesion is not None
+    assert not legacy.exists() and (tmp_path / 'operacion.csv.importado').exists()
+    assert import_legacy(root) is None  # una sola vez
+
+    table = sessions(root)
+    assert list(table['Sesion']) == [sesion]
+    data = load_range(root, session=sesion)
+    assert len(data) == 20
+    # Tiempo sintético: un frame por grupo de 4 sensores, al ritmo del modo texto (0.54 s)
+    assert sorted(set(data['T_ns'])) == [f * 540_000_000 for f in range(5)]
+    assert data.loc[data['Sensor'] == 3, 'Valor'].tolist() == [3.0, 3.1, 3.2, 3.3, 3.4]
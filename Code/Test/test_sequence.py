@@ -0,0 +1,66 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sequence import SequenceTracker
+
+
+def _feed(tracker, seqs):
+    return [tracker.update(s) for s in seqs]
+
+
+def test_sin_perdidas():
+    t = SequenceTracker()
+    _feed(t, range(100))
+    assert t.stats() == {'Frames': 100, 'Esperados': 100, 'Perdidos': 0, 'Huecos': 0,
+                         'Duplicados': 0, 'Reordenados': 0, 'Perdida_pct': 0.0}
+
+
+def test_huecos_y_perdidas():
+    t = SequenceTracker()
+    _feed(t, [0, 1, 2, 5, 6, 10])  # faltan 3, 4 y 7, 8, 9
+    s = t.stats()
+    assert (s['Esperados'], s['Perdidos'], s['Huecos']) == (11, 5, 2)
+    assert s['Perdida_pct'] == round(100 * 5 / 11, 3)
+
+
+def test_vuelta_de_16_bits():
+    t = SequenceTracker()
+    _feed(t, [65533, 65534, 65535, 0, 1, 3])
+    s = t.stats()
+    assert t.highest == 65536 + 3
+    assert (s['Esperados'], s['Perdidos'], s['Huecos'], s['Reordenados']) == (7, 1, 1, 0)
+
+
+def test_duplicados_no_se_guardan():
+    t = SequenceTracker()
+    assert _feed(t, [0, 1, 1, 2, 0]) == [True, True, False, True, False]
+    s = t.stats()
+    assert (s['Duplicados'], s['Perdidos'], s['Frames']) == (2, 0, 5)
+
+
+def test_frame_tardio_llena_el_hueco():
+    t = SequenceTracker()
+    _feed(t, [0, 1, 3, 4])
+    assert t.lost == 1
+    assert t.update(2) is True
+    s = t.stats()
+    assert (s['Perdidos'], s['Reordenados'], s['Huecos']) == (0, 1, 1)
+
+
+def test_desorden_a_traves_de_la_vuelta():
+    t = SequenceTracker()
+    _feed(t, [65534, 0, 65535, 1])
+    s = t.stats()
+    assert (s['Esperados'], s['Perdidos'], s['Reordenados']) == (4, 0, 1)
+
+
+def test_ventana_de_duplicados():
+    t = SequenceTracker(window=4)
+    _feed(t, range(10))
+    # 9 sigue en la ventana; 2 ya salió y cuenta como un frame atrasado, no como duplicado
+    assert t.update(9) is False
+    assert t.update(2) is True
+    s = t.stats()
+    assert (s['Duplicados'], s['Reordenados']) == (1, 1)
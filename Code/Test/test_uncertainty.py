@@ -0,0 +1,22 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Process.fitting import fit_models
+from Process.uncertainty import calibration_uncertainty
+
+
+def test_una_muestra_por_peso_no_da_intervalos_nulos():
+    # Una lectura por peso (como sensor2_1 y sensor3_1)
+    P = np.array([20, 50, 100, 200, 300, 500, 700, 1000, 1500, 2000], dtype=float)
+    V = 0.4 * np.log(P) - 0.8 + np.random.default_rng(1).normal(0, 0.01, len(P))
+    results, mejor = fit_models(P, V)
+    with pytest.warns(UserWarning):
+        props, band, _ = calibration_uncertainty(P, V, results[mejor], n_boot=200)
+    assert props['Remuestreo'].startswith('jackknife')
+    for name in 'abc':
+        assert props[f'{name}_IC95_sup'] > props[f'{name}_IC95_inf']
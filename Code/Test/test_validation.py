@@ -0,0 +1,18 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Process.validation import validate
+
+
+def test_sensor_sin_respuesta_acota_la_estimacion():
+    # Curva casi plana: la inversa diverge para voltajes algo fuera de ella
+    model = {'model': 'log_quad', 'coeffs': [0.0, 1e-6, 0.0], 'Rango_g': [20.0, 2000.0]}
+    P = np.array([20, 500, 1000, 2000], dtype=float)
+    V = np.array([0.0, 0.001, 0.5, 1.0])
+    summary, _ = validate(model, P, V)
+    assert summary['Acotadas'] > 0
+    assert summary['Error_max_g'] <= 2 * 2000
@@ -0,0 +1,83 @@
+import os
+import sys
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Process.watch import CalibrationWatcher
+
+
+class HeldPool:
+    """Pool falso: guarda las tareas sin ejecutarlas (los cupos quedan ocupados)."""
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        fut = Future()
+        self.jobs.append((os.path.basename(args[0]), fut))
+        return fut
+
+
+N = ['calibracion_sensor0_1.csv', 'calibracion_sensor0_2.csv', 'calibracion_sensor0_3.csv']
+
+
+def _write(path, rows):
+    with open(path, 'w') as f:
+        f.write('Sensor,Peso_g,Lectura\n' + '0,250,400\n' * rows)
+
+
+def test_cola_llena_no_pierde_cambios(tmp_path):
+    sensor = tmp_path / 'Data' / 'sensor0'
+    sensor.mkdir(parents=True)
+    for n in N:
+        _write(sensor / n, 1)
+
+    watcher = CalibrationWatcher(str(tmp_path / 'Data'), str(tmp_path / 'Processed'),
+                                 settle=1.0, max_pending=1)
+    # Orden de recorrido fijo: _1, _2, _3
+    scan = watcher.scan
+    watcher.scan = lambda: dict(sorted(scan().items()))
+    pool = HeldPool()
+
+    def terminar(t):
+        # Completa las tareas retenidas (libera los cupos) y vuelve a sondear
+        for _, fut in list(pool.jobs):
+            if not fut.done():
+                fut.set_result(None)  # dispara el callback de fin del watcher
+        watcher.poll_once(pool, now=t)
+
+    watcher.poll_once(pool, now=0.0)   # primer índice: todos nuevos
+    for t in (5.0, 7.0, 9.0, 11.0):
+        terminar(t)
+    assert sorted(name for name, _ in pool.jobs) == N
+    del pool.jobs[:]
+
+    # _1 y _2 cambian; luego _3 cambia justo cuando _1 ocupa el único cupo y _2 espera
+    _write(sensor / 'calibracion_sensor0_1.csv', 2)
+    _write(sensor / 'calibracion_sensor0_2.csv', 2)
+    watcher.poll_once(pool, now=20.0)
+    _write(sensor / 'calibracion_sensor0_3.csv', 3)
+    watcher.poll_once(pool, now=25.0)
+    assert [name for name, _ in pool.jobs] == ['calibracion_sensor0_1.csv']
+    assert os.path.join(str(sensor), 'calibracion_sensor0_3.csv') in watcher.changed
+
+    for t in (30.0, 32.0, 34.0, 36.0):
+        terminar(t)
+    assert sorted(name for name, _ in pool.jobs) == N
+
+
+def test_ignora_csv_que_no_son_calibraciones(tmp_path):
+    data = tmp_path / 'Data'
+    (data / 'sensor0').mkdir(parents=True)
+    (data / 'operacion').mkdir()
+    _write(data / 'sensor0' / N[0], 1)
+    _write(data / 'sensor0' / 'notas.csv', 1)
+    _write(data / 'operacion' / 'manifest.csv', 1)  # se reescribe en cada volcado de la sesión
+
+    watcher = CalibrationWatcher(str(data), str(tmp_path / 'Processed'), settle=1.0)
+    assert list(watcher.scan()) == [str(data / 'sensor0' / N[0])]
+    pool = HeldPool()
+    watcher.poll_once(pool, now=0.0)
+    _write(data / 'operacion' / 'manifest.csv', 2)
+    watcher.poll_once(pool, now=5.0)
+    assert [name for name, _ in pool.jobs] == [N[0]]
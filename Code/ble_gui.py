@@ -3,10 +3,21 @@ import asyncio
 import os
 from PyQt5 import QtCore, QtWidgets, QtGui
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
-from Process.process_calibration import process_file
+from Process.process_calibration import (analyze_file, render_regression, ProcessingCancelled,
+                                         find_stale, process_many, summary_table)
+from Process.downsample import decimate, visible_slice
+from Process.timing import TIME_COLUMN
+from Process.segments import load_range, latest_session, format_epoch, import_legacy
+from Process.history import update_index, open_session
+from Process.compare import compare_all
 import Protocol
+from schedule import make_schedule
+from checkpoint import find_checkpoints, load_checkpoint, describe
 import threading
+import numbers
+from collections import deque
 
 # Colores actualizados
 PALETTE = {
@@ -25,7 +36,8 @@ class BLEWorker(QtCore.QThread):
     status_update = QtCore.pyqtSignal(str, str)  # message, color
     progress_update = QtCore.pyqtSignal(int, int, str, dict)  # current, total, message, extra_data
     confirmation_required = QtCore.pyqtSignal(int)  # peso actual
-    operation_log = QtCore.pyqtSignal(str)  # mensajes de operación
+    operation_log = QtCore.pyqtSignal(str)  # mensajes de Protocol (operación: uno por muestra)
+    link_update = QtCore.pyqtSignal(dict)  # tasa y pérdida del enlace (una vez por segundo)
 
     def __init__(self, coro, *args):
         super().__init__()
@@ -41,6 +53,8 @@ class BLEWorker(QtCore.QThread):
             # Configurar handler de progreso
             Protocol.set_progress_callback(self._progress_callback)
             Protocol.set_cancel_event(self.cancel_event)
+            Protocol.set_log_callback(self.operation_log.emit)
+            Protocol.set_link_callback(self.link_update.emit)
             
             # Ejecutar en el loop de este hilo
             asyncio.set_event_loop(self._loop)
@@ -51,6 +65,9 @@ class BLEWorker(QtCore.QThread):
             if not self._stopped:
                 self.error.emit(str(e))
         finally:
+            # No dejar instalado el emisor de un worker terminado
+            Protocol.set_log_callback(None)
+            Protocol.set_link_callback(None)
             self._loop.close()
 
     def stop(self):
@@ -74,6 +91,105 @@ class BLEWorker(QtCore.QThread):
         self.confirm_event.set()
         Protocol.confirm_weight()
 
+    def request_early_stop(self):
+        """Termina la calibración conservando los pesos ya medidos"""
+        Protocol.request_early_stop()
+
+class ReportSignals(QtCore.QObject):
+    """Señales de ReportTask (QRunnable no es QObject)."""
+    progress = QtCore.pyqtSignal(int, str)
+    properties_ready = QtCore.pyqtSignal(object)  # DataFrame de propiedades
+    chart_ready = QtCore.pyqtSignal(str)          # ruta del PNG
+    failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+
+class ReportTask(QtCore.QRunnable):
+    """Genera un reporte en el QThreadPool: primero propiedades, luego la gráfica."""
+    def __init__(self, csv_path, output_dir):
+        super().__init__()
+        self.csv_path = csv_path
+        self.output_dir = output_dir
+        self.signals = ReportSignals()
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            props, fit = analyze_file(self.csv_path, self.output_dir,
+                                      self.signals.progress.emit, self.cancel_event)
+            self.signals.properties_ready.emit(props)
+            img = render_regression(fit, self.output_dir,
+                                    self.signals.progress.emit, self.cancel_event)
+            self.signals.chart_ready.emit(img)
+        except ProcessingCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+    def cancel(self):
+        self.cancel_event.set()
+
+class BatchSignals(QtCore.QObject):
+    progress = QtCore.pyqtSignal(int, int, str)  # hechos, total, archivo
+    done = QtCore.pyqtSignal(object, object)     # resultados, errores
+
+class BatchTask(QtCore.QRunnable):
+    """
+    Reprocesa en un pool de procesos las calibraciones sin resultados o
+    desactualizadas, o solo los pares (csv, salida) de `jobs` si se dan.
+    """
+    def __init__(self, data_dir, output_dir, jobs=None):
+        super().__init__()
+        self.data_dir = data_dir
+        self.output_dir = output_dir
+        self.jobs = jobs
+        self.signals = BatchSignals()
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        jobs = self.jobs if self.jobs is not None else find_stale(self.data_dir, self.output_dir)
+        self.signals.progress.emit(0, len(jobs), '')
+        results, errors = process_many(jobs, progress=self.signals.progress.emit,
+                                       cancel=self.cancel_event)
+        self.signals.done.emit(results, errors)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+class HistorySignals(QtCore.QObject):
+    done = QtCore.pyqtSignal(object)  # índice de sesiones (DataFrame)
+    error = QtCore.pyqtSignal(str)
+
+class HistoryTask(QtCore.QRunnable):
+    """Indexa en segundo plano las sesiones de operación nuevas."""
+    def __init__(self, root):
+        super().__init__()
+        self.root = root
+        self.signals = HistorySignals()
+
+    def run(self):
+        try:
+            self.signals.done.emit(update_index(self.root))
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+class CompareSignals(QtCore.QObject):
+    done = QtCore.pyqtSignal(object)  # (propiedades, deriva, figura, omitidas)
+    error = QtCore.pyqtSignal(str)
+
+class CompareTask(QtCore.QRunnable):
+    """Reporte comparativo de todo el archivo de calibraciones, en segundo plano."""
+    def __init__(self, data_dir, output_dir):
+        super().__init__()
+        self.data_dir = data_dir
+        self.output_dir = output_dir
+        self.signals = CompareSignals()
+
+    def run(self):
+        try:
+            self.signals.done.emit(compare_all(self.data_dir, self.output_dir))
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
 class PlotCanvas(FigureCanvas):
     """Canvas para mostrar imágenes o gráficas."""
     def __init__(self, parent=None, width=5, height=4, dpi=100):
@@ -91,6 +207,116 @@ class PlotCanvas(FigureCanvas):
         self.ax.axis('off')
         self.draw()
 
+class TimeSeriesCanvas(FigureCanvas):
+    """Canvas para series largas: dibuja solo ~1 punto por píxel y recalcula al hacer zoom/pan."""
+    def __init__(self, parent=None, width=7, height=4, dpi=100, method='minmax'):
+        fig = Figure(figsize=(width, height), dpi=dpi)
+        fig.patch.set_facecolor(PALETTE['background'])
+        self.ax = fig.add_subplot(111)
+        super().__init__(fig)
+        self.setParent(parent)
+        self.method = method
+        self.series = []  # (x, y, Line2D)
+        self.ax.callbacks.connect('xlim_changed', self._on_xlim)
+
+    def clear(self):
+        self.ax.clear()
+        self.series = []
+        self.ax.callbacks.connect('xlim_changed', self._on_xlim)
+
+    def add_series(self, x, y, label=None):
+        """Agrega una serie completa (x ordenado); se decima al dibujar."""
+        xs, ys = decimate(x, y, self._n_points(), self.method)
+        line, = self.ax.plot(xs, ys, label=label, linewidth=1)
+        self.series.append((x, y, line))
+        return line
+
+    def _n_points(self):
+        return max(200, 2 * self.width())
+
+    def _on_xlim(self, ax):
+        x0, x1 = ax.get_xlim()
+        n_out = self._n_points()
+        for x, y, line in self.series:
+            i0, i1 = visible_slice(x, x0, x1)
+            line.set_data(*decimate(x[i0:i1], y[i0:i1], n_out, self.method))
+        self.draw_idle()
+
+class LogModel(QtCore.QAbstractListModel):
+    """Modelo de log con número máximo de líneas; las filas viejas se descartan."""
+    def __init__(self, max_lines=5000, parent=None):
+        super().__init__(parent)
+        self.lines = deque(maxlen=max_lines)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.lines)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and index.isValid():
+            return self.lines[index.row()]
+        return None
+
+    def extend(self, batch):
+        """Agrega un lote de líneas con una sola notificación de filas."""
+        max_lines = self.lines.maxlen
+        if len(batch) >= max_lines:
+            self.beginResetModel()
+            self.lines.clear()
+            self.lines.extend(batch[-max_lines:])
+            self.endResetModel()
+            return
+        overflow = len(self.lines) + len(batch) - max_lines
+        if overflow > 0:
+            self.beginRemoveRows(QtCore.QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self.lines.popleft()
+            self.endRemoveRows()
+        first = len(self.lines)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(batch) - 1)
+        self.lines.extend(batch)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.lines.clear()
+        self.endResetModel()
+
+class LogView(QtWidgets.QListView):
+    """
+    Vista de log acotada: append() solo encola (es seguro desde cualquier hilo)
+    y un temporizador de refresco vuelca los mensajes pendientes en lote.
+    """
+    def __init__(self, parent=None, max_lines=5000, refresh_ms=100):
+        super().__init__(parent)
+        self.log_model = LogModel(max_lines, self)
+        self.setModel(self.log_model)
+        self.setUniformItemSizes(True)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.pending = deque(maxlen=max_lines)
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start(refresh_ms)
+
+    def append(self, msg):
+        self.pending.append(msg)
+
+    def flush(self):
+        if not self.pending:
+            return
+        batch = []
+        while self.pending:
+            batch.append(self.pending.popleft())
+        bar = self.verticalScrollBar()
+        at_bottom = bar.value() >= bar.maximum() - 2
+        self.log_model.extend(batch)
+        if at_bottom:
+            self.scrollToBottom()
+
+    def clear(self):
+        self.pending.clear()
+        self.log_model.clear()
+
 class StatusIndicator(QtWidgets.QWidget):
     """Widget para mostrar un círculo de estado y un texto."""
     def __init__(self, parent=None):
@@ -125,7 +351,7 @@ class CalibrationDialog(QtWidgets.QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Calibración en Progreso")
-        self.setFixedSize(500, 300)
+        self.setFixedSize(500, 520)
         
         layout = QtWidgets.QVBoxLayout(self)
         
@@ -145,32 +371,64 @@ class CalibrationDialog(QtWidgets.QDialog):
         self.wait_label.setAlignment(QtCore.Qt.AlignCenter)
         layout.addWidget(self.wait_label)
         
+        # Estadísticas en vivo del peso actual
+        self.stats_label = QtWidgets.QLabel("")
+        self.stats_label.setAlignment(QtCore.Qt.AlignCenter)
+        layout.addWidget(self.stats_label)
+        
+        # Ajuste en vivo: coeficientes, R² y residuos por peso
+        self.fit_label = QtWidgets.QLabel("")
+        self.fit_label.setAlignment(QtCore.Qt.AlignCenter)
+        layout.addWidget(self.fit_label)
+        self.resid_label = QtWidgets.QLabel("")
+        self.resid_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.resid_label.setWordWrap(True)
+        self.resid_label.setStyleSheet("font-size: 11px; color: #666;")
+        layout.addWidget(self.resid_label)
+        
+        # Mensajes de la calibración: rechazos y re-adquisiciones, ajuste por peso, checkpoint
+        self.log_view = LogView(self, max_lines=500)
+        layout.addWidget(self.log_view, 1)
+        self.last_message = None
+        
         # Botones
         btn_layout = QtWidgets.QHBoxLayout()
         self.confirm_btn = QtWidgets.QPushButton("Confirmar Peso")
         self.confirm_btn.setVisible(False)
+        self.stop_btn = QtWidgets.QPushButton("Terminar ahora")
+        self.stop_btn.setToolTip("Los pesos restantes no cambiarían el ajuste de forma apreciable")
+        self.stop_btn.setVisible(False)
         self.cancel_btn = QtWidgets.QPushButton("Cancelar")
         
         btn_layout.addWidget(self.confirm_btn)
+        btn_layout.addWidget(self.stop_btn)
         btn_layout.addWidget(self.cancel_btn)
         layout.addLayout(btn_layout)
         
         # Conexiones
         self.confirm_btn.clicked.connect(self.confirm)
+        self.stop_btn.clicked.connect(self.stop_early)
         self.cancel_btn.clicked.connect(self.cancel)
         
         # Variables
         self.worker = None
         self.current_weight = 0
+        self.retry = False
     
     def set_worker(self, worker):
         """Establece el worker asociado"""
         self.worker = worker
         self.worker.progress_update.connect(self.update_progress)
         self.worker.confirmation_required.connect(self.request_confirmation)
+        # Conexión directa: append() solo encola y el mensaje llega aunque el diálogo ya se cerró
+        self.worker.operation_log.connect(self.add_log, QtCore.Qt.DirectConnection)
         self.worker.finished.connect(self.accept)
         self.worker.error.connect(self.reject)
     
+    def add_log(self, msg):
+        self.last_message = msg
+        self.log_view.append(msg)
+    
     def update_progress(self, current, total, message, extra_data):
         """Actualiza la interfaz con el progreso"""
         if total > 0:
@@ -185,18 +443,50 @@ class CalibrationDialog(QtWidgets.QDialog):
             self.wait_label.setText(f"Tiempo restante: {secs} segundos")
         else:
             self.wait_label.setText("")
+        
+        media = extra_data.get('media_adc')
+        if media is not None and media == media:  # NaN mientras no hay muestras
+            text = f"ADC medio: {media:.1f}  σ: {extra_data['std_adc']:.1f}"
+            if extra_data.get('rechazadas'):
+                text += f"  (descartadas: {extra_data['rechazadas']})"
+            self.stats_label.setText(text)
+        self.retry = extra_data.get('reintento', False)
+        
+        ajuste = extra_data.get('ajuste')
+        if ajuste:
+            a, b, c = ajuste['coeffs']
+            self.fit_label.setText(f"V = {a:.4f}(ln P)² + {b:.4f} ln P + {c:.4f}   "
+                                   f"R² = {ajuste['R2']:.4f}   RMSE = {ajuste['RMSE_V'] * 1000:.1f} mV")
+        residuos = extra_data.get('residuos')
+        if residuos:
+            self.resid_label.setText("Residuos (mV): " + "  ".join(
+                f"{p:g}g: {r * 1000:+.0f}" for p, r in residuos.items()))
+        if 'parada_temprana' in extra_data:
+            self.stop_btn.setVisible(extra_data['parada_temprana'])
     
     def request_confirmation(self, peso):
         """Solicita confirmación de peso colocado"""
         self.current_weight = peso
         self.confirm_btn.setVisible(True)
-        self.status_label.setText(f"Coloque {peso}g en el sensor y presione Confirmar")
+        if self.retry:
+            self.status_label.setText(f"Lectura inestable: vuelva a colocar {peso}g y presione Confirmar")
+        else:
+            self.status_label.setText(f"Coloque {peso}g en el sensor y presione Confirmar")
     
     def confirm(self):
         """Confirma que el peso ha sido colocado"""
         if self.worker:
             self.worker.confirm_weight()
         self.confirm_btn.setVisible(False)
+        self.stop_btn.setVisible(False)
+    
+    def stop_early(self):
+        """Termina la calibración sin medir los pesos restantes"""
+        if self.worker:
+            self.worker.request_early_stop()
+        self.confirm_btn.setVisible(False)
+        self.stop_btn.setVisible(False)
+        self.status_label.setText("Terminando calibración...")
     
     def cancel(self):
         """Cancela la calibración"""
@@ -204,6 +494,58 @@ class CalibrationDialog(QtWidgets.QDialog):
             self.worker.cancel_event.set()
         self.reject()
 
+class ReportDialog(QtWidgets.QDialog):
+    """Reporte de calibración: se abre con las propiedades y recibe la gráfica al terminar."""
+    def __init__(self, props, name, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f'Reporte Calibración: {name}')
+        self.resize(800, 700)
+        layout = QtWidgets.QVBoxLayout(self)
+        
+        # Propiedades en tabla
+        table = QtWidgets.QTableWidget()
+        table.setRowCount(props.shape[0])
+        table.setColumnCount(props.shape[1])
+        table.setHorizontalHeaderLabels(props.columns)
+        
+        for i in range(props.shape[0]):
+            for j in range(props.shape[1]):
+                item = QtWidgets.QTableWidgetItem(str(props.iat[i, j]))
+                item.setFlags(item.flags() ^ QtCore.Qt.ItemIsEditable)
+                table.setItem(i, j, item)
+        
+        table.resizeColumnsToContents()
+        table.setMaximumHeight(180)
+        layout.addWidget(table)
+        
+        # Ecuación de regresión y sensibilidad
+        eq_label = QtWidgets.QLabel(f"Ecuación de la curva característica:\n{props.at[0, 'Ecuacion_regresion']}")
+        sens_label = QtWidgets.QLabel(f"Ecuación de sensibilidad:\n{props.at[0, 'Sensibilidad_eq']}")
+        for lbl in (eq_label, sens_label):
+            lbl.setStyleSheet("font-size: 14px; font-weight: bold; background: #f8f9fa; padding: 10px;")
+            lbl.setWordWrap(True)
+            layout.addWidget(lbl)
+        
+        # Gráfica (llega después, mientras tanto se muestra el avance)
+        self.chart = PlotCanvas(self, width=7, height=5)
+        layout.addWidget(self.chart)
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setFormat("Renderizando gráfica... %p%")
+        layout.addWidget(self.progress_bar)
+        
+        # Botones
+        btn_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Close)
+        btn_box.rejected.connect(self.reject)
+        layout.addWidget(btn_box)
+    
+    def set_progress(self, pct, msg):
+        self.progress_bar.setValue(pct)
+    
+    def set_chart(self, img):
+        self.chart.show_image(img)
+        self.progress_bar.setVisible(False)
+
 class WelcomePage(QtWidgets.QWidget):
     def __init__(self):
         super().__init__()
@@ -261,7 +603,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 border-radius: 5px;
                 background: #FFFFFF;
             }}
-            QTextEdit {{
+            QTextEdit, QListView {{
                 border: 1px solid #DDDDDD;
                 border-radius: 5px;
                 background: #FFFFFF;
@@ -314,11 +656,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.btn_calib = QtWidgets.QPushButton('Calibración BLE')
         self.btn_oper  = QtWidgets.QPushButton('Operación BLE')
         self.btn_off   = QtWidgets.QPushButton('Offline')
+        self.btn_hist  = QtWidgets.QPushButton('Historial')
         # Inicialmente deshabilitados hasta conectar
         self.btn_calib.setEnabled(False)
         self.btn_oper.setEnabled(False)
         
-        for btn in (self.btn_calib, self.btn_oper, self.btn_off):
+        for btn in (self.btn_calib, self.btn_oper, self.btn_off, self.btn_hist):
             btn.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
             btn.setFixedHeight(40)
             sb_layout.addWidget(btn)
@@ -341,6 +684,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.btn_calib.clicked.connect(lambda: self.stack.setCurrentWidget(self.calib_page))
         self.btn_oper.clicked.connect(lambda: self.stack.setCurrentWidget(self.oper_page))
         self.btn_off.clicked.connect(lambda: self.stack.setCurrentWidget(self.offline_page))
+        self.btn_hist.clicked.connect(self.show_history)
         # Layout principal
         main = QtWidgets.QWidget()
         ml = QtWidgets.QHBoxLayout(main)
@@ -356,6 +700,10 @@ class MainWindow(QtWidgets.QMainWindow):
         # Worker BLE persistente
         self.ble_worker = None
         self.calib_dialog = None
+        
+        # Reportes en segundo plano
+        self.pool = QtCore.QThreadPool.globalInstance()
+        self.report_tasks = set()
     
     def _make_title(self,text):
         lbl = QtWidgets.QLabel(text, objectName='title')
@@ -379,8 +727,23 @@ class MainWindow(QtWidgets.QMainWindow):
         self.samples_spin.setValue(10)
         self.sensor_combo = QtWidgets.QComboBox()
         self.sensor_combo.addItems(['0','1','2','3'])
+        # Programa de pesos: fijo (250–4000 g), personalizado o adaptativo
+        self.schedule_combo = QtWidgets.QComboBox()
+        self.schedule_combo.addItem('Fijo 250–4000 g', 'fija')
+        self.schedule_combo.addItem('Personalizado', 'personalizada')
+        self.schedule_combo.addItem('Adaptativo', 'adaptativa')
+        self.schedule_edit = QtWidgets.QLineEdit()
+        self.schedule_edit.setPlaceholderText('Pesos en g, con muestras opcionales: 250, 500:20, 1000')
+        self.schedule_edit.setEnabled(False)
+        self.schedule_combo.currentIndexChanged.connect(
+            lambda _: self.schedule_edit.setEnabled(self.schedule_combo.currentData() != 'fija'))
         form.addRow('Muestras/peso:', self.samples_spin)
         form.addRow('Sensor:', self.sensor_combo)
+        # Los 4 canales con una sola pasada de pesos (fixture que carga todos los sensores)
+        self.all_channels_check = QtWidgets.QCheckBox('Calibrar los 4 sensores a la vez')
+        form.addRow('', self.all_channels_check)
+        form.addRow('Programa:', self.schedule_combo)
+        form.addRow('Pesos:', self.schedule_edit)
         v1.addLayout(form)
         
         hb = QtWidgets.QHBoxLayout()
@@ -388,9 +751,11 @@ class MainWindow(QtWidgets.QMainWindow):
         self.btn_list = QtWidgets.QPushButton('Listar')
         self.btn_delete = QtWidgets.QPushButton('Borrar')
         self.btn_report = QtWidgets.QPushButton('Reportar')
+        self.btn_resume = QtWidgets.QPushButton('Reanudar')
+        self.btn_resume.setToolTip('Continuar o descartar una calibración interrumpida')
         
         # Estilo mejorado para botones de calibración
-        for b in (self.btn_new, self.btn_list, self.btn_delete, self.btn_report):
+        for b in (self.btn_new, self.btn_list, self.btn_delete, self.btn_report, self.btn_resume):
             b.setFixedHeight(40)
             b.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
             b.setStyleSheet(f"""
@@ -427,9 +792,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.btn_oper_start = QtWidgets.QPushButton('Iniciar')
         self.btn_oper_stop = QtWidgets.QPushButton('Detener')
         self.btn_oper_stop.setEnabled(False)
+        self.btn_oper_plot = QtWidgets.QPushButton('Graficar')
         
         # Estilo mejorado para botones de operación
-        for b in (self.btn_oper_start, self.btn_oper_stop):
+        for b in (self.btn_oper_start, self.btn_oper_stop, self.btn_oper_plot):
             b.setFixedHeight(45)
             b.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
             b.setStyleSheet(f"""
@@ -457,12 +823,27 @@ class MainWindow(QtWidgets.QMainWindow):
             h2.addWidget(b)
         v2.addLayout(h2)
         
-        self.log_oper = QtWidgets.QTextEdit()
-        self.log_oper.setReadOnly(True)
+        # Tasa de operación: 0 = modo normal (texto); > 0 = operación rápida en lotes
+        h_rate = QtWidgets.QHBoxLayout()
+        h_rate.addWidget(QtWidgets.QLabel('Tasa de muestreo (Hz):'))
+        self.oper_rate = QtWidgets.QSpinBox()
+        self.oper_rate.setRange(0, 1000)
+        self.oper_rate.setSingleStep(50)
+        self.oper_rate.setSpecialValueText('Normal')
+        h_rate.addWidget(self.oper_rate)
+        h_rate.addStretch()
+        v2.addLayout(h_rate)
+        
+        self.link_label = QtWidgets.QLabel("Enlace: sin datos")
+        self.link_label.setStyleSheet(f"color: {PALETTE['text']}; font-size: 14px;")
+        v2.addWidget(self.link_label)
+        
+        self.log_oper = LogView()
         v2.addWidget(self.log_oper, 1)
         
         self.btn_oper_start.clicked.connect(self.start_oper)
         self.btn_oper_stop.clicked.connect(self.stop_oper)
+        self.btn_oper_plot.clicked.connect(self.plot_oper)
         
         self.stack.addWidget(self.oper_page)
         
@@ -480,9 +861,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.off_list = QtWidgets.QPushButton('Listar')
         self.off_delete = QtWidgets.QPushButton('Borrar')
         self.off_report = QtWidgets.QPushButton('Reportar')
+        self.off_process_all = QtWidgets.QPushButton('Procesar todo')
+        self.off_compare = QtWidgets.QPushButton('Comparar')
+        self.off_compare.setToolTip('Curvas, residuos, propiedades y deriva de todas las calibraciones')
         
         # Estilo mejorado para botones offline
-        for b in (self.off_list, self.off_delete, self.off_report):
+        for b in (self.off_list, self.off_delete, self.off_report, self.off_process_all, self.off_compare):
             b.setFixedHeight(40)
             b.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
             b.setStyleSheet(f"""
@@ -509,17 +893,65 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.list_off = QtWidgets.QListWidget()
         v3.addWidget(self.list_off, 1)
+        
+        # Resumen de propiedades de todas las calibraciones (ordenable)
+        self.summary_table = QtWidgets.QTableWidget()
+        self.summary_table.setSortingEnabled(True)
+        self.summary_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        v3.addWidget(self.summary_table, 1)
         self.stack.addWidget(self.offline_page)
         
+        # Historial de operación (offline, desde el índice de sesiones)
+        self.history_page = QtWidgets.QWidget()
+        v4 = QtWidgets.QVBoxLayout(self.history_page)
+        v4.addWidget(self._make_title('Historial de operación'))
+        
+        h4 = QtWidgets.QHBoxLayout()
+        self.hist_refresh = QtWidgets.QPushButton('Actualizar')
+        h4.addWidget(self.hist_refresh)
+        h4.addWidget(QtWidgets.QLabel('Desde (s):'))
+        self.hist_start = QtWidgets.QDoubleSpinBox()
+        h4.addWidget(self.hist_start)
+        h4.addWidget(QtWidgets.QLabel('Hasta (s):'))
+        self.hist_end = QtWidgets.QDoubleSpinBox()
+        h4.addWidget(self.hist_end)
+        for spin in (self.hist_start, self.hist_end):
+            spin.setDecimals(1)
+            spin.setRange(0, 1e7)
+        self.hist_range = QtWidgets.QPushButton('Cargar rango')
+        h4.addWidget(self.hist_range)
+        h4.addStretch()
+        v4.addLayout(h4)
+        
+        self.history_table = QtWidgets.QTableWidget()
+        self.history_table.setSortingEnabled(True)
+        self.history_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.history_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.history_table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        v4.addWidget(self.history_table, 1)
+        
+        self.history_canvas = TimeSeriesCanvas(self.history_page)
+        v4.addWidget(NavigationToolbar(self.history_canvas, self.history_page))
+        v4.addWidget(self.history_canvas, 2)
+        self.stack.addWidget(self.history_page)
+        
+        self.hist_refresh.clicked.connect(self.refresh_history)
+        self.hist_range.clicked.connect(self.load_history_range)
+        self.history_table.itemSelectionChanged.connect(self.open_history_session)
+        self.history_index = None
+        
         # Conexiones
         self.btn_new.clicked.connect(self.run_new_calib)
         self.btn_list.clicked.connect(self.run_list_calib)
         self.btn_delete.clicked.connect(self.run_delete_calib)
         self.btn_report.clicked.connect(self.run_report_calib)
+        self.btn_resume.clicked.connect(self.run_resume_calib)
         
         self.off_list.clicked.connect(self.list_offline)
         self.off_delete.clicked.connect(self.delete_offline)
         self.off_report.clicked.connect(self.report_offline)
+        self.off_process_all.clicked.connect(self.process_all_offline)
+        self.off_compare.clicked.connect(self.compare_offline)
         
         self.stack.addWidget(self.calib_page)
     
@@ -572,10 +1004,52 @@ class MainWindow(QtWidgets.QMainWindow):
     def run_new_calib(self):
         n = self.samples_spin.value()
         s = self.sensor_combo.currentText()
+        if self.all_channels_check.isChecked():
+            if self.schedule_combo.currentData() == 'adaptativa':
+                self.show_error('El programa adaptativo calibra un solo sensor; use el fijo o uno personalizado.')
+                return
+            s = list(Protocol.CHANNELS)
+        try:
+            schedule = make_schedule(self.schedule_combo.currentData(), n,
+                                     self.schedule_edit.text().strip() or None)
+        except ValueError as e:
+            self.show_error(str(e))
+            return
         
         # Crear worker para calibración
-        worker = BLEWorker(Protocol.calibracion_ble_wrapper, n, s)
-        
+        self.start_calibration(BLEWorker(Protocol.calibracion_ble_wrapper, n, s, schedule))
+    
+    def run_resume_calib(self):
+        pendientes = find_checkpoints(Protocol.DIR_DATA)
+        if not pendientes:
+            return self.show_info('No hay calibraciones interrumpidas')
+        items = [describe(load_checkpoint(p)) for p in pendientes]
+        item, ok = QtWidgets.QInputDialog.getItem(self, 'Calibraciones interrumpidas', 'Calibración:',
+                                                  items, 0, False)
+        if not ok:
+            return
+        path = pendientes[items.index(item)]
+        # Botones explícitos: descartar borra datos y no debe confundirse con "No"
+        box = QtWidgets.QMessageBox(QtWidgets.QMessageBox.Question, 'Calibración interrumpida',
+                                    f'{item}\n\n¿Reanudar desde el último peso guardado o descartarla?',
+                                    parent=self)
+        reanudar = box.addButton('Reanudar', QtWidgets.QMessageBox.AcceptRole)
+        descartar = box.addButton('Descartar', QtWidgets.QMessageBox.DestructiveRole)
+        box.addButton(QtWidgets.QMessageBox.Cancel)
+        box.setDefaultButton(reanudar)
+        box.exec_()
+        if box.clickedButton() == reanudar:
+            self.start_calibration(BLEWorker(Protocol.calibracion_ble_wrapper, None, None, None, path))
+        elif box.clickedButton() == descartar:
+            resp = QtWidgets.QMessageBox.warning(
+                self, 'Descartar calibración',
+                f'{item}\n\nSe borrarán los datos parciales de esta calibración. ¿Continuar?',
+                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No, QtWidgets.QMessageBox.No)
+            if resp == QtWidgets.QMessageBox.Yes:
+                Protocol.discard_checkpoint(path)
+                self.show_info('Calibración interrumpida descartada')
+    
+    def start_calibration(self, worker):
         # Crear diálogo de progreso
         self.calib_dialog = CalibrationDialog(self)
         self.calib_dialog.set_worker(worker)
@@ -590,9 +1064,32 @@ class MainWindow(QtWidgets.QMainWindow):
         self.calib_dialog.exec_()
     
     def handle_calib_success(self, path):
-        if path:
+        if isinstance(path, list):
+            self.process_multichannel(path)
+        elif path:
             self.show_info(f'Calibración guardada en:\n{path}')
             self.run_list_calib()
+        elif self.calib_dialog.last_message:
+            # Cancelada: el último mensaje indica si quedó un checkpoint para reanudar
+            self.show_info(f'Calibración cancelada\n{self.calib_dialog.last_message}')
+    
+    def process_multichannel(self, paths):
+        """Procesa en paralelo los CSV de una calibración multicanal, uno por sensor."""
+        task = BatchTask(Protocol.DIR_DATA, Protocol.dir_processed, Protocol.calibration_jobs(paths))
+        self.report_tasks.add(task)
+        
+        def on_done(results, errors):
+            self.report_tasks.discard(task)
+            self.run_list_calib()
+            self.fill_summary_table(summary_table(Protocol.dir_processed))
+            lines = '\n'.join(os.path.basename(p) + (f': {errors[p]}' if p in errors else '') for p in paths)
+            if errors:
+                self.show_error(f'Calibraciones guardadas, con errores al procesar:\n{lines}')
+            else:
+                self.show_info(f'Calibraciones guardadas y procesadas:\n{lines}')
+        
+        task.signals.done.connect(on_done)
+        self.pool.start(task)
     
     def run_list_calib(self):
         s = self.sensor_combo.currentText()
@@ -636,38 +1133,78 @@ class MainWindow(QtWidgets.QMainWindow):
         csvp = os.path.join(Protocol.DIR_DATA, f'sensor{s}', name)
         out = os.path.join(Protocol.dir_processed, f'sensor{s}')
         os.makedirs(out, exist_ok=True)
-        
-        try:
-            props, img = process_file(csvp, out)
-        except Exception as e:
-            return self.show_error(f'Error procesando: {e}')
-        
-        self.show_report_dialog(props, img, name)
+        self.start_report(csvp, out, name)
     
     # Handlers Operación BLE
     def start_oper(self):
         self.log_oper.append('Iniciando operación BLE...')
+        self.link_label.setText('Enlace: esperando datos...')
         self.btn_oper_start.setEnabled(False)
         self.btn_oper_stop.setEnabled(True)
         
         # Crear worker para operación
-        worker = BLEWorker(Protocol.operacion_ble_wrapper)
-        worker.operation_log.connect(self.log_oper.append)
+        worker = BLEWorker(Protocol.operacion_ble_wrapper, self.oper_rate.value() or None)
+        # Conexión directa: append() solo encola, sin un evento Qt por muestra
+        worker.operation_log.connect(self.log_oper.append, QtCore.Qt.DirectConnection)
+        worker.link_update.connect(self.on_link_update)
         worker.finished.connect(self.on_oper_finished)
+        worker.error.connect(self.on_oper_error)
         worker.start()
         self.oper_worker = worker
     
-    def on_oper_finished(self):
+    def on_oper_finished(self, stats=None):
         self.log_oper.append('Operación finalizada')
+        if stats and stats.get('Parada_ms') is not None:
+            self.log_oper.append(f"{stats['Muestras']} muestras, {stats['Tasa_Hz']} Hz, "
+                                 f"parada a idle en {stats['Parada_ms']:.1f} ms")
+        if stats and stats.get('Tasa_pedida_Hz'):
+            self.log_oper.append(f"Tasa pedida {stats['Tasa_pedida_Hz']} Hz, "
+                                 f"lograda {stats['Tasa_muestreo_Hz']} Hz por canal")
+        if stats and stats.get('Esperados'):
+            self.log_oper.append(f"{stats['Perdidos']} frames perdidos de {stats['Esperados']} "
+                                 f"({stats['Perdida_pct']} %), {stats['Duplicados']} duplicados, "
+                                 f"{stats['Reordenados']} fuera de orden")
         self.btn_oper_start.setEnabled(True)
         self.btn_oper_stop.setEnabled(False)
         self.oper_worker = None
     
+    def on_link_update(self, stats):
+        text = f"Enlace: {stats['Frames_s']:.1f} frames/s, {stats['Muestras_s']:.1f} muestras/s"
+        if stats.get('Esperados'):
+            text += (f" | pérdida {stats['Perdida_pct']:.2f} % ({stats['Perdidos']} frames)"
+                     f" | duplicados {stats['Duplicados']} | fuera de orden {stats['Reordenados']}")
+        else:
+            text += " | pérdida n/d (firmware sin secuencia)"
+        self.link_label.setText(text)
+    
+    def on_oper_error(self, msg):
+        self.on_oper_finished()
+        self.show_error(f'Error en operación: {msg}')
+    
     def stop_oper(self):
         if self.oper_worker:
             self.oper_worker.cancel_event.set()
+            self.btn_oper_stop.setEnabled(False)
             self.log_oper.append('Deteniendo operación...')
     
+    def plot_oper(self):
+        # Última sesión grabada: solo se abren sus segmentos
+        root = os.path.join(Protocol.DIR_DATA, 'operacion')
+        try:
+            import_legacy(root)  # operacion.csv antiguo → sesión
+            sesion = latest_session(root)
+        except Exception as e:
+            return self.show_error(f'Error leyendo operación: {e}')
+        if sesion is None:
+            return self.show_info('No hay datos de operación')
+        try:
+            df = load_range(root, session=sesion)
+        except Exception as e:
+            return self.show_error(f'Error leyendo operación: {e}')
+        if df.empty:
+            return self.show_info('La última sesión no tiene datos')
+        self.show_series_dialog(df, f'Operación {sesion}')
+    
     # Handlers Offline
     def list_offline(self):
         s = self.off_sensor.currentText()
@@ -707,55 +1244,259 @@ class MainWindow(QtWidgets.QMainWindow):
         csvp = os.path.join(Protocol.DIR_DATA, f'sensor{s}', name)
         out = os.path.join(Protocol.dir_processed, f'sensor{s}')
         os.makedirs(out, exist_ok=True)
-        
-        try:
-            props, img = process_file(csvp, out)
-        except Exception as e:
-            return self.show_error(f'Error procesando: {e}')
-        
-        self.show_report_dialog(props, img, name)
+        self.start_report(csvp, out, name)
+    
+    def process_all_offline(self):
+        task = BatchTask(Protocol.DIR_DATA, Protocol.dir_processed)
+        self.report_tasks.add(task)
+        self.off_process_all.setEnabled(False)
+        
+        progress = QtWidgets.QProgressDialog('Buscando calibraciones desactualizadas...', 'Cancelar', 0, 0, self)
+        progress.setWindowTitle('Procesar todo')
+        progress.setMinimumDuration(0)
+        progress.canceled.connect(task.cancel)
+        
+        def on_progress(done, total, path):
+            progress.setMaximum(max(total, 1))
+            progress.setValue(done)
+            progress.setLabelText(f'{done}/{total} {os.path.basename(path)}')
+        
+        def on_done(results, errors):
+            progress.reset()
+            self.report_tasks.discard(task)
+            self.off_process_all.setEnabled(True)
+            self.fill_summary_table(summary_table(Protocol.dir_processed))
+            if errors:
+                lines = '\n'.join(f'{os.path.basename(p)}: {m}' for p, m in errors.items())
+                self.show_error(f'Procesadas {len(results)}, con errores {len(errors)}:\n{lines}')
+            else:
+                self.show_info(f'Procesadas {len(results)} calibraciones')
+        
+        task.signals.progress.connect(on_progress)
+        task.signals.done.connect(on_done)
+        self.pool.start(task)
     
-    # Diálogo de reporte compartido
-    def show_report_dialog(self, props, img, name):
+    def compare_offline(self):
+        task = CompareTask(Protocol.DIR_DATA, Protocol.dir_processed)
+        self.report_tasks.add(task)
+        self.off_compare.setEnabled(False)
+        
+        def on_done(result):
+            self.report_tasks.discard(task)
+            self.off_compare.setEnabled(True)
+            self.show_comparison_dialog(*result)
+        
+        def on_error(msg):
+            self.report_tasks.discard(task)
+            self.off_compare.setEnabled(True)
+            self.show_error(f'Error en la comparación: {msg}')
+        
+        task.signals.done.connect(on_done)
+        task.signals.error.connect(on_error)
+        self.pool.start(task)
+    
+    def show_comparison_dialog(self, props, drift, plot_file, omitidas):
         dlg = QtWidgets.QDialog(self)
-        dlg.setWindowTitle(f'Reporte Calibración: {name}')
-        dlg.resize(800, 700)
+        dlg.setWindowTitle('Comparación de calibraciones')
+        dlg.resize(1000, 850)
         layout = QtWidgets.QVBoxLayout(dlg)
         
-        # Propiedades en tabla
-        table = QtWidgets.QTableWidget()
-        table.setRowCount(props.shape[0])
-        table.setColumnCount(props.shape[1])
-        table.setHorizontalHeaderLabels(props.columns)
+        chart = PlotCanvas(dlg, width=8, height=6)
+        chart.show_image(plot_file)
+        layout.addWidget(chart, 2)
         
-        for i in range(props.shape[0]):
-            for j in range(props.shape[1]):
-                item = QtWidgets.QTableWidgetItem(str(props.iat[i, j]))
-                item.setFlags(item.flags() ^ QtCore.Qt.ItemIsEditable)
-                table.setItem(i, j, item)
+        tabs = QtWidgets.QTabWidget()
+        for title, df in (('Propiedades', props), ('Deriva entre corridas', drift)):
+            table = QtWidgets.QTableWidget()
+            table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+            self.fill_table(table, df)
+            tabs.addTab(table, title)
+        layout.addWidget(tabs, 1)
+        if omitidas:
+            layout.addWidget(QtWidgets.QLabel('Omitidas (menos de 3 pesos): ' + ', '.join(omitidas)))
         
+        btn_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Close)
+        btn_box.rejected.connect(dlg.reject)
+        layout.addWidget(btn_box)
+        dlg.exec_()
+    
+    def fill_summary_table(self, df):
+        self.fill_table(self.summary_table, df)
+    
+    def fill_table(self, table, df):
+        table.setSortingEnabled(False)
+        table.clear()
+        table.setRowCount(df.shape[0])
+        table.setColumnCount(df.shape[1])
+        table.setHorizontalHeaderLabels([str(c) for c in df.columns])
+        for i in range(df.shape[0]):
+            for j in range(df.shape[1]):
+                value = df.iat[i, j]
+                item = QtWidgets.QTableWidgetItem()
+                # Números como dato (no texto) para que el orden sea numérico
+                if isinstance(value, numbers.Real) and not isinstance(value, bool):
+                    item.setData(QtCore.Qt.DisplayRole, float(value))
+                else:
+                    item.setData(QtCore.Qt.DisplayRole, str(value))
+                table.setItem(i, j, item)
         table.resizeColumnsToContents()
-        table.setMaximumHeight(180)
-        layout.addWidget(table)
-        
-        # Ecuación de regresión y sensibilidad
-        eq_label = QtWidgets.QLabel(f"Ecuación de la curva característica:\n{props.at[0, 'Ecuacion_regresion']}")
-        sens_label = QtWidgets.QLabel(f"Ecuación de sensibilidad:\n{props.at[0, 'Sensibilidad_eq']}")
-        for lbl in (eq_label, sens_label):
-            lbl.setStyleSheet("font-size: 14px; font-weight: bold; background: #f8f9fa; padding: 10px;")
-            lbl.setWordWrap(True)
-            layout.addWidget(lbl)
+        table.setSortingEnabled(True)
+    
+    # Historial de operación
+    def _history_root(self):
+        return os.path.join(Protocol.DIR_DATA, 'operacion')
+    
+    def show_history(self):
+        self.stack.setCurrentWidget(self.history_page)
+        if self.history_index is None:
+            self.refresh_history()
+    
+    def refresh_history(self):
+        task = HistoryTask(self._history_root())
+        self.report_tasks.add(task)
+        self.hist_refresh.setEnabled(False)
+        
+        def on_done(index):
+            self.report_tasks.discard(task)
+            self.hist_refresh.setEnabled(True)
+            self.history_index = index
+            cols = ['Sesion', 'Inicio', 'Duracion_s', 'Filas', 'Perdida_pct'] + \
+                   [f'S{c}_Media' for c in range(4)] + [f'S{c}_Max' for c in range(4)]
+            table = index[cols].copy()
+            table['Inicio'] = [format_epoch(t) for t in table['Inicio']]
+            # Más recientes primero
+            self.fill_table(self.history_table, table.iloc[::-1].reset_index(drop=True))
+        
+        def on_error(msg):
+            self.report_tasks.discard(task)
+            self.hist_refresh.setEnabled(True)
+            self.show_error(f'Error indexando sesiones: {msg}')
+        
+        task.signals.done.connect(on_done)
+        task.signals.error.connect(on_error)
+        self.pool.start(task)
+    
+    def _selected_session(self):
+        rows = self.history_table.selectionModel().selectedRows()
+        if not rows:
+            return None
+        return self.history_table.item(rows[0].row(), 0).text()
+    
+    def _plot_history(self, series, title):
+        canvas = self.history_canvas
+        canvas.clear()
+        for sensor, (x, y) in sorted(series.items()):
+            canvas.add_series(x, y, label=f'S{sensor}')
+        canvas.ax.set_title(title)
+        canvas.ax.set_xlabel('Tiempo de sesión (s)')
+        canvas.ax.set_ylabel('Valor')
+        canvas.ax.grid(True, alpha=0.3)
+        if series:
+            canvas.ax.legend(loc='best')
+        canvas.draw()
+    
+    def open_history_session(self):
+        # Vista previa guardada en el índice: no abre los segmentos
+        sesion = self._selected_session()
+        if sesion is None:
+            return
+        try:
+            series = open_session(self._history_root(), sesion)
+        except Exception as e:
+            return self.show_error(f'Error abriendo sesión: {e}')
+        fila = self.history_index[self.history_index['Sesion'] == sesion]
+        if not fila.empty:
+            self.hist_start.setValue(0)
+            self.hist_end.setValue(float(fila['Fin'].iloc[0] - fila['Origen'].iloc[0]))
+        self._plot_history(series, sesion)
+    
+    def load_history_range(self):
+        # Solo se leen los segmentos que cubren el rango
+        sesion = self._selected_session()
+        if sesion is None:
+            return self.show_info('Selecciona una sesión')
+        start, end = self.hist_start.value(), self.hist_end.value()
+        if end <= start:
+            return self.show_error('El rango no es válido')
+        try:
+            series = open_session(self._history_root(), sesion, start, end)
+        except Exception as e:
+            return self.show_error(f'Error leyendo rango: {e}')
+        self._plot_history(series, f'{sesion} [{start:.1f} s – {end:.1f} s]')
+    
+    # Reporte en segundo plano (compartido)
+    def start_report(self, csvp, out, name):
+        task = ReportTask(csvp, out)
+        self.report_tasks.add(task)
+        
+        progress = QtWidgets.QProgressDialog('Cargando datos', 'Cancelar', 0, 100, self)
+        progress.setWindowTitle(f'Procesando {name}')
+        progress.setMinimumDuration(200)
+        progress.canceled.connect(task.cancel)
+        progress.setValue(0)
+        state = {'dialog': None}
+        
+        def on_progress(pct, msg):
+            if state['dialog'] is None:
+                progress.setLabelText(msg)
+                progress.setValue(min(pct, 99))
+            else:
+                state['dialog'].set_progress(pct, msg)
+        
+        def on_properties(props):
+            # El diálogo se abre en cuanto hay propiedades; la gráfica llega luego
+            progress.reset()
+            dlg = ReportDialog(props, name, self)
+            dlg.finished.connect(task.cancel)
+            state['dialog'] = dlg
+            dlg.show()
+        
+        def on_chart(img):
+            if state['dialog'] is not None:
+                state['dialog'].set_chart(img)
+        
+        def on_done(*_):
+            progress.reset()
+            self.report_tasks.discard(task)
+        
+        task.signals.progress.connect(on_progress)
+        task.signals.properties_ready.connect(on_properties)
+        task.signals.chart_ready.connect(on_chart)
+        task.signals.chart_ready.connect(on_done)
+        task.signals.cancelled.connect(on_done)
+        task.signals.failed.connect(on_done)
+        task.signals.failed.connect(lambda msg: self.show_error(f'Error procesando: {msg}'))
+        self.pool.start(task)
+    
+    # Diálogo de series temporales (decimadas)
+    def show_series_dialog(self, df, name):
+        dlg = QtWidgets.QDialog(self)
+        dlg.setWindowTitle(f'Series: {name}')
+        dlg.resize(900, 600)
+        layout = QtWidgets.QVBoxLayout(dlg)
         
-        # Gráfica
-        chart = PlotCanvas(dlg, width=7, height=5)
-        chart.show_image(img)
-        layout.addWidget(chart)
+        canvas = TimeSeriesCanvas(dlg)
+        layout.addWidget(NavigationToolbar(canvas, dlg))
+        layout.addWidget(canvas, 1)
+        
+        # Eje x: tiempo de sesión si existe, si no índice de muestra
+        con_tiempo = TIME_COLUMN in df.columns and df[TIME_COLUMN].notna().any()
+        for sensor, grupo in df.groupby('Sensor'):
+            if con_tiempo:
+                grupo = grupo.dropna(subset=[TIME_COLUMN])
+                x = grupo[TIME_COLUMN].to_numpy(dtype=float) / 1e9
+            else:
+                x = grupo.index.to_numpy(dtype=float)
+            canvas.add_series(x, grupo['Valor'].to_numpy(dtype=float), label=f'S{sensor}')
+        canvas.ax.set_xlabel('Tiempo de sesión (s)' if con_tiempo else 'Muestra')
+        canvas.ax.set_ylabel('Valor')
+        canvas.ax.grid(True, alpha=0.3)
+        canvas.ax.legend(loc='best')
+        canvas.draw()
         
-        # Botones
         btn_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Close)
         btn_box.rejected.connect(dlg.reject)
         layout.addWidget(btn_box)
-        
         dlg.exec_()
     
     # Utilidades
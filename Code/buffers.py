@@ -0,0 +1,133 @@
+import os
+import numpy as np
+from frames import parse_calib
+
+# Rechazo de lecturas atípicas: |x - mediana| > OUTLIER_K · 1.4826 · MAD.
+# La MAD tiene un piso en cuentas de ADC (un paso estable suele dar MAD = 0).
+OUTLIER_K = 3.5
+MAD_FLOOR_ADC = 2.0
+# Con menos lecturas no hay mayoría para decidir cuál es atípica
+MIN_ROBUST = 3
+# ADC de 10 bits a 3.3 V (misma conversión que process_calibration)
+VOLTS_PER_COUNT = 3.3 / 1023.0
+
+
+def outlier_mask(values, k=OUTLIER_K, floor=MAD_FLOOR_ADC):
+    """Máscara de lecturas atípicas según mediana y MAD (todo False con pocas lecturas)."""
+    values = np.asarray(values, dtype=float)
+    if len(values) < MIN_ROBUST:
+        return np.zeros(len(values), dtype=bool)
+    med = np.median(values)
+    dev = np.abs(values - med)
+    return dev > k * 1.4826 * max(np.median(dev), floor)
+
+
+class CalibrationBuffer:
+    """
+    Muestras de una calibración en arreglos preasignados de tamaño
+    pesos × muestras: canal (uint8), ADC (int16) y T_ns (int64).
+    Cada notificación se interpreta una sola vez, desde bytes.
+    """
+    def __init__(self, weights, samples):
+        self.weights = np.asarray(weights, dtype=np.int32)
+        self.samples = samples
+        shape = (len(self.weights), samples)
+        self.channel = np.zeros(shape, dtype=np.uint8)
+        self.adc = np.zeros(shape, dtype=np.int16)
+        self.t_ns = np.zeros(shape, dtype=np.int64)
+        self.counts = np.zeros(len(self.weights), dtype=np.int32)
+        self.step = 0
+        self.limit = samples
+
+    def begin_step(self, step, samples=None):
+        """Selecciona el peso `step` (con `samples` muestras, hasta el máximo) y descarta lo que tuviera."""
+        self.step = step
+        self.counts[step] = 0
+        self.limit = self.samples if samples is None else min(samples, self.samples)
+
+    @property
+    def count(self):
+        return int(self.counts[self.step])
+
+    def push(self, data, t_ns):
+        """Agrega un frame 'Calib S<c>:<adc>' (bytes); False si no es de calibración o el paso está lleno."""
+        frame = parse_calib(data)
+        if frame is None:
+            return False
+        return self.push_value(frame[0], frame[1], t_ns)
+
+    def push_value(self, channel, adc, t_ns):
+        i = self.counts[self.step]
+        if i >= self.limit:
+            return False
+        self.channel[self.step, i] = channel
+        self.adc[self.step, i] = adc
+        self.t_ns[self.step, i] = t_ns
+        self.counts[self.step] = i + 1
+        return True
+
+    def reject_outliers(self, step=None):
+        """
+        Quita del paso las lecturas atípicas (mediana/MAD) compactando los
+        arreglos, para volver a adquirirlas. Devuelve cuántas se quitaron.
+        """
+        step = self.step if step is None else step
+        n = self.counts[step]
+        bad = outlier_mask(self.adc[step, :n])
+        n_bad = int(bad.sum())
+        if n_bad:
+            for arr in (self.channel, self.adc, self.t_ns):
+                arr[step, :n - n_bad] = arr[step, :n][~bad]
+            self.counts[step] = n - n_bad
+        return n_bad
+
+    def timestamps(self):
+        """T_ns válidos de todos los pasos, en orden."""
+        return np.concatenate([self.t_ns[s, :n] for s, n in enumerate(self.counts)])
+
+    def step_values(self, step=None):
+        """Vista (sin copia) de las lecturas ADC válidas de un paso."""
+        step = self.step if step is None else step
+        return self.adc[step, :self.counts[step]]
+
+    def step_volts(self, step=None):
+        """Lecturas válidas del paso en voltios, redondeadas como en el procesamiento."""
+        return np.round(self.step_values(step) * VOLTS_PER_COUNT, 3)
+
+    def step_stats(self, step=None):
+        """Media y desviación del ADC del paso, para mostrar en vivo."""
+        values = self.step_values(step)
+        if len(values) == 0:
+            return np.nan, np.nan
+        return float(values.mean()), float(values.std(ddof=1)) if len(values) > 1 else 0.0
+
+    def rows(self, sensor, step=None):
+        """Filas (Sensor, Peso_g, Lectura, T_ns) como matriz int64 de uno o todos los pasos."""
+        steps = range(len(self.weights)) if step is None else [step]
+        blocks = []
+        for s in steps:
+            n = self.counts[s]
+            blocks.append(np.column_stack([
+                np.full(n, int(sensor), dtype=np.int64),
+                np.full(n, self.weights[s], dtype=np.int64),
+                self.adc[s, :n],
+                self.t_ns[s, :n],
+            ]))
+        return np.concatenate(blocks) if blocks else np.empty((0, 4), dtype=np.int64)
+
+    def append_csv(self, path, sensor, step=None, sync=False):
+        """
+        Agrega al CSV las filas del paso (o de todos) sin pasar por cadenas
+        intermedias. Con sync=True hace fsync antes de volver, para que un
+        checkpoint escrito después nunca apunte a datos que no están en disco.
+        """
+        with open(path, 'ab') as f:
+            np.savetxt(f, self.rows(sensor, step), fmt='%d', delimiter=',', newline='\r\n')
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def save_npz(self, path, sensor):
+        """Escritura binaria de todos los arreglos de la calibración."""
+        np.savez_compressed(path, sensor=int(sensor), weights=self.weights, counts=self.counts,
+                            channel=self.channel, adc=self.adc, t_ns=self.t_ns)
@@ -0,0 +1,73 @@
+import json
+import os
+import time
+
+# Una calibración en curso escribe en <csv>.part y guarda su estado en
+# <csv>.ckpt.json tras cada peso terminado; al completarse el .part pasa a
+# ser el CSV y el checkpoint se borra. Los listados (*.csv) no los ven.
+PARTIAL_SUFFIX = '.part'
+CHECKPOINT_SUFFIX = '.ckpt.json'
+CHECKPOINT_VERSION = 1
+
+
+def partial_path(csv_path):
+    return csv_path + PARTIAL_SUFFIX
+
+
+def checkpoint_path(csv_path):
+    return csv_path + CHECKPOINT_SUFFIX
+
+
+def save_checkpoint(path, state):
+    """
+    Escritura atómica del estado: archivo temporal en la misma carpeta,
+    fsync y os.replace, de modo que un corte deja el checkpoint anterior
+    o el nuevo, nunca uno a medias.
+    """
+    state = dict(state, version=CHECKPOINT_VERSION, epoch_ns=time.time_ns())
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path):
+    with open(path, encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint con versión no soportada: {path}")
+    return state
+
+
+def find_checkpoints(data_dir):
+    """
+    Checkpoints pendientes en data_dir/sensorN, del más reciente al más
+    antiguo (uno por calibración: el multicanal va junto al CSV del primer sensor).
+    """
+    found = []
+    if not os.path.isdir(data_dir):
+        return found
+    for sensor_folder in sorted(os.listdir(data_dir)):
+        sensor_path = os.path.join(data_dir, sensor_folder)
+        if os.path.isdir(sensor_path):
+            found += [os.path.join(sensor_path, f) for f in os.listdir(sensor_path)
+                      if f.endswith(CHECKPOINT_SUFFIX)]
+    return sorted(found, key=os.path.getmtime, reverse=True)
+
+
+def describe(state):
+    """Resumen de una línea para elegir qué calibración reanudar."""
+    pesos = state['pesos_hechos']
+    sensores = ', '.join(state['sensores'])
+    cuando = time.strftime('%Y-%m-%d %H:%M', time.localtime(state['epoch_ns'] / 1e9))
+    ultimo = f"último {pesos[-1]} g" if pesos else "sin pesos"
+    return f"Sensor {sensores}: {len(pesos)} pesos ({ultimo}), {cuando}"
+
+
+def remove_checkpoint(path):
+    """Borra un checkpoint (calibración terminada o descartada)."""
+    for p in (path, path + '.tmp'):
+        if os.path.exists(p):
+            os.remove(p)
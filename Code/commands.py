@@ -0,0 +1,106 @@
+import asyncio
+import re
+import time
+from collections import deque
+
+# Confirmaciones del firmware para cada comando (Com_Protocol_v1 y Calibracion_Multiplex)
+ACKS = {
+    'o': re.compile(r"^Modo: Operacion$"),
+    'f': re.compile(r"^Modo: Operacion rapida"),
+    'b': re.compile(r"^Modo: Calibracion"),
+    'i': re.compile(r"^Modo: Idle"),
+    't': re.compile(r"^Calib S\d+:"),
+}
+# s<N>: "Canal Calib set a N" (v1) o "Canal seleccionado: SN" (multiplex)
+_ACK_CHANNEL = r"^(Canal Calib set a {0}|Canal seleccionado: S{0})$"
+# r<Hz>: "Tasa: N Hz, lote M" (operación rápida de Com_Protocol_v1)
+_ACK_RATE = r"^Tasa: {0} Hz"
+# Respuestas de error: fallan el comando pendiente más antiguo
+ERRORS = re.compile(r"(no reconocido|fuera de rango)", re.IGNORECASE)
+
+
+def ack_pattern(cmd):
+    """Patrón de la notificación que confirma `cmd`, o None si no tiene respuesta."""
+    if cmd.startswith('s') and cmd[1:].isdigit():
+        return re.compile(_ACK_CHANNEL.format(int(cmd[1:])))
+    if cmd.startswith('r') and cmd[1:].isdigit():
+        return re.compile(_ACK_RATE.format(int(cmd[1:])))
+    return ACKS.get(cmd)
+
+
+class CommandError(Exception):
+    """El dispositivo rechazó el comando o no lo confirmó a tiempo."""
+
+
+class CommandChannel:
+    """
+    Canal de comandos con confirmación: cada escritura queda pendiente
+    hasta que llega su notificación de respuesta (o vence el timeout).
+    Las escrituras se serializan en orden, pero varios comandos pueden
+    estar pendientes a la vez (pipeline), p. ej. gather(send('s1'), send('b')).
+    feed() debe llamarse con cada notificación recibida.
+    """
+    def __init__(self, client, cmd_uuid, timeout=1.0):
+        self.client = client
+        self.cmd_uuid = cmd_uuid
+        self.timeout = timeout
+        self.pending = deque()  # (comando, patrón, future)
+        self.last_rtt_ms = None
+        self._write_lock = asyncio.Lock()
+
+    def feed(self, msg):
+        """Resuelve el comando pendiente que confirma `msg`; True si era una confirmación."""
+        for entry in self.pending:
+            cmd, pattern, fut = entry
+            if pattern.match(msg):
+                self.pending.remove(entry)
+                if not fut.done():
+                    fut.set_result(msg)
+                return True
+        if self.pending and ERRORS.search(msg):
+            cmd, _, fut = self.pending.popleft()
+            if not fut.done():
+                fut.set_exception(CommandError(f"Comando '{cmd}' rechazado: {msg}"))
+            return True
+        return False
+
+    async def write(self, cmd):
+        """Escritura sin esperar respuesta del dispositivo."""
+        async with self._write_lock:
+            await self.client.write_gatt_char(self.cmd_uuid, cmd.encode())
+
+    async def send(self, cmd, timeout=None, strict=True):
+        """
+        Envía `cmd` y espera su confirmación. Devuelve el mensaje de
+        confirmación; si no llega a tiempo lanza CommandError (o devuelve
+        None con strict=False). Comandos sin confirmación conocida no esperan.
+        """
+        pattern = ack_pattern(cmd)
+        if pattern is None:
+            await self.write(cmd)
+            return None
+        fut = asyncio.get_running_loop().create_future()
+        entry = (cmd, pattern, fut)
+        # Registrar antes de escribir: la respuesta puede llegar antes que el retorno del write
+        self.pending.append(entry)
+        t0 = time.perf_counter()
+        try:
+            await self.write(cmd)
+            msg = await asyncio.wait_for(fut, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            if strict:
+                raise CommandError(f"Sin confirmación para '{cmd}'")
+            return None
+        except CommandError:
+            if strict:
+                raise
+            return None
+        finally:
+            if entry in self.pending:
+                self.pending.remove(entry)
+        self.last_rtt_ms = (time.perf_counter() - t0) * 1e3
+        return msg
+
+    async def send_all(self, *cmds, timeout=None):
+        """Envía varios comandos en pipeline y espera todas las confirmaciones."""
+        return await asyncio.gather(*(self.send(c, timeout) for c in cmds))
@@ -0,0 +1,179 @@
+import re
+import struct
+import time
+import numpy as np
+
+# --- Frames de texto del firmware (bytes, bytearray o memoryview) ---
+# "Calib S0:494"
+_CALIB = re.compile(rb"Calib S(\d+):\s*(-?\d+)")
+# "Op S0:1.23" (Calibracion_Multiplex, un canal por notificación)
+_OP_SINGLE = re.compile(rb"Op S(\d+):\s*(-?\d+(?:\.\d*)?)")
+# "S0:1.23 S1:0.00 ..." (Com_Protocol_v1, String(valor, 2) con relleno)
+_OP_PAIR = re.compile(rb"S(\d+):\s*(-?\d+(?:\.\d*)?)")
+# Secuencia opcional al final de los frames de operación: "... #57" (uint16)
+_SEQ = re.compile(rb"#(\d+)\s*$")
+SEQ_MODULO = 1 << 16
+
+# --- Frame binario opcional ---
+# Byte mágico + secuencia uint16 + 4 lecturas ADC uint16, little-endian (11 bytes)
+BIN_MAGIC = 0xA5
+BIN_STRUCT = struct.Struct('<BH4H')
+BIN_DTYPE = np.dtype([('magic', 'u1'), ('seq', '<u2'), ('adc', '<u2', (4,))])
+
+# --- Lote binario de operación rápida (Com_Protocol_v1, 'r<Hz>' + 'f') ---
+# Cabecera: byte mágico, secuencia uint16, n muestras uint8, micros() de la primera
+# muestra uint32; luego n × 4 lecturas ADC uint16, little-endian
+BATCH_MAGIC = 0xA6
+BATCH_HEADER = struct.Struct('<BHBI')
+BATCH_SAMPLE = np.dtype('<u2')
+
+# Conversión ADC → valor de operación, igual que funcion_operacion en el firmware
+ADC_OFFSET = 264
+VALUE_MAX = 11.0
+
+
+def adc_to_value(adc):
+    return np.clip((np.asarray(adc, dtype=float) - ADC_OFFSET) * (VALUE_MAX / 1023.0), 0.0, VALUE_MAX)
+
+
+# Tipos de frame devueltos por decode()
+CALIB, OP, BIN, BATCH = 'calib', 'op', 'bin', 'batch'
+
+
+def parse_calib(data):
+    """(canal, adc) de un frame 'Calib S<c>:<adc>', o None."""
+    m = _CALIB.match(data)
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def parse_seq(data):
+    """Secuencia de un frame de texto, o None si el firmware no la envía."""
+    m = _SEQ.search(data)
+    return int(m.group(1)) if m else None
+
+
+def parse_op(data):
+    """Lista [(canal, valor)] de un frame de operación de texto (ambos formatos), o None."""
+    m = _OP_SINGLE.match(data)
+    if m:
+        return [(int(m.group(1)), float(m.group(2)))]
+    pairs = _OP_PAIR.findall(data)
+    if pairs and data[:1] == b"S":
+        return [(int(c), float(v)) for c, v in pairs]
+    return None
+
+
+def parse_binary(data):
+    """(seq, (adc0..adc3)) de un frame binario de 11 bytes, o None."""
+    if len(data) != BIN_STRUCT.size or data[0] != BIN_MAGIC:
+        return None
+    _, seq, *adc = BIN_STRUCT.unpack_from(data)
+    return seq, tuple(adc)
+
+
+def parse_batch(data):
+    """
+    (seq, t0_us, adc) de un lote de operación rápida, con adc como vista
+    (n × 4, sin copia) sobre el buffer de la notificación; o None.
+    """
+    if len(data) < BATCH_HEADER.size or data[0] != BATCH_MAGIC:
+        return None
+    _, seq, n, t0_us = BATCH_HEADER.unpack_from(data)
+    if len(data) != BATCH_HEADER.size + n * 8:
+        return None
+    adc = np.frombuffer(data, dtype=BATCH_SAMPLE, count=n * 4, offset=BATCH_HEADER.size)
+    return seq, t0_us, adc.reshape(n, 4)
+
+
+def parse_binary_batch(data):
+    """
+    Varios frames binarios concatenados en un solo arreglo estructurado
+    (vista sobre el buffer, sin copia). Campos: 'seq' y 'adc' (N × 4).
+    """
+    n = len(data) // BIN_DTYPE.itemsize
+    frames = np.frombuffer(data, dtype=BIN_DTYPE, count=n)
+    if n and not np.all(frames['magic'] == BIN_MAGIC):
+        raise ValueError("Frame binario con byte mágico inválido")
+    return frames
+
+
+def decode(data):
+    """
+    Decodifica una notificación sin pasar por str. Devuelve (tipo, seq, datos):
+    (CALIB, None, (canal, adc)), (OP, seq, [(canal, valor), ...]),
+    (BIN, seq, adcs), (BATCH, seq, (t0_us, adc n × 4)), o None si no es
+    un frame de datos (p. ej. una confirmación de comando). seq es None si
+    el frame no la trae.
+    """
+    if not data:
+        return None
+    # Despacho por el primer byte: a lo sumo un patrón por frame
+    first = data[0]
+    if first == BIN_MAGIC:
+        frame = parse_binary(data)
+        return (BIN, frame[0], frame[1]) if frame else None
+    if first == BATCH_MAGIC:
+        frame = parse_batch(data)
+        return (BATCH, frame[0], frame[1:]) if frame else None
+    if first == 0x43:  # 'C'
+        m = _CALIB.match(data)
+        return (CALIB, None, (int(m.group(1)), int(m.group(2)))) if m else None
+    if first == 0x4F:  # 'O'
+        m = _OP_SINGLE.match(data)
+        return (OP, parse_seq(data), [(int(m.group(1)), float(m.group(2)))]) if m else None
+    if first == 0x53:  # 'S'
+        pairs = _OP_PAIR.findall(data)
+        return (OP, parse_seq(data), [(int(c), float(v)) for c, v in pairs]) if pairs else None
+    return None
+
+
+def _legacy_calib(data):
+    # Ruta anterior de los handlers, como referencia
+    msg = data.decode().strip()
+    if msg.startswith("Calib"):
+        return int(msg.split(':')[-1].strip())
+
+
+def _bench(label, fn, frames, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for f in frames:
+            fn(f)
+        best = min(best, time.perf_counter() - t)
+    print(f"{label:34s}: {len(frames) / best:12,.0f} frames/s")
+
+
+def main():
+    n = 100_000
+    rng = np.random.default_rng(0)
+    adc = rng.integers(0, 1024, size=(n, 4), dtype=np.uint16)
+    calib = [b"Calib S%d:%d" % (i % 4, a) for i, a in enumerate(adc[:, 0])]
+    op1 = [b"Op S%d:%.2f #%d" % (i % 4, a / 93.0, i & 0xFFFF) for i, a in enumerate(adc[:, 0])]
+    op4 = [b"S0:%.2f S1:%.2f S2:%.2f S3:%.2f #%d" % (*(a / 93.0), i & 0xFFFF) for i, a in enumerate(adc)]
+    binary = [BIN_STRUCT.pack(BIN_MAGIC, i & 0xFFFF, *a) for i, a in enumerate(adc)]
+    batches = [BATCH_HEADER.pack(BATCH_MAGIC, j & 0xFFFF, 8, j * 40_000) + adc[i:i + 8].tobytes()
+               for j, i in enumerate(range(0, n, 8))]
+
+    print(f"Decodificación de {n} frames:")
+    _bench("texto Calib (decode+strip+split)", _legacy_calib, calib)
+    _bench("texto Calib (frames.decode)", decode, calib)
+    _bench("texto Op 1 canal (frames.decode)", decode, op1)
+    _bench("texto 4 canales v1 (frames.decode)", decode, op4)
+    _bench("binario 4 canales (struct)", decode, binary)
+    _bench("binario 4 canales (memoryview)", lambda d: decode(memoryview(d)), binary)
+    t = time.perf_counter()
+    for b in batches:
+        decode(b)
+    dt = time.perf_counter() - t
+    print(f"{'lotes de 8 muestras (frames.decode)':34s}: {n / dt:12,.0f} muestras/s")
+
+    blob = b"".join(binary)
+    t = time.perf_counter()
+    frames = parse_binary_batch(blob)
+    dt = time.perf_counter() - t
+    print(f"{'binario por lotes (frombuffer)':34s}: {len(frames) / dt:12,.0f} frames/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+import math
+import numpy as np
+
+# Programa histórico: 16 pesos de 250 g a 4000 g, mismas muestras en cada uno
+DEFAULT_WEIGHTS = list(range(250, 4001, 250))
+# Adaptativo: incertidumbre objetivo (g, 1σ) del peso estimado en todo el rango
+TARGET_G = 30.0
+MIN_STEPS = 5
+# ...o se para cuando el mejor peso siguiente reduciría la incertidumbre media menos que esto
+MIN_GAIN = 0.05
+MIN_SAMPLES = 3
+# Piso del ruido por paso: medio escalón de ADC (V)
+NOISE_FLOOR_V = 0.5 * 3.3 / 1023.0
+
+
+def parse_schedule(text, samples):
+    """
+    Pesos y muestras desde texto: '250, 500:20, 1000' (peso[:muestras],
+    separados por comas o espacios). Sin ':' se usa `samples`.
+    """
+    weights, counts = [], []
+    for item in text.replace(',', ' ').split():
+        peso, _, n = item.partition(':')
+        try:
+            weights.append(int(float(peso)))
+            counts.append(int(n) if n else samples)
+        except ValueError:
+            raise ValueError(f"Entrada de programa inválida: '{item}'")
+    if not weights:
+        raise ValueError("El programa de pesos está vacío.")
+    if min(weights) <= 0 or min(counts) <= 0:
+        raise ValueError("Pesos y muestras deben ser positivos.")
+    return weights, counts
+
+
+class FixedSchedule:
+    """Pesos en el orden dado, con un número de muestras por peso (escalar o lista)."""
+    adaptive = False
+
+    def __init__(self, weights=DEFAULT_WEIGHTS, samples=10):
+        self.candidates = [int(p) for p in weights]
+        if np.isscalar(samples):
+            samples = [int(samples)] * len(self.candidates)
+        if len(samples) != len(self.candidates):
+            raise ValueError("Se necesita un número de muestras por peso.")
+        self.samples = [int(n) for n in samples]
+        self.max_samples = max(self.samples)
+        self.measured = []
+
+    def total_samples(self):
+        return sum(self.samples)
+
+    def next(self, fit=None):
+        """(índice, peso, muestras) del próximo paso, o None si terminó."""
+        step = len(self.measured)
+        if step >= len(self.candidates):
+            return None
+        return step, self.candidates[step], self.samples[step]
+
+    def done(self, step):
+        self.measured.append(step)
+
+    def to_dict(self):
+        """Estado serializable (checkpoint de la calibración)."""
+        return {'modo': 'fija', 'pesos': self.candidates, 'muestras': self.samples,
+                'medidos': self.measured}
+
+
+class AdaptiveSchedule:
+    """
+    Elige el próximo peso entre `candidates` (los pesos disponibles) según
+    la incertidumbre en gramos del ajuste actual (RunningFit.force_sigma):
+    se coloca el peso aún no medido que más reduciría la incertidumbre media
+    en todo el rango, con las muestras necesarias para que el ruido de su
+    media quede bajo `target_g`. Termina (con al menos MIN_STEPS pesos)
+    cuando todo el rango está bajo `target_g`, cuando ningún peso restante
+    la reduciría en más de MIN_GAIN, o al llegar a `max_steps`.
+    """
+    adaptive = True
+
+    def __init__(self, candidates=DEFAULT_WEIGHTS, samples=10, target_g=TARGET_G,
+                 max_steps=None, min_samples=MIN_SAMPLES):
+        self.candidates = sorted(int(p) for p in candidates)
+        if len(self.candidates) < 3:
+            raise ValueError("El modo adaptativo necesita al menos 3 pesos disponibles.")
+        self.default_samples = int(samples)
+        self.max_samples = int(samples)
+        self.min_samples = min(int(min_samples), self.max_samples)
+        self.target_g = target_g
+        self.max_steps = len(self.candidates) if max_steps is None else min(max_steps, len(self.candidates))
+        self.measured = []
+        # Semillas: extremos y el peso más cercano a la media geométrica (3 pesos para el primer ajuste)
+        medio = math.sqrt(self.candidates[0] * self.candidates[-1])
+        centro = min(range(1, len(self.candidates) - 1), key=lambda i: abs(self.candidates[i] - medio))
+        self.seeds = [0, len(self.candidates) - 1, centro]
+
+    def total_samples(self):
+        # Cota superior para la barra de progreso
+        return self.max_steps * self.max_samples
+
+    def uncertainty(self, fit):
+        """Incertidumbre (g) del ajuste en cada peso disponible."""
+        return fit.force_sigma(self.candidates)
+
+    def next(self, fit):
+        if len(self.measured) >= self.max_steps:
+            return None
+        pending = [s for s in self.seeds if s not in self.measured]
+        if pending:
+            step = pending[0]
+            return step, self.candidates[step], self.default_samples
+
+        sigma = self.uncertainty(fit)
+        listo = len(self.measured) >= MIN_STEPS
+        if listo and np.nanmax(sigma) <= self.target_g:
+            return None
+        libres = [i for i in range(len(self.candidates)) if i not in self.measured]
+        if not libres:
+            return None
+        # Incertidumbre media prevista tras medir cada peso libre (actualización de rango 1 de XᵀX)
+        opciones = []
+        for i in libres:
+            n = self._samples_for(fit, self.candidates[i])
+            media = np.nanmean(fit.force_sigma(self.candidates, extra=(self.candidates[i], n)))
+            opciones.append((media, i, n))
+        media, step, n = min(opciones)
+        if listo and media > (1 - MIN_GAIN) * np.nanmean(sigma):
+            return None
+        return step, self.candidates[step], n
+
+    def _samples_for(self, fit, peso):
+        # n tal que (ruido/√n) / |dV/dP| <= target_g en el peso elegido
+        sol = fit.solve()
+        ruido = fit.noise_v()
+        if sol is None or not np.isfinite(ruido):
+            return self.default_samples
+        a, b, _ = sol['coeffs']
+        sens = abs((2 * a * math.log(peso) + b) / peso)
+        if sens == 0:
+            return self.max_samples
+        n = math.ceil((max(ruido, NOISE_FLOOR_V) / (sens * self.target_g)) ** 2)
+        return int(min(max(n, self.min_samples), self.max_samples))
+
+    def done(self, step):
+        self.measured.append(step)
+
+    def to_dict(self):
+        return {'modo': 'adaptativa', 'pesos': self.candidates, 'muestras': self.default_samples,
+                'objetivo_g': self.target_g, 'max_pasos': self.max_steps,
+                'muestras_min': self.min_samples, 'medidos': self.measured}
+
+
+def schedule_from_dict(state):
+    """Programa reconstruido desde to_dict(), con los pesos ya medidos marcados."""
+    if state['modo'] == 'adaptativa':
+        schedule = AdaptiveSchedule(state['pesos'], state['muestras'], state['objetivo_g'],
+                                    state['max_pasos'], state['muestras_min'])
+    else:
+        schedule = FixedSchedule(state['pesos'], state['muestras'])
+    schedule.measured = list(state['medidos'])
+    return schedule
+
+
+def make_schedule(mode='fija', samples=10, weights=None, target_g=TARGET_G):
+    """
+    Programa de calibración: 'fija' (250–4000 g), 'personalizada' (texto
+    'peso[:muestras], ...' en `weights`) o 'adaptativa' (elige entre los
+    pesos de `weights` o los de la fija).
+    """
+    if mode == 'fija':
+        return FixedSchedule(DEFAULT_WEIGHTS, samples)
+    if mode == 'personalizada':
+        pesos, muestras = parse_schedule(weights or '', samples)
+        return FixedSchedule(pesos, muestras)
+    if mode == 'adaptativa':
+        pesos = parse_schedule(weights, samples)[0] if weights else DEFAULT_WEIGHTS
+        return AdaptiveSchedule(pesos, samples, target_g)
+    raise ValueError(f"Modo de programa desconocido: {mode}")
@@ -0,0 +1,72 @@
+from collections import deque
+from frames import SEQ_MODULO
+
+
+class SequenceTracker:
+    """
+    Contabilidad de la secuencia de frames de una sesión (contador uint16
+    del firmware, con vuelta a cero). La secuencia se extiende a entero
+    sin límite para detectar huecos, duplicados y frames fuera de orden.
+    Un frame tardío que llena un hueco deja de contarse como perdido.
+    """
+    def __init__(self, modulo=SEQ_MODULO, window=1024):
+        self.modulo = modulo
+        self.half = modulo // 2
+        self.first = None    # secuencia extendida más baja vista
+        self.highest = None  # secuencia extendida más alta vista
+        self.frames = 0
+        self.unique = 0
+        self.gaps = 0
+        self.duplicates = 0
+        self.reordered = 0
+        # Ventana de secuencias recientes para reconocer duplicados
+        self.window = window
+        self._recent = set()
+        self._order = deque()
+
+    def update(self, seq):
+        """Registra un frame; devuelve False si es un duplicado (no debe guardarse)."""
+        self.frames += 1
+        if self.highest is None:
+            ext = self.first = self.highest = seq
+        else:
+            delta = (seq - self.highest) % self.modulo
+            if delta >= self.half:
+                delta -= self.modulo
+            ext = self.highest + delta
+            if ext in self._recent:
+                self.duplicates += 1
+                return False
+            if delta > 0:
+                if delta > 1:
+                    self.gaps += 1
+                self.highest = ext
+            else:
+                self.reordered += 1
+                self.first = min(self.first, ext)
+        self.unique += 1
+        self._recent.add(ext)
+        self._order.append(ext)
+        if len(self._order) > self.window:
+            self._recent.discard(self._order.popleft())
+        return True
+
+    @property
+    def expected(self):
+        return 0 if self.highest is None else self.highest - self.first + 1
+
+    @property
+    def lost(self):
+        return max(0, self.expected - self.unique)
+
+    def stats(self):
+        expected = self.expected
+        return {
+            'Frames': self.frames,
+            'Esperados': expected,
+            'Perdidos': self.lost,
+            'Huecos': self.gaps,
+            'Duplicados': self.duplicates,
+            'Reordenados': self.reordered,
+            'Perdida_pct': round(100.0 * self.lost / expected, 3) if expected else None,
+        }
@@ -1,6 +1,10 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from sweep import fsr_resistance, output_voltage
+
+# Un solo diseño; para comparar muchos (R_feedback, VREF, exponente) usar sweep.py
+
 # R_feedback fijo
 R_feedback = 100e3  # 100kΩ
 
@@ -8,7 +12,7 @@ R_feedback = 100e3  # 100kΩ
 fuerza = np.linspace(0.1, 40, 200)
 
 # Aproximación empírica de la resistencia del FSR (no lineal)
-R_FSR = 1e6 / fuerza**0.8  # Ohmios
+R_FSR = fsr_resistance(fuerza, 0.8)  # Ohmios
 
 # Ganancia del amplificador no inversor
 ganancia = 1 + (R_feedback / R_FSR)
@@ -16,11 +20,8 @@ ganancia = 1 + (R_feedback / R_FSR)
 # Valor de referencia de entrada (VREF)
 VREF = 1  # Voltios (puede ser 0.2 a 0.5 V dependiendo del divisor resistivo)
 
-# Voltaje de salida
-Vout = ganancia * VREF
-
-# Limitar la salida a 3.3 V (máximo del sistema)
-Vout = np.clip(Vout, 0, 3.3)
+# Voltaje de salida, limitado a 3.3 V (máximo del sistema)
+Vout = output_voltage(fuerza, R_feedback, VREF, 0.8)
 
 # Graficar
 plt.figure(figsize=(8,5))
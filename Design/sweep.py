@@ -0,0 +1,127 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+# Modelo de Relation.py: R_FSR = K_FSR / F^n y amplificador no inversor
+# Vout = VREF·(1 + R_feedback / R_FSR), saturado en VMAX.
+K_FSR = 1e6          # Ohmios a 1 N
+VMAX = 3.3           # Saturación de la salida (V)
+ADC_LSB = 3.3 / 1023  # Un paso del ADC de 10 bits (V)
+G = 9.80665          # N por kg
+# Configuraciones evaluadas a la vez (acota la memoria: CHUNK × puntos de fuerza)
+CHUNK = 1 << 14
+
+
+def fsr_resistance(fuerza, exponente=0.8, k_fsr=K_FSR):
+    """Resistencia empírica del FSR (Ω) para una fuerza en N."""
+    return k_fsr / np.asarray(fuerza, dtype=float) ** exponente
+
+
+def output_voltage(fuerza, r_feedback, vref, exponente=0.8, k_fsr=K_FSR, vmax=VMAX):
+    """Voltaje de salida del amplificador no inversor (admite broadcasting)."""
+    ganancia = 1 + r_feedback / fsr_resistance(fuerza, exponente, k_fsr)
+    return np.clip(ganancia * vref, 0, vmax)
+
+
+def _evaluate_chunk(rf, vref, n, fn, fuerza, k_fsr, vmax):
+    # rf, vref, n: (c, 1); fn = F^n por diseño y fuerza: (c, m); fuerza: (1, m)
+    # creciente. Vout crece con F, así que la zona sin saturar es un prefijo
+    # de la malla de fuerza y dV/dF ∝ F^(n-1) tiene sus extremos en los bordes
+    # de ese prefijo: basta con contar y leer dos columnas.
+    with np.errstate(over='ignore'):
+        delta = fn * (vref * rf / k_fsr)  # VREF·Rf/R_FSR
+    libre = delta < vmax - vref           # salida sin saturar
+    sens = delta * (n / fuerza)           # dV/dF (V/N)
+    n_libre = libre.sum(axis=1)
+    hay = n_libre > 0
+    ultimo = np.maximum(n_libre - 1, 0)
+    s_ini, s_fin = sens[:, 0], sens[np.arange(len(rf)), ultimo]
+    to_g = ADC_LSB * 1000 / G  # N por paso de ADC -> g
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'Saturacion_frac': 1 - n_libre / fuerza.shape[1],
+            'F_util_max_N': np.where(hay, fuerza[0, ultimo], 0.0),
+            'Vout_min': np.minimum(vref[:, 0] + delta[:, 0], vmax),
+            'Vout_max': np.minimum(vref[:, 0] + delta[:, -1], vmax),
+            'Sens_media_V_N': (sens * libre).sum(axis=1) / n_libre,
+            # Resolución: fuerza equivalente a un paso del ADC, solo sin saturación
+            'Resol_peor_g': np.where(hay, to_g / np.minimum(s_ini, s_fin), np.inf),
+            'Resol_mejor_g': np.where(hay, to_g / np.maximum(s_ini, s_fin), np.inf),
+        }
+
+
+def sweep(r_feedback, vref, exponente, fuerza, k_fsr=K_FSR, vmax=VMAX):
+    """
+    Evalúa la malla completa de diseños (producto de r_feedback × vref ×
+    exponente) sobre todos los puntos de `fuerza` (N > 0), por bloques de
+    CHUNK diseños con broadcasting. Devuelve un DataFrame con una fila por diseño.
+    """
+    exponente = np.asarray(exponente, dtype=float)
+    rf, vr, k = (a.ravel() for a in np.meshgrid(np.asarray(r_feedback, dtype=float),
+                                                 np.asarray(vref, dtype=float),
+                                                 np.arange(len(exponente)),
+                                                 indexing='ij'))
+    n = exponente[k]
+    fuerza = np.sort(np.asarray(fuerza, dtype=float))[None, :]
+    # F^n solo para cada exponente distinto; los diseños lo indexan (sin exp por elemento)
+    potencias = np.exp(exponente[:, None] * np.log(fuerza))
+    partes = []
+    for i in range(0, len(rf), CHUNK):
+        s = slice(i, i + CHUNK)
+        partes.append(_evaluate_chunk(rf[s, None], vr[s, None], n[s, None], potencias[k[s]],
+                                      fuerza, k_fsr, vmax))
+    df = pd.DataFrame({'R_feedback': rf, 'VREF': vr, 'Exponente': n})
+    for col in partes[0]:
+        df[col] = np.concatenate([p[col] for p in partes])
+    df['Excursion_frac'] = (df['Vout_max'] - df['Vout_min']) / vmax
+    return df
+
+
+def rank_designs(df, max_saturacion=0.0):
+    """
+    Diseños ordenados de mejor a peor: se descartan los que saturan en más
+    de `max_saturacion` del rango de fuerza y se ordena por la peor
+    resolución (g por paso de ADC) y luego por excursión de salida.
+    """
+    ok = df[df['Saturacion_frac'] <= max_saturacion]
+    ok = ok.sort_values(['Resol_peor_g', 'Excursion_frac'], ascending=[True, False])
+    ok = ok.reset_index(drop=True)
+    ok.insert(0, 'Rank', np.arange(1, len(ok) + 1))
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Barrido de diseños FSR + amplificador no inversor: saturación, sensibilidad y resolución.')
+    parser.add_argument('--rf', nargs=3, type=float, default=[1e3, 1e6, 100], metavar=('MIN', 'MAX', 'N'),
+                        help='R_feedback en Ω (escala logarítmica)')
+    parser.add_argument('--vref', nargs=3, type=float, default=[0.1, 1.5, 100], metavar=('MIN', 'MAX', 'N'),
+                        help='VREF en V')
+    parser.add_argument('--exp', nargs=3, type=float, default=[0.6, 1.0, 100], metavar=('MIN', 'MAX', 'N'),
+                        help='Exponente del FSR')
+    parser.add_argument('--force', nargs=3, type=float, default=[0.1, 40, 200], metavar=('MIN', 'MAX', 'N'),
+                        help='Fuerza en N')
+    parser.add_argument('--max-sat', type=float, default=0.0, help='Fracción de saturación admitida')
+    parser.add_argument('--top', type=int, default=20, help='Diseños a mostrar')
+    parser.add_argument('--output', '-o', help='CSV con la tabla ordenada completa')
+    args = parser.parse_args()
+
+    rf = np.logspace(np.log10(args.rf[0]), np.log10(args.rf[1]), int(args.rf[2]))
+    vref = np.linspace(args.vref[0], args.vref[1], int(args.vref[2]))
+    exponente = np.linspace(args.exp[0], args.exp[1], int(args.exp[2]))
+    fuerza = np.linspace(args.force[0], args.force[1], int(args.force[2]))
+
+    t = time.perf_counter()
+    df = sweep(rf, vref, exponente, fuerza)
+    ranked = rank_designs(df, args.max_sat)
+    dt = time.perf_counter() - t
+    print(f"{len(df)} diseños × {len(fuerza)} fuerzas en {dt:.2f} s; {len(ranked)} cumplen la saturación")
+    print(ranked.head(args.top).to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    if args.output:
+        ranked.to_csv(args.output, index=False)
+        print(f"Tabla guardada en {args.output}")
+
+
+if __name__ == '__main__':
+    main()